@@ -0,0 +1,55 @@
+#!/usr/bin/env python
+
+# BSD 3-Clause License; see https://github.com/scikit-hep/uproot/blob/master/LICENSE
+
+# Compare the deflate backends that uproot can use for ZLIB-compressed data.
+#
+#     python dev/deflate_benchmark.py [file.root [treename]]
+#
+# Without arguments, the benchmark uses synthetic float data. With a ROOT file,
+# it also times reading all branches of a TTree with each backend.
+
+from __future__ import absolute_import, print_function
+
+import sys
+import time
+
+import numpy
+
+import uproot
+import uproot._deflate
+
+def best(fcn, repeat=5):
+    out = float("inf")
+    for i in range(repeat):
+        start = time.time()
+        fcn()
+        out = min(out, time.time() - start)
+    return out
+
+def main(path=None, treename=None):
+    print("available backends: {0}".format(", ".join(uproot._deflate.available())))
+    print("automatically selected: {0}".format(uproot._deflate.select().name))
+    print("")
+
+    data = numpy.round(numpy.random.RandomState(12345).normal(size=4*1024**2), 3).astype(">f4").tobytes()
+    print("{0:12s} {1:>16s} {2:>16s} {3:>8s}".format("backend", "inflate (MB/s)", "deflate (MB/s)", "ratio"))
+    for name in uproot._deflate.available():
+        backend = uproot._deflate.select(name)
+        compressed = backend.compress(data, 4)
+        inflate = best(lambda: backend.decompress(compressed, len(data)))
+        deflate = best(lambda: backend.compress(data, 4), repeat=1)
+        print("{0:12s} {1:16.0f} {2:16.0f} {3:8.3f}".format(name, len(data) / inflate / 1e6, len(data) / deflate / 1e6, len(compressed) / float(len(data))))
+
+    if path is not None:
+        print("")
+        tree = uproot.open(path)[treename] if treename is not None else [x for x in uproot.open(path).allvalues() if isinstance(x, uproot.tree.TTreeMethods)][0]
+        print("{0:12s} {1:>16s}".format("backend", "arrays() (s)"))
+        for name in uproot._deflate.available():
+            uproot._deflate.select(name)
+            print("{0:12s} {1:16.3f}".format(name, best(lambda: tree.arrays(), repeat=3)))
+
+    uproot._deflate.select()
+
+if __name__ == "__main__":
+    main(*sys.argv[1:])
@@ -147,6 +147,7 @@ setup(name = "uproot",
       extras_require = {
           "testing": ["pytest>=3.9", "pkgconfig", "lz4", "zstandard", 'backports.lzma;python_version<"3.3"', "xxhash", "mock", "requests"],
           "compress": ["lz4", "zstandard", 'backports.lzma;python_version<"3.3"', "xxhash"],
+          "deflate": ['deflate;python_version>="3.6"', 'isal;python_version>="3.7"'],
       },
       classifiers = [
           "Development Status :: 5 - Production/Stable",
@@ -0,0 +1,9 @@
+#!/usr/bin/env python
+
+# BSD 3-Clause License; see https://github.com/scikit-hep/uproot/blob/master/LICENSE
+
+import sys
+
+collect_ignore = []
+if sys.version_info < (3, 7):
+    collect_ignore.append("test_http_async.py")
@@ -117,3 +117,126 @@ class Test(object):
             assert len(keycache) > 0
             assert branch.array(entrystart=entrystart, entrystop=entrystop, keycache=keycache).tolist() == expectation[entrystart:entrystop]
             keycache = {}
+
+    def test_sharded_cache(self):
+        import threading
+        import numpy
+        cache = uproot.ShardedArrayCache(10000, numshards=4)
+        for i in range(20):
+            cache[i] = numpy.zeros(100, dtype=numpy.uint8)
+        assert len(cache) == 20 and sorted(cache) == list(range(20))
+        assert cache.currsize == 2000
+
+        # the byte budget is global: the newest entry survives, and the total stays under the limit
+        cache["big"] = numpy.zeros(9500, dtype=numpy.uint8)
+        assert "big" in cache
+        assert cache.currsize <= 10000
+        del cache["big"]
+        assert "big" not in cache
+
+        def fill(offset):
+            for i in range(1000):
+                cache[offset, i] = numpy.zeros(50, dtype=numpy.uint8)
+                cache.get((offset, i - 1))
+        threads = [threading.Thread(target=fill, args=(t,)) for t in range(8)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        assert 0 < cache.currsize <= 10000
+
+        expectation = uproot.open("tests/samples/HZZ.root")["events"].arrays(["Muon_*"])
+        arrays = uproot.open("tests/samples/HZZ.root")["events"].arrays(["Muon_*"], cache=uproot.ShardedArrayCache("1 MB"), basketcache=uproot.ShardedArrayCache("1 MB"), keycache=uproot.ShardedArrayCache("1 MB"))
+        for name in expectation:
+            assert arrays[name].tolist() == expectation[name].tolist()
+
+    def test_stats(self):
+        import numpy
+        for cache in (uproot.ArrayCache(1000), uproot.ThreadSafeArrayCache(1000), uproot.ShardedArrayCache(1000, numshards=4)):
+            for i in range(15):
+                cache["a;b;c;{0};raw".format(i)] = numpy.zeros(100, dtype=numpy.uint8)
+            assert cache.get("a;b;c;14;raw") is not None
+            assert cache.get("nothing") is None
+            stats = cache.stats(byclass=True)
+            assert stats["inserts"] == 15 and stats["bytesinserted"] == 1500
+            assert stats["evictions"] == 5 and stats["bytesevicted"] == 500
+            assert stats["hits"] == 1 and stats["misses"] == 1
+            assert stats["numitems"] == 10 and stats["currbytes"] == 1000 and stats["limitbytes"] == 1000
+            assert stats["byclass"]["raw"]["inserts"] == 15 and stats["byclass"]["array"]["misses"] == 1
+
+        cache, basketcache, keycache = uproot.ArrayCache("10 MB"), uproot.ArrayCache("10 MB"), uproot.ArrayCache("10 MB")
+        tree = uproot.open("tests/samples/HZZ.root")["events"]
+        tree.arrays(["Muon_*"], cache=cache, basketcache=basketcache, keycache=keycache)
+        assert cache.stats()["inserts"] > 0 and cache.stats()["hits"] == 0
+        assert set(keycache.stats(byclass=True)["byclass"]) == set(["key"])
+        tree.arrays(["Muon_*"], cache=cache, basketcache=basketcache, keycache=keycache)
+        assert cache.stats()["hits"] == cache.stats()["inserts"]
+
+    def test_spill(self, tmpdir):
+        import numpy
+        expectation = uproot.open("tests/samples/HZZ.root")["events"].arrays(["Muon_*", "Jet_*"])
+        tree = uproot.open("tests/samples/HZZ.root")["events"]
+        cache = uproot.SpillArrayCache("10 kB", str(tmpdir))
+        tree.arrays(["Muon_*", "Jet_*"], cache=cache)
+        assert cache.stats()["spills"] > 0 and cache.stats()["currbytes"] <= 10*1024
+        arrays = tree.arrays(["Muon_*", "Jet_*"], cache=cache)
+        assert cache.stats()["diskhits"] > 0
+        for name in expectation:
+            assert arrays[name].tolist() == expectation[name].tolist()
+        assert isinstance(arrays[b"Muon_Px"].content, numpy.memmap)
+
+        cache = uproot.SpillArrayCache(1000, str(tmpdir.join("small")))
+        cache["a"] = numpy.arange(100, dtype=numpy.float64)
+        cache["b"] = numpy.array([None] * 200, dtype=object)
+        assert "a" in cache and cache["a"].tolist() == list(range(100))
+        assert "b" not in cache
+        cache.clear()
+        assert "a" not in cache
+
+    def test_greedydualsize(self):
+        import time
+        import numpy
+        for cache in (uproot.ArrayCache(1000, method="GDS"), uproot.ShardedArrayCache(1000, method="GDS", numshards=1)):
+            assert cache.get("expensive") is None
+            time.sleep(0.05)
+            cache["expensive"] = numpy.zeros(400, dtype=numpy.uint8)
+            for i in range(10):
+                assert cache.get(i) is None
+                cache[i] = numpy.zeros(400, dtype=numpy.uint8)
+            # cheap entries were evicted in favor of the expensive one, despite it being least recently used
+            assert "expensive" in cache and 9 in cache and 0 not in cache
+            assert cache.stats()["evictions"] == 9
+
+        expectation = uproot.open("tests/samples/HZZ.root")["events"].arrays(["Muon_*", "Jet_*"])
+        arrays = uproot.open("tests/samples/HZZ.root")["events"].arrays(["Muon_*", "Jet_*"], cache=uproot.ThreadSafeArrayCache("100 kB", method="GDS"))
+        for name in expectation:
+            assert arrays[name].tolist() == expectation[name].tolist()
+
+    def test_compressed(self):
+        import numpy
+        expectation = uproot.open("tests/samples/HZZ.root")["events"].arrays(["Muon_*", "Jet_*"])
+        tree = uproot.open("tests/samples/HZZ.root")["events"]
+        for codec in (None, "zlib"):
+            basketcache = uproot.CompressedArrayCache("10 MB", codec=codec)
+            plain = uproot.ArrayCache("10 MB")
+            tree.arrays(["Muon_*", "Jet_*"], basketcache=basketcache)
+            tree.arrays(["Muon_*", "Jet_*"], basketcache=plain)
+            assert basketcache.stats()["currbytes"] < plain.stats()["currbytes"]
+            arrays = tree.arrays(["Muon_*", "Jet_*"], basketcache=basketcache)
+            assert basketcache.stats()["hits"] > 0
+            for name in expectation:
+                assert arrays[name].tolist() == expectation[name].tolist()
+
+        cache = uproot.CompressedArrayCache(1000, codec="zlib")
+        cache["a"] = numpy.arange(12, dtype=">f8").reshape(3, 4)
+        assert cache["a"].dtype == numpy.dtype(">f8") and cache["a"].tolist() == numpy.arange(12).reshape(3, 4).tolist()
+        cache["b"] = "not an array"
+        assert cache["b"] == "not an array"
+
+        # overwriting a key with different contents of the same size must not keep the old entry
+        cache["c"] = numpy.arange(4, dtype=numpy.int32)
+        assert cache["c"].tolist() == [0, 1, 2, 3]
+        cache["c"] = numpy.array([9, 8, 7, 6], dtype=numpy.int32)
+        assert cache["c"].tolist() == [9, 8, 7, 6]
+        cache["c"] = numpy.array([1.5, 2.5], dtype=numpy.float64)
+        assert cache["c"].dtype == numpy.dtype(numpy.float64) and cache["c"].tolist() == [1.5, 2.5]
@@ -2,6 +2,8 @@
 
 # BSD 3-Clause License; see https://github.com/scikit-hep/uproot/blob/master/LICENSE
 
+from zlib import compress as zlib_compress, decompress as zlib_decompress
+
 import pytest
 try:
     import lzma
@@ -82,3 +84,92 @@ class Test(object):
         assert uproot.open("tests/samples/HZZ-lzma.root")["events"].array("Electron_Px").tolist() == array
         assert uproot.open("tests/samples/HZZ-lz4.root")["events"].array("Electron_Px").tolist() == array
         assert uproot.open("tests/samples/HZZ-zstd.root")["events"].array("Electron_Px").tolist() == array
+
+    def test_compression_multiblock(self, monkeypatch):
+        import struct
+        import zlib
+        import numpy
+        import xxhash
+        import lz4.block
+        import uproot.source.compressed
+        from uproot.source.cursor import Cursor
+
+        class ArraySource(object):
+            def __init__(self, data):
+                self._data = numpy.frombuffer(data, dtype=numpy.uint8)
+            def data(self, start, stop, dtype=None):
+                return self._data[start:stop] if dtype is None else self._data[start:stop].view(dtype)
+
+        def block(algo, uncompressed):
+            compressed = {b"ZL": zlib.compress, b"XZ": lzma.compress, b"L4": lambda x: lz4.block.compress(x, store_size=False), b"ZS": zstandard.ZstdCompressor().compress}[algo](uncompressed)
+            if algo == b"L4":
+                compressed = struct.pack(">Q", xxhash.xxh64(compressed).intdigest()) + compressed
+            c, u = len(compressed), len(uncompressed)
+            return algo + struct.pack("BBBBBBB", 8, c & 0xff, (c >> 8) & 0xff, c >> 16, u & 0xff, (u >> 8) & 0xff, u >> 16) + compressed
+
+        expectation = numpy.arange(500000, dtype=numpy.int32).tobytes()
+        pieces = [expectation[i : i + 300000] for i in range(0, len(expectation), 300000)]
+        # small windows exercise the bounded decompression of each block into its slice
+        monkeypatch.setattr(uproot.source.compressed.Compression, "_window", 1000)
+        for algos in ([b"ZL"], [b"XZ"], [b"L4"], [b"ZS"], [b"ZL", b"XZ", b"L4", b"ZS"]):
+            data = b"".join(block(algos[i % len(algos)], piece) for i, piece in enumerate(pieces))
+            source = uproot.source.compressed.CompressedSource(uproot.source.compressed.Compression(101), ArraySource(data), Cursor(0), len(data), len(expectation))
+            assert source.data(0, len(expectation)).tobytes() == expectation
+
+        # a block that decompresses to fewer bytes than its header says
+        for algo in (b"ZL", b"XZ", b"ZS"):
+            data = block(algo, pieces[0]) + block(algo, pieces[1])
+            data = data[:6] + struct.pack("B", data[6] + 1) + data[7:]
+            source = uproot.source.compressed.CompressedSource(uproot.source.compressed.Compression(101), ArraySource(data), Cursor(0), len(data), len(pieces[0]) + len(pieces[1]) + 1)
+            with pytest.raises(ValueError):
+                source.data(0, 10)
+
+    def test_deflate_backends(self):
+        import uproot._deflate
+        expectation = uproot.open("tests/samples/Zmumu-uncompressed.root")["events"].array("px1").tolist()
+        data = b"".join(str(i).encode("ascii") for i in range(100000))
+        try:
+            for name in uproot._deflate.available():
+                backend = uproot._deflate.select(name)
+                assert backend.name == name
+                for level in (1, 4, 9):
+                    assert zlib_decompress(backend.compress(data, level)) == data
+                assert bytes(backend.decompress(zlib_compress(data), len(data))) == data
+                assert uproot.open("tests/samples/Zmumu-zlib.root")["events"].array("px1").tolist() == expectation
+            with pytest.raises(ValueError):
+                uproot._deflate.select("nonexistent")
+        finally:
+            uproot._deflate.select()
+
+    def test_zstd_contexts(self):
+        import threading
+        import uproot.source.compressed
+        assert uproot.source.compressed._zstddecompressor() is uproot.source.compressed._zstddecompressor()
+        other = []
+        thread = threading.Thread(target=lambda: other.append(uproot.source.compressed._zstddecompressor()))
+        thread.start()
+        thread.join()
+        assert other[0] is not uproot.source.compressed._zstddecompressor()
+
+        array = uproot.open("tests/samples/HZZ-uncompressed.root")["events"].array("Electron_Px").tolist()
+        assert uproot.open("tests/samples/HZZ-zstd.root")["events"].array("Electron_Px").tolist() == array
+
+    def test_zstd_dictionary(self):
+        import numpy
+        import uproot.source.compressed
+        from uproot.source.cursor import Cursor
+        samples = [("event {0} muon {1} jet {2}".format(i, i % 7, i % 13) * 5).encode("ascii") for i in range(1000)]
+        dictionary = zstandard.train_dictionary(1024, samples)
+        data = samples[123]
+        compressed = zstandard.ZstdCompressor(dict_data=dictionary).compress(data)
+        c, u = len(compressed), len(data)
+        block = numpy.frombuffer(b"ZS\x01" + bytes(bytearray([c & 0xff, (c >> 8) & 0xff, c >> 16, u & 0xff, (u >> 8) & 0xff, u >> 16])) + compressed, dtype=numpy.uint8)
+
+        class ArraySource(object):
+            def data(self, start, stop, dtype=None):
+                return block[start:stop]
+
+        compression = uproot.source.compressed.Compression(505, zstddict=dictionary.as_bytes())
+        assert compression.copy(uproot.const.kZSTD).zstddict is compression.zstddict
+        source = uproot.source.compressed.CompressedSource(compression, ArraySource(), Cursor(0), len(block), len(data))
+        assert source.data(0, len(data)).tobytes() == data
@@ -14,7 +14,7 @@ URL = "http://scikit-hep.org/uproot/examples/{FILE}.root".format(FILE=FILE)
 URL_AUTH = "http://scikit-hep.org/uproot/authentication/{FILE}.root".format(FILE=FILE)
 AUTH = ("scikit-hep", "uproot")
 
-def mock_get_local_instead_of_http(url="", headers={}, auth=None, **kwargs):
+def mock_get_local_instead_of_http(session, url="", headers={}, auth=None, **kwargs):
     class MockResponse:
         def __init__(self, status_code):
             self.status_code = status_code
@@ -38,7 +38,7 @@ def mock_get_local_instead_of_http(url="", headers={}, auth=None, **kwargs):
     elif url == URL_AUTH:
         return MockResponse(401)
 
-@mock.patch("requests.get", mock_get_local_instead_of_http)
+@mock.patch("requests.Session.get", mock_get_local_instead_of_http)
 class Test(object):
     def test_no_auth_needed_no_auth(self):
         f = uproot.open(URL)
@@ -59,3 +59,150 @@ class Test(object):
     def test_auth_needed_wrong_auth(self):
         with pytest.raises(HTTPError):
             f = uproot.open(URL_AUTH, httpsource={"auth": ("", "")})
+
+class RangeServer(object):
+    def __init__(self, mode):
+        try:
+            from http.server import HTTPServer, BaseHTTPRequestHandler
+            from socketserver import ThreadingMixIn
+        except ImportError:
+            from BaseHTTPServer import HTTPServer, BaseHTTPRequestHandler
+            from SocketServer import ThreadingMixIn
+        import threading
+
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+
+            def log_message(self, *args):
+                pass
+
+            def do_GET(self):
+                server.numrequests += 1
+                server.connections.add(self.client_address)
+                with open("tests/samples" + self.path, "rb") as f:
+                    data = f.read()
+
+                header = self.headers.get("Range")
+                if header is None or mode == "ignore":
+                    self.send_response(200)
+                    self.send_header("Content-Length", str(len(data)))
+                    self.end_headers()
+                    self.wfile.write(data)
+                    return
+
+                ranges = []
+                for x in header[len("bytes="):].split(","):
+                    start, stop = x.strip().split("-")
+                    ranges.append((int(start), min(int(stop), len(data) - 1)))
+
+                if len(ranges) == 1 or mode == "first":
+                    start, stop = ranges[0]
+                    self.send_response(206)
+                    self.send_header("Content-Range", "bytes {0}-{1}/{2}".format(start, stop, len(data)))
+                    self.send_header("Content-Length", str(stop + 1 - start))
+                    self.end_headers()
+                    self.wfile.write(data[start : stop + 1])
+                    return
+
+                body = []
+                for start, stop in ranges:
+                    body.append(b"--BOUNDARY\r\nContent-Type: application/octet-stream\r\n")
+                    body.append("Content-Range: bytes {0}-{1}/{2}\r\n\r\n".format(start, stop, len(data)).encode("ascii"))
+                    body.append(data[start : stop + 1])
+                    body.append(b"\r\n")
+                body.append(b"--BOUNDARY--\r\n")
+                body = b"".join(body)
+                self.send_response(206)
+                self.send_header("Content-Type", "multipart/byteranges; boundary=BOUNDARY")
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+        class Server(ThreadingMixIn, HTTPServer):
+            daemon_threads = True
+
+        self.numrequests = 0
+        self.connections = set()
+        self.httpd = Server(("127.0.0.1", 0), Handler)
+        self.url = "http://127.0.0.1:{0}".format(self.httpd.server_address[1])
+        self.thread = threading.Thread(target=self.httpd.serve_forever)
+        self.thread.daemon = True
+        self.thread.start()
+
+    def close(self):
+        self.httpd.shutdown()
+        self.httpd.server_close()
+
+class TestMultiRange(object):
+    def read(self, mode, branches=["Muon_*", "Jet_*"], **httpsource):
+        options = {"chunkbytes": 1024, "gapbytes": 0, "limitbytes": "10 MB", "parallel": 1}
+        options.update(httpsource)
+        server = RangeServer(mode)
+        try:
+            tree = uproot.open(server.url + "/HZZ.root", httpsource=options)["events"]
+            before = server.numrequests
+            arrays = tree.arrays(branches)
+        finally:
+            server.close()
+        return arrays, server.numrequests - before
+
+    def test_multipart(self):
+        branches = ["Muon_Px", "Jet_Px", "MET_px", "Photon_E", "NElectron"]
+        expectation = uproot.open("tests/samples/HZZ.root")["events"].arrays(branches)
+        single, numsingle = self.read("multipart", branches, maxranges=1)
+        multi, nummulti = self.read("multipart", branches)
+        for name in expectation:
+            assert single[name].tolist() == expectation[name].tolist()
+            assert multi[name].tolist() == expectation[name].tolist()
+        assert nummulti == 1 and numsingle > 1
+
+    def test_multipart_parallel(self):
+        expectation = uproot.open("tests/samples/HZZ.root")["events"].arrays(["Muon_*", "Jet_*"])
+        arrays, num = self.read("multipart", parallel=4)
+        for name in expectation:
+            assert arrays[name].tolist() == expectation[name].tolist()
+
+    def test_fallback_first_range_only(self):
+        expectation = uproot.open("tests/samples/HZZ.root")["events"].arrays(["Muon_*", "Jet_*"])
+        arrays, num = self.read("first")
+        for name in expectation:
+            assert arrays[name].tolist() == expectation[name].tolist()
+
+    def test_fallback_whole_file(self):
+        expectation = uproot.open("tests/samples/HZZ.root")["events"].arrays(["Muon_*", "Jet_*"])
+        arrays, num = self.read("ignore", chunkbytes="1 MB")
+        for name in expectation:
+            assert arrays[name].tolist() == expectation[name].tolist()
+
+    def test_connection_reuse(self):
+        expectation = uproot.open("tests/samples/HZZ.root")["events"].arrays(["Muon_*", "Jet_*"])
+        for session in (None, "shared"):
+            server = RangeServer("multipart")
+            try:
+                tree = uproot.open(server.url + "/HZZ.root", httpsource={"chunkbytes": 1024, "gapbytes": 0, "maxranges": 1, "parallel": 4, "session": session})["events"]
+                arrays = tree.arrays(["Muon_*", "Jet_*"])
+                assert tree._context.source.threadlocal()._session is tree._context.source._session
+            finally:
+                server.close()
+            for name in expectation:
+                assert arrays[name].tolist() == expectation[name].tolist()
+            assert len(server.connections) <= 4 < server.numrequests
+
+class TestDiskCache(object):
+    def test_second_process(self, tmpdir):
+        expectation = uproot.open("tests/samples/HZZ.root")["events"].arrays(["Muon_*", "Jet_*"])
+        numrequests = []
+        for parallel in (4, False):
+            server = RangeServer("multipart")
+            try:
+                options = {"chunkbytes": 1024, "gapbytes": 0, "parallel": parallel, "diskcache": str(tmpdir)}
+                arrays = uproot.open(server.url + "/HZZ.root", httpsource=options)["events"].arrays(["Muon_*", "Jet_*"])
+            finally:
+                server.close()
+            numrequests.append(server.numrequests)
+            for name in expectation:
+                assert arrays[name].tolist() == expectation[name].tolist()
+        # only the header, which identifies the file, is fetched again
+        assert numrequests[0] > 1 and numrequests[1] == 1
@@ -0,0 +1,61 @@
+#!/usr/bin/env python
+
+# BSD 3-Clause License; see https://github.com/scikit-hep/uproot/blob/master/LICENSE
+
+# asynchronous comprehensions and asyncio.run need Python 3.7; tests/conftest.py does not collect this module on older versions
+
+import sys
+
+import pytest
+pytest.importorskip("requests")
+
+import uproot
+from tests.test_http import RangeServer
+
+@pytest.mark.skipif(sys.version_info < (3, 7), reason="requires Python 3.7 or later")
+class TestAsync(object):
+    def test_arrays_async(self):
+        pytest.importorskip("aiohttp")
+        import asyncio
+        expectation = uproot.open("tests/samples/HZZ.root")["events"].arrays(["Muon_*", "Jet_*"])
+        for mode in ("multipart", "first", "ignore"):
+            server = RangeServer(mode)
+            try:
+                options = dict(uproot.AsyncHTTPSource.defaults, chunkbytes=1024, gapbytes=0, maxranges=8)
+                tree = uproot.http(server.url + "/HZZ.root", httpsource=lambda path: uproot.AsyncHTTPSource(path, **options))["events"]
+                arrays = asyncio.run(tree.arrays_async(["Muon_*", "Jet_*"]))
+                # nothing was left for arrays() to read synchronously
+                before = server.numrequests
+                again = tree.arrays(["Muon_*", "Jet_*"])
+                assert server.numrequests == before
+            finally:
+                server.close()
+            assert tree._context.source._executor is None
+            for name in expectation:
+                assert arrays[name].tolist() == expectation[name].tolist()
+                assert again[name].tolist() == expectation[name].tolist()
+
+    def test_iterate_async(self):
+        pytest.importorskip("aiohttp")
+        import asyncio
+        expectation = uproot.open("tests/samples/foriter.root")["foriter"].array("data")
+        server = RangeServer("multipart")
+        try:
+            options = dict(uproot.AsyncHTTPSource.defaults, chunkbytes=256)
+            tree = uproot.http(server.url + "/foriter.root", httpsource=lambda path: uproot.AsyncHTTPSource(path, **options))["foriter"]
+            async def collect():
+                return [(start, stop, arrays[b"data"].tolist()) async for start, stop, arrays in tree.iterate_async("data", entrysteps=7, reportentries=True)]
+            steps = asyncio.run(collect())
+        finally:
+            server.close()
+        assert len(steps) > 1
+        for start, stop, data in steps:
+            assert data == expectation[start:stop].tolist()
+
+    def test_arrays_async_local(self):
+        import asyncio
+        expectation = uproot.open("tests/samples/HZZ.root")["events"].arrays(["Muon_*", "Jet_*"])
+        tree = uproot.open("tests/samples/HZZ.root", localsource=lambda path: uproot.FileSource(path, **uproot.FileSource.defaults))["events"]
+        arrays = asyncio.run(tree.arrays_async(["Muon_*", "Jet_*"]))
+        for name in expectation:
+            assert arrays[name].tolist() == expectation[name].tolist()
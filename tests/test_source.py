@@ -0,0 +1,165 @@
+#!/usr/bin/env python
+
+# BSD 3-Clause License; see https://github.com/scikit-hep/uproot/blob/master/LICENSE
+
+import numpy
+import pytest
+
+import uproot
+import uproot.source.source
+
+class CountingFileSource(uproot.FileSource):
+    def __init__(self, *args, **kwds):
+        super(CountingFileSource, self).__init__(*args, **kwds)
+        self.numreads = 0
+
+    def _read(self, chunkindex):
+        self.numreads += 1
+        return super(CountingFileSource, self)._read(chunkindex)
+
+    def _readchunks(self, chunkstart, chunkstop):
+        self.numreads += 1
+        return super(CountingFileSource, self)._readchunks(chunkstart, chunkstop)
+
+def opener(**kwds):
+    options = dict(uproot.FileSource.defaults)
+    options["parallel"] = None
+    options.update(kwds)
+    return lambda path: CountingFileSource(path, **options)
+
+class Test(object):
+    def test_coalesce(self):
+        assert uproot.source.source.coalesce([]) == []
+        assert uproot.source.source.coalesce([(10, 20), (0, 5)]) == [(0, 5), (10, 20)]
+        assert uproot.source.source.coalesce([(10, 20), (0, 5)], gapbytes=5) == [(0, 20)]
+        assert uproot.source.source.coalesce([(0, 10), (5, 8), (8, 30)]) == [(0, 30)]
+        assert uproot.source.source.coalesce([(0, 10), (10, 20), (20, 30)], maxbytes=20) == [(0, 20), (20, 30)]
+        assert uproot.source.source.coalesce([(0, 10), (10, 10)]) == [(0, 10)]
+
+    def test_readplan_arrays(self):
+        expectation = uproot.open("tests/samples/HZZ.root")["events"].arrays(["Muon_*", "Jet_*"])
+
+        tree = uproot.open("tests/samples/HZZ.root", localsource=opener(gapbytes=0))["events"]
+        source = tree._context.source
+        before = source.numreads
+        arrays = tree.arrays(["Muon_*", "Jet_*"])
+        unplanned = source.numreads - before
+        for name in expectation:
+            assert arrays[name].tolist() == expectation[name].tolist()
+
+        tree = uproot.open("tests/samples/HZZ.root", localsource=opener(gapbytes="1 MB", limitbytes="10 MB"))["events"]
+        source = tree._context.source
+        before = source.numreads
+        arrays = tree.arrays(["Muon_*", "Jet_*"])
+        planned = source.numreads - before
+        for name in expectation:
+            assert arrays[name].tolist() == expectation[name].tolist()
+
+        assert planned < unplanned
+
+    def test_readplan_iterate(self):
+        expectation = uproot.open("tests/samples/foriter.root")["foriter"].array("data")
+        tree = uproot.open("tests/samples/foriter.root", localsource=opener())["foriter"]
+        for start, stop, arrays in tree.iterate("data", entrysteps=7, reportentries=True):
+            assert arrays[b"data"].tolist() == expectation[start:stop].tolist()
+
+    def test_readplan_parallel(self):
+        expectation = uproot.open("tests/samples/HZZ.root")["events"].arrays(["Muon_*", "Jet_*"])
+        tree = uproot.open("tests/samples/HZZ.root", localsource=lambda path: uproot.FileSource(path, **uproot.FileSource.defaults))["events"]
+        arrays = tree.arrays(["Muon_*", "Jet_*"])
+        for name in expectation:
+            assert arrays[name].tolist() == expectation[name].tolist()
+
+    def test_vectored_filesource(self):
+        expectation = uproot.open("tests/samples/HZZ.root")["events"].arrays(["Muon_*", "Jet_*"])
+        for vectored in (False, True):
+            for parallel in (None, 4):
+                options = dict(uproot.FileSource.defaults)
+                options["vectored"] = vectored
+                options["parallel"] = parallel
+                tree = uproot.open("tests/samples/HZZ.root", localsource=lambda path: uproot.FileSource(path, **options))["events"]
+                source = tree._context.source
+                assert (source.threadlocal() is source) == (vectored and source._vectored)
+                arrays = tree.arrays(["Muon_*", "Jet_*"])
+                for name in expectation:
+                    assert arrays[name].tolist() == expectation[name].tolist()
+                source.close()
+
+    def test_vectored_executor(self):
+        futures = pytest.importorskip("concurrent.futures")
+        expectation = uproot.open("tests/samples/HZZ.root")["events"].arrays(["Muon_*", "Jet_*"])
+        tree = uproot.open("tests/samples/HZZ.root", localsource=lambda path: uproot.FileSource(path, **uproot.FileSource.defaults))["events"]
+        executor = futures.ThreadPoolExecutor(8)
+        arrays = tree.arrays(["Muon_*", "Jet_*"], executor=executor)
+        for name in expectation:
+            assert arrays[name].tolist() == expectation[name].tolist()
+
+    def test_diskcache(self, tmpdir):
+        import os
+        import uproot.source.diskcache
+        cache = uproot.source.diskcache.DiskCache(str(tmpdir), limitbytes=1000)
+        cache["a"] = numpy.arange(100, dtype=numpy.uint8)
+        assert cache["a"].tolist() == list(range(100))
+        assert "a" in cache and "b" not in cache
+        with pytest.raises(KeyError):
+            cache["b"]
+        os.utime(os.path.join(str(tmpdir), "a"), (0, 0))
+        for name in "bcdefghijk":
+            cache[name] = numpy.zeros(100, dtype=numpy.uint8)
+        # the least recently used entry is evicted first
+        assert "a" not in cache and "k" in cache
+        assert uproot.source.diskcache.DiskCache(str(tmpdir))._numbytes <= 1000
+
+    def test_singlechunk_view(self):
+        source = uproot.FileSource("tests/samples/HZZ.root", **dict(uproot.FileSource.defaults, chunkbytes=1024, parallel=None))
+        whole = numpy.fromfile("tests/samples/HZZ.root", dtype=numpy.uint8)
+        one = source.data(1030, 1040)
+        assert one.tolist() == whole[1030:1040].tolist()
+        assert numpy.shares_memory(one, source.cache[1])
+        assert source.data(1028, 1036, numpy.dtype(">i4")).tolist() == whole[1028:1036].view(">i4").tolist()
+        two = source.data(1020, 1030)
+        assert two.tolist() == whole[1020:1030].tolist()
+        assert not numpy.shares_memory(two, source.cache[1])
+
+    def test_adaptive(self):
+        expectation = uproot.open("tests/samples/HZZ.root")["events"].arrays(["Muon_*", "Jet_*"])
+        numreads = {}
+        for adaptive in (False, True):
+            tree = uproot.open("tests/samples/HZZ.root", localsource=opener(chunkbytes=1024, gapbytes=0, limitbytes="10 MB", adaptive=adaptive))["events"]
+            source = tree._context.source
+            arrays = tree.arrays(["Muon_*", "Jet_*"])
+            numreads[adaptive] = source.numreads
+            for name in expectation:
+                assert arrays[name].tolist() == expectation[name].tolist()
+        assert numreads[True] < numreads[False]
+
+    def test_adaptive_readahead(self):
+        source = CountingFileSource("tests/samples/HZZ.root", **dict(uproot.FileSource.defaults, chunkbytes=1024, parallel=None, adaptive=True))
+        whole = numpy.fromfile("tests/samples/HZZ.root", dtype=numpy.uint8)
+        for i in range(64):
+            assert source.data(i * 1024, i * 1024 + 10).tolist() == whole[i * 1024 : i * 1024 + 10].tolist()
+        # 1 + 2 + 4 + 8 + 16 + 32 + 1 chunks
+        assert source.numreads == 7
+        source.data(200 * 1024, 200 * 1024 + 10)
+        assert source._readahead == 1
+
+    def test_madvise(self):
+        import mmap
+        class RecordingMemmapSource(uproot.MemmapSource):
+            def _madvise(self, advice, ranges):
+                self.advice.append(advice)
+                super(RecordingMemmapSource, self)._madvise(advice, ranges)
+
+        def opener(path):
+            out = RecordingMemmapSource(path)
+            out.advice = []
+            return out
+
+        expectation = uproot.open("tests/samples/foriter.root")["foriter"].array("data")
+        tree = uproot.open("tests/samples/foriter.root", localsource=opener)["foriter"]
+        for start, stop, arrays in tree.iterate("data", entrysteps=7, reportentries=True):
+            assert arrays[b"data"].tolist() == expectation[start:stop].tolist()
+        advice = tree._context.source.advice
+        assert advice[0] == getattr(mmap, "MADV_SEQUENTIAL", None)
+        assert getattr(mmap, "MADV_WILLNEED", None) in advice
+        assert getattr(mmap, "MADV_DONTNEED", None) in advice
@@ -3,6 +3,7 @@
 # BSD 3-Clause License; see https://github.com/scikit-hep/uproot/blob/master/LICENSE
 
 import os
+import pickle
 from collections import namedtuple
 
 import numpy
@@ -675,3 +676,233 @@ class Test(object):
         t = uproot.open("tests/samples/sample-5.23.02-zlib.root")["sample"]
         assert list(t.mempartitions(500)) == [(0, 2), (2, 4), (4, 6), (6, 8), (8, 10), (10, 12), (12, 14), (14, 16), (16, 18), (18, 20), (20, 22), (22, 24), (24, 26), (26, 28), (28, 30)]
         assert [sum(y.nbytes for y in x.values()) for x in t.iterate(entrysteps="0.5 kB")] == [693, 865, 822, 779, 951, 695, 867, 824, 781, 953, 695, 867, 824, 781, 953]
+
+    def test_keyheaders(self):
+        for localsource in (uproot.MemmapSource.defaults, lambda path: uproot.FileSource(path, **dict(uproot.FileSource.defaults, chunkbytes=1024))):
+            for name in ("tests/samples/HZZ.root", "tests/samples/sample-6.10.05-zlib.root"):
+                tree = uproot.open(name, localsource=localsource)[b"events" if "HZZ" in name else b"sample"]
+                for branch in tree.values():
+                    keys = list(branch._threadsafe_iterate_keys(None, True))
+                    keyheaders = branch._threadsafe_keyheaders()
+                    assert keyheaders["fObjlen"].tolist() == [key._fObjlen for key in keys]
+                    assert keyheaders["fNbytes"].tolist() == [key._fNbytes for key in keys]
+                    assert keyheaders["fSeekKey"].tolist() == [key._fSeekKey for key in keys]
+                    assert keyheaders["border"].tolist() == [key.border for key in keys]
+                    assert branch.uncompressedbytes() == sum(key._fObjlen for key in keys)
+                    assert branch.compressedbytes() == sum(key._fNbytes - key._fKeylen for key in keys)
+
+    def test_keyheaders_partial(self, monkeypatch):
+        # reading a few entries parses only the key headers of the baskets that hold them
+        def fail(self, numgood):
+            raise AssertionError("a partial read should not parse every key header")
+        monkeypatch.setattr(uproot.tree.TBranchMethods, "_readkeyheaders", fail)
+        branch = uproot.open("tests/samples/foriter.root")["foriter"]["data"]
+        keycache = {}
+        assert branch.array(entrystart=3, entrystop=4, keycache=keycache).tolist() == [3]
+        assert len(keycache) == 1
+        assert branch._keyheaders is None
+        monkeypatch.undo()
+
+        # whole-branch summaries parse them in bulk and fill the keycache
+        keycache = {}
+        assert branch.uncompressedbytes(keycache) == sum(key._fObjlen for key in branch._threadsafe_iterate_keys(None, False))
+        assert branch._keyheaders is not None and len(keycache) == branch.numbaskets
+
+    def test_sidecar(self, tmpdir, monkeypatch):
+        expectation = uproot.open("tests/samples/HZZ.root")["events"].arrays(["Muon_*", "Jet_*"])
+        tree = uproot.open("tests/samples/HZZ.root", sidecar=str(tmpdir))["events"]
+        tree.arrays(["Muon_*", "Jet_*"])
+        headers = tree["Muon_Px"]._threadsafe_keyheaders()
+
+        # a fresh process (here, a fresh open) reads no key headers at all
+        def fail(self, numgood):
+            raise AssertionError("key headers should have come from the sidecar index")
+        monkeypatch.setattr(uproot.tree.TBranchMethods, "_readkeyheaders", fail)
+        tree = uproot.open("tests/samples/HZZ.root", sidecar=str(tmpdir))["events"]
+        arrays = tree.arrays(["Muon_*", "Jet_*"], keycache={})
+        for name in expectation:
+            assert arrays[name].tolist() == expectation[name].tolist()
+        assert tree["Muon_Px"]._threadsafe_keyheaders().tolist() == headers.tolist()
+        monkeypatch.undo()
+
+        # an index that does not match the TBranch's basket positions is ignored
+        branch = uproot.open("tests/samples/HZZ.root")["events"]["Muon_Px"]
+        index = uproot.sidecar.SidecarIndex(str(tmpdir))
+        stale = headers.copy()
+        stale["fSeekKey"] += 1
+        index.put(branch._context.uuid, branch._context.treename, branch.name, stale)
+        tree = uproot.open("tests/samples/HZZ.root", sidecar=index)["events"]
+        assert tree["Muon_Px"]._threadsafe_keyheaders().tolist() == headers.tolist()
+        assert tree.array("Muon_Px").tolist() == expectation[b"Muon_Px"].tolist()
+
+    def test_iterate_lookahead(self):
+        expectation = uproot.open("tests/samples/HZZ.root")["events"].arrays(["Muon_*", "Jet_*"])
+        tree = uproot.open("tests/samples/HZZ.root")["events"]
+        for lookahead in (1, 3, "100 kB", "1 B"):
+            for blocking in (True, False):
+                entries = []
+                for start, stop, arrays in tree.iterate(["Muon_*", "Jet_*"], entrysteps=300, reportentries=True, blocking=blocking, lookahead=lookahead):
+                    if not blocking:
+                        arrays = arrays()
+                    entries.append((start, stop))
+                    for name in expectation:
+                        assert arrays[name].tolist() == expectation[name][start:stop].tolist()
+                assert entries == [(start, min(start + 300, tree.numentries)) for start in range(0, tree.numentries, 300)]
+
+        # upcoming steps are read while the current one is in use
+        read = []
+        original = uproot.tree.TTreeMethods._preload
+        def recording(self, branches, entrystart, entrystop, cache=None):
+            read.append(entrystart)
+            return original(self, branches, entrystart, entrystop, cache)
+        tree._preload = recording.__get__(tree)
+        iterator = tree.iterate(["Muon_*"], entrysteps=300, lookahead=2)
+        next(iterator)
+        import time
+        for i in range(100):
+            if len(read) == 3:
+                break
+            time.sleep(0.01)
+        assert read == [0, 300, 600]
+        iterator.close()
+
+        with pytest.raises(ValueError):
+            list(tree.iterate(["Muon_*"], lookahead=-1))
+
+    def test_processpool(self, tmpdir):
+        futures = pytest.importorskip("concurrent.futures")
+        pytest.importorskip("multiprocessing.shared_memory")
+        expectation = uproot.open("tests/samples/HZZ.root")["events"].arrays(["Muon_*", "Jet_*", "NMuon"])
+        tree = uproot.open("tests/samples/HZZ.root")["events"]
+        with futures.ProcessPoolExecutor(2) as executor:
+            arrays = tree.arrays(["Muon_*", "Jet_*", "NMuon"], executor=executor)
+            for name in expectation:
+                assert arrays[name].tolist() == expectation[name].tolist()
+
+            for start, stop, arrays in tree.iterate(["Muon_*", "Jet_*"], entrysteps=500, reportentries=True, executor=executor):
+                for name in arrays:
+                    assert arrays[name].tolist() == expectation[name][start:stop].tolist()
+
+            assert tree.array("Muon_Px", numpy.dtype(">f8"), executor=executor).tolist() == expectation[b"Muon_Px"].tolist()
+            assert uproot.open("tests/samples/simple.root")["tree"].array("three", executor=executor).tolist() == [b"uno", b"dos", b"tres", b"quatro"]
+
+            # workers open the file with the options the parent used
+            tree = uproot.open("tests/samples/HZZ.root", sidecar=str(tmpdir))["events"]
+            assert tree.array("Muon_Px", executor=executor).tolist() == expectation[b"Muon_Px"].tolist()
+            worker = uproot._process._tree(tree._context.sourcepath, pickle.dumps(tree._context.openoptions), tree._context.treename)
+            assert worker._context.sidecar is not None and worker._context.sidecar.directory == str(tmpdir)
+
+            tree = uproot.open("tests/samples/HZZ.root", localsource=lambda path: uproot.FileSource(path, **uproot.FileSource.defaults))["events"]
+            with pytest.raises(TypeError):
+                tree.array("Muon_Px", executor=executor)
+
+    def test_processpool_fork(self, tmpdir):
+        futures = pytest.importorskip("concurrent.futures")
+        pytest.importorskip("multiprocessing.shared_memory")
+        import multiprocessing
+        if "fork" not in multiprocessing.get_all_start_methods():
+            pytest.skip("no fork start method")
+
+        # a basket of more than 16 MB is compressed in several blocks, which are decompressed in a thread pool
+        path = os.path.join(str(tmpdir), "multiblock.root")
+        with uproot.recreate(path, compression=uproot.ZLIB(1)) as f:
+            f["t"] = uproot.newtree({"x": "f8"})
+            f["t"].extend({"x": numpy.arange(2500000, dtype="f8")})
+        tree = uproot.open(path)["t"]
+        expectation = tree.array("x").tolist()
+        assert uproot.source.compressed.CompressedSource._pool is not None
+
+        # forked workers must not wait on the copy of that pool, whose threads exist only in this process
+        with futures.ProcessPoolExecutor(2, mp_context=multiprocessing.get_context("fork")) as executor:
+            assert tree.array("x", executor=executor).tolist() == expectation
+
+    def test_selection(self):
+        tree = uproot.open("tests/samples/HZZ.root")["events"]
+        expectation = tree.arrays(["NMuon", "Muon_Px", "Jet_E", "MET_px"])
+        mask = expectation[b"NMuon"] > 2
+        arrays = tree.arrays(["Muon_Px", "Jet_E", "MET_px", "NMuon"], selection="NMuon > 2")
+        for name in expectation:
+            assert arrays[name].tolist() == expectation[name][mask].tolist()
+        for start, stop, arrays in tree.iterate(["Muon_Px"], entrysteps=500, reportentries=True, selection="(NMuon > 1) & (numpy.absolute(MET_px) < 10)"):
+            mask = (expectation[b"NMuon"][start:stop] > 1) & (numpy.absolute(expectation[b"MET_px"][start:stop]) < 10)
+            assert arrays[b"Muon_Px"].tolist() == expectation[b"Muon_Px"][start:stop][mask].tolist()
+        assert tree.arrays(["Muon_Px"], selection="NMuon > 100")[b"Muon_Px"].tolist() == []
+        assert tree.arrays(["Muon_Px"], selection="NMuon > 1", flatten=True)[b"Muon_Px"].tolist() == expectation[b"Muon_Px"][expectation[b"NMuon"] > 1].flatten().tolist()
+        with pytest.raises(ValueError):
+            tree.arrays(["Muon_Px"], selection="NMuon")
+
+        # only baskets with passing entries are read
+        tree = uproot.open("tests/samples/sample-6.10.05-zlib.root")["sample"]
+        read = []
+        original = uproot.tree.TBranchMethods._basket
+        def recording(self, i, *args):
+            read.append((self.name, i))
+            return original(self, i, *args)
+        uproot.tree.TBranchMethods._basket = recording
+        try:
+            arrays = tree.arrays(["i4", "f8"], selection="i4 < -12")
+        finally:
+            uproot.tree.TBranchMethods._basket = original
+        assert arrays[b"f8"].tolist() == tree.array("f8")[:3].tolist()
+        assert [i for name, i in read if name == b"f8"] == [0]
+
+    def test_zonemap(self, tmpdir):
+        tree = uproot.open("tests/samples/sample-6.10.05-zlib.root", sidecar=str(tmpdir))["sample"]
+        zonemap = tree["i4"].zonemap()
+        assert zonemap["fEntryStart"].tolist() == [0, 7, 14, 21, 28]
+        assert zonemap["min"].tolist() == [-15, -8, -1, 6, 13]
+        assert zonemap["max"].tolist() == [-9, -2, 5, 12, 14]
+        assert zonemap["numzero"].tolist() == [0, 0, 1, 0, 0]
+        assert tree["ai4"].zonemap()["numitems"].tolist()[:2] == [6, 6]
+        with pytest.raises(ValueError):
+            tree["str"].zonemap()
+
+        # a fresh open takes the zone map from the sidecar index and skips baskets that cannot pass
+        tree = uproot.open("tests/samples/sample-6.10.05-zlib.root", sidecar=str(tmpdir))["sample"]
+        expectation = uproot.open("tests/samples/sample-6.10.05-zlib.root")["sample"].arrays(["i4", "f8"])
+        read = []
+        original = uproot.tree.TBranchMethods._basket
+        def recording(self, i, *args):
+            read.append((self.name, i))
+            return original(self, i, *args)
+        uproot.tree.TBranchMethods._basket = recording
+        try:
+            arrays = tree.arrays(["f8"], selection="(i4 >= 7) & (i4 < 10)")
+        finally:
+            uproot.tree.TBranchMethods._basket = original
+        mask = (expectation[b"i4"] >= 7) & (expectation[b"i4"] < 10)
+        assert arrays[b"f8"].tolist() == expectation[b"f8"][mask].tolist()
+        assert [i for name, i in read if name == b"i4"] == [3]
+
+        for selection in ("i4 > 100", "i4 != 0", "(i4 == 0) | (i4 == 14)", "(-3 <= i4) & (i4 < 2)"):
+            mask = eval(selection, {}, {"i4": expectation[b"i4"]})
+            assert tree.arrays(["f8"], selection=selection)[b"f8"].tolist() == expectation[b"f8"][mask].tolist()
+
+    def test_take(self):
+        tree = uproot.open("tests/samples/HZZ.root")["events"]
+        expectation = tree.arrays(["Muon_Px", "NMuon", "MET_px"])
+        indices = [2000, 5, 5, 17, -1, 1000, 3]
+        arrays = tree.take(indices, ["Muon_Px", "NMuon", "MET_px"])
+        for name in expectation:
+            assert arrays[name].tolist() == expectation[name][numpy.array(indices)].tolist()
+        assert tree.take(indices, "Muon_Px", flatten=True)[b"Muon_Px"].tolist() == expectation[b"Muon_Px"][numpy.array(indices)].flatten().tolist()
+        assert tree.take([], ["Muon_Px"])[b"Muon_Px"].tolist() == []
+        with pytest.raises(IndexError):
+            tree.take([tree.numentries], ["NMuon"])
+
+        # only the baskets that contain requested entries are read, each once
+        tree = uproot.open("tests/samples/sample-6.10.05-zlib.root")["sample"]
+        expectation = tree.arrays(["i4", "str", "ai4", "Ai8"])
+        read = []
+        original = uproot.tree.TBranchMethods._basket
+        def recording(self, i, *args):
+            read.append((self.name, i))
+            return original(self, i, *args)
+        uproot.tree.TBranchMethods._basket = recording
+        try:
+            arrays = tree.take([29, 0, 1, 29], ["i4", "str", "ai4", "Ai8"])
+        finally:
+            uproot.tree.TBranchMethods._basket = original
+        for name in expectation:
+            assert arrays[name].tolist() == expectation[name][[29, 0, 1, 29]].tolist()
+        assert sorted(i for name, i in read if name == b"i4") == [0, tree["i4"].numbaskets - 1]
@@ -123,6 +123,7 @@ The same procedure sets options for uproot.XRootDSource and uproot.HTTPSource.
 
 from __future__ import absolute_import
 
+import sys
 import warnings
 warnings.warn(
     """Consider switching from 'uproot' to 'uproot4', since the new interface will become the default later this year (2020).
@@ -151,8 +152,10 @@ from uproot.source.memmap import MemmapSource
 from uproot.source.file import FileSource
 from uproot.source.xrootd import XRootDSource
 from uproot.source.http import HTTPSource
+if sys.version_info[0] > 2:
+    from uproot.source.asynchttp import AsyncHTTPSource
 
-from uproot.cache import ArrayCache, ThreadSafeArrayCache
+from uproot.cache import ArrayCache, ThreadSafeArrayCache, SpillArrayCache, CompressedArrayCache, ShardedArrayCache
 
 from uproot.interp.auto import interpret
 from uproot.interp.numerical import asdtype
@@ -184,4 +187,6 @@ from uproot.version import __version__
 # don't expose uproot.uproot; it's ugly
 del uproot
 
-__all__ = ["open", "xrootd", "http", "iterate", "numentries", "lazyarray", "lazyarrays", "daskarray", "daskframe", "create", "recreate", "update", "ZLIB", "LZMA", "LZ4", "ZSTD", "newtree", "newbranch", "MemmapSource", "FileSource", "XRootDSource", "HTTPSource", "ArrayCache", "ThreadSafeArrayCache", "interpret", "asdtype", "asarray", "asdouble32", "asstlbitset", "asjagged", "astable", "asobj", "asgenobj", "asstring", "asdebug", "SimpleArray", "STLVector", "STLMap", "STLString", "Pointer", "pandas", "__version__"]
+__all__ = ["open", "xrootd", "http", "iterate", "numentries", "lazyarray", "lazyarrays", "daskarray", "daskframe", "create", "recreate", "update", "ZLIB", "LZMA", "LZ4", "ZSTD", "newtree", "newbranch", "MemmapSource", "FileSource", "XRootDSource", "HTTPSource", "ArrayCache", "ThreadSafeArrayCache", "SpillArrayCache", "CompressedArrayCache", "ShardedArrayCache", "interpret", "asdtype", "asarray", "asdouble32", "asstlbitset", "asjagged", "astable", "asobj", "asgenobj", "asstring", "asdebug", "SimpleArray", "STLVector", "STLMap", "STLString", "Pointer", "pandas", "__version__"]
+if sys.version_info[0] > 2:
+    __all__.append("AsyncHTTPSource")
@@ -0,0 +1,50 @@
+#!/usr/bin/env python
+
+# BSD 3-Clause License; see https://github.com/scikit-hep/uproot/blob/master/LICENSE
+
+from __future__ import absolute_import
+
+import asyncio
+import functools
+
+import uproot.tree
+
+def _readplan(tree, branches, entrystart, entrystop, awkwardlib, cache):
+    branches = list(tree._normalize_branches(branches, uproot.tree._normalize_awkwardlib(awkwardlib)))
+    for branch, interpretation in branches:
+        if branch._recoveredbaskets is None:
+            branch._tryrecover()
+    entrystart, entrystop = uproot.tree._normalize_entrystartstop(tree.numentries, entrystart, entrystop)
+    return tree._readplan(branches, entrystart, entrystop, cache)
+
+async def _preload(tree, branches, entrystart, entrystop, awkwardlib, cache, executor):
+    loop = asyncio.get_event_loop()
+    plan = await loop.run_in_executor(executor, functools.partial(_readplan, tree, branches, entrystart, entrystop, awkwardlib, cache))
+
+    # sources that can await their reads share the event loop; the others block a worker thread instead
+    awaitables = []
+    for source, ranges in plan:
+        if hasattr(source, "preloadranges_async"):
+            awaitables.append(source.preloadranges_async(ranges))
+        else:
+            awaitables.append(loop.run_in_executor(executor, uproot.tree._preloadranges, source, ranges))
+    await asyncio.gather(*awaitables)
+
+async def arrays(tree, branches=None, outputtype=dict, namedecode=None, entrystart=None, entrystop=None, flatten=False, flatname=None, awkwardlib=None, cache=None, basketcache=None, keycache=None, executor=None, recursive=True):
+    await _preload(tree, branches, entrystart, entrystop, awkwardlib, cache, executor)
+
+    # all baskets are in the source's cache now, so this only decompresses and interprets
+    return await asyncio.get_event_loop().run_in_executor(executor, functools.partial(tree.arrays, branches, outputtype=outputtype, namedecode=namedecode, entrystart=entrystart, entrystop=entrystop, flatten=flatten, flatname=flatname, awkwardlib=awkwardlib, cache=cache, basketcache=basketcache, keycache=keycache, recursive=recursive))
+
+async def iterate(tree, branches=None, entrysteps=None, outputtype=dict, namedecode=None, reportentries=False, entrystart=None, entrystop=None, flatten=False, flatname=None, awkwardlib=None, cache=None, basketcache=None, keycache=None, executor=None):
+    if keycache is None:
+        keycache = {}
+    entrystart, entrystop = uproot.tree._normalize_entrystartstop(tree.numentries, entrystart, entrystop)
+    steps = await asyncio.get_event_loop().run_in_executor(executor, lambda: list(tree._normalize_entrysteps(entrysteps, branches, entrystart, entrystop, keycache)))
+
+    for start, stop in steps:
+        out = await arrays(tree, branches, outputtype=outputtype, namedecode=namedecode, entrystart=start, entrystop=stop, flatten=flatten, flatname=flatname, awkwardlib=awkwardlib, cache=cache, basketcache=basketcache, keycache=keycache, executor=executor)
+        if reportentries:
+            yield start, stop, out
+        else:
+            yield out
@@ -0,0 +1,91 @@
+#!/usr/bin/env python
+
+# BSD 3-Clause License; see https://github.com/scikit-hep/uproot/blob/master/LICENSE
+
+from __future__ import absolute_import
+
+import threading
+import zlib
+
+class Backend(object):
+    def __init__(self, name, decompress, compress, decompressobj=None):
+        self.name = name
+        self._decompress = decompress
+        self._compress = compress
+        self.decompressobj = decompressobj
+
+    def __repr__(self):
+        return "<deflate backend {0}>".format(repr(self.name))
+
+    def decompress(self, data, uncompressedbytes=None):
+        return self._decompress(data, uncompressedbytes)
+
+    def compress(self, data, level):
+        return self._compress(data, level)
+
+def _zlib():
+    return Backend("zlib",
+                   lambda data, uncompressedbytes: zlib.decompress(data),
+                   lambda data, level: zlib.compress(data, level),
+                   zlib.decompressobj)
+
+def _isal():
+    from isal import isal_zlib
+    # ISA-L has compression levels 0-3 (higher is smaller); spread zlib's 1-9 over 1-3
+    return Backend("isal",
+                   lambda data, uncompressedbytes: isal_zlib.decompress(data),
+                   lambda data, level: isal_zlib.compress(data, min(3, (level + 2) // 3)),
+                   isal_zlib.decompressobj)
+
+def _libdeflate():
+    import deflate
+
+    def decompress(data, uncompressedbytes):
+        if uncompressedbytes is not None:
+            try:
+                return deflate.zlib_decompress(data, uncompressedbytes)
+            except deflate.DeflateError:
+                pass
+        # libdeflate needs the exact output size; let zlib report what is wrong with this block
+        return zlib.decompress(data)
+
+    return Backend("libdeflate",
+                   decompress,
+                   lambda data, level: bytes(deflate.zlib_compress(data, level)),
+                   None)
+
+# in order of preference
+loaders = [("libdeflate", _libdeflate), ("isal", _isal), ("zlib", _zlib)]
+
+_backend = None
+_lock = threading.Lock()
+
+def available():
+    out = []
+    for name, loader in loaders:
+        try:
+            loader()
+        except ImportError:
+            pass
+        else:
+            out.append(name)
+    return out
+
+def select(name=None):
+    global _backend
+    with _lock:
+        for n, loader in loaders:
+            if name is None or n == name:
+                try:
+                    _backend = loader()
+                except ImportError:
+                    if name is not None:
+                        raise
+                else:
+                    return _backend
+        raise ValueError("unrecognized deflate backend: {0} (expected one of {1})".format(repr(name), ", ".join(repr(n) for n, loader in loaders)))
+
+def backend():
+    if _backend is None:
+        select()
+    return _backend
@@ -53,7 +53,7 @@ open_fragments = {
 
     # options
     "options": u"""options
-        passed to :py:class:`ROOTDirectory <uproot.rootio.ROOTDirectory>` constructor.""",
+        passed to :py:class:`ROOTDirectory <uproot.rootio.ROOTDirectory>` constructor. With ``sidecar=directory`` (a str or :py:class:`SidecarIndex <uproot.sidecar.SidecarIndex>`), the basket headers of each branch are read from (or, the first time, written to) a persistent index in that directory.""",
 }
 
 rootdirectory_fragments = {
@@ -519,12 +519,20 @@ tree_fragments = {
 
     # executor
     "executor": u"""executor : `concurrent.futures.Executor <https://docs.python.org/3/library/concurrent.futures.html>`_
-        if not ``None`` *(default)*, parallelize basket-reading and decompression by scheduling tasks on the executor. Assumes caches are thread-safe.""",
+        if not ``None`` *(default)*, parallelize basket-reading and decompression by scheduling tasks on the executor. Assumes caches are thread-safe. With a ``ProcessPoolExecutor`` (Python 3.8 or later), each worker process opens the file by path (with the options it was opened with, which must be picklable), reads, decompresses, and interprets its baskets, and fills a destination array in shared memory, so that interpretation in pure Python scales beyond one core. Only the raw bytes of objects (``asobj``, ``asgenobj``) are filled by the workers; they are still deserialized lazily in the parent process, when accessed, as without an executor. Worker processes do not use ``basketcache`` or ``keycache``, and a non-default interpretation must be picklable.""",
 
     # blocking
     "blocking": u"""blocking : bool
         if ``True`` *(default)*, do not exit this function until the arrays are read, and return those arrays. If ``False``, exit immediately and return a zero-argument function. That zero-argument function returns the desired array, and it blocks until the array is available. This option is only useful with a non-``None`` executor.""",
 
+    # selection
+    "selection": u"""selection : ``None`` or str
+        if ``None`` *(default)*, return all entries in range. Otherwise, a Python expression in terms of branch names (which must be valid Python identifiers; ``numpy`` is available as ``numpy`` and ``np``) that evaluates to one boolean per entry. The branches it names are read first (skipping baskets that a known :py:meth:`zonemap <uproot.tree.TBranchMethods.zonemap>` rules out, for terms like ``x > 5`` joined by ``&`` or ``and``), then only the baskets of the requested branches that contain passing entries are read, and only passing entries are returned. Not supported with ``outputtype=pandas.DataFrame``.""",
+
+    # lookahead
+    "lookahead": u"""lookahead : int or string matching number + /[kMGTPEZY]?B/i
+        if ``0`` *(default)*, read each step when it is requested. Otherwise, read and interpret upcoming steps in a background thread while the current step is being used: up to this many steps ahead (if an int) or as many steps as fit in this many bytes of uncompressed baskets, including the step being used (if a memory size; at least one step is always in flight). Steps are still read in order, one at a time, so use an ``executor`` to parallelize within each step. With ``blocking=False``, the returned functions wait for their step to finish.""",
+
     # persistvirtual
     "persistvirtual": u"""persistvirtual : bool
         if ``False`` *(default)*, the resulting awkward.VirtualArrays would convert themselves into real arrays (materialize) before being saved in awkward-array's persistence methods; if ``True``, the "virtualness" of the arrays is preserved\u2014that is, only instructions for reconstituting the arrays is saved, not the array data themselves.""",
@@ -598,6 +606,10 @@ u"""Opens a series of ROOT files (local or remote), yielding the same number of
 
     {blocking}
 
+    {lookahead}
+
+    {selection}
+
     {localsource}
 
     {xrootdsource}
@@ -700,9 +712,12 @@ u"""Adds array reading methods to TTree objects that have been streamed from a R
 
     - :py:meth:`array <uproot.tree.TTreeMethods.array>` read one branch into an array (or other object if provided an alternate *interpretation*).
     - :py:meth:`arrays <uproot.tree.TTreeMethods.arrays>` read many branches into arrays (or other objects if provided alternate *interpretations*).
+    - :py:meth:`take <uproot.tree.TTreeMethods.take>` read the entries at given (scattered) indices from many branches, reading only the baskets that contain them.
     - :py:meth:`lazyarray <uproot.tree.TTreeMethods.lazyarray>` create a lazy array that would read the branch as needed.
     - :py:meth:`lazyarrays <uproot.tree.TTreeMethods.lazyarrays>` create many lazy arrays.
     - :py:meth:`iterate <uproot.tree.TTreeMethods.iterate>` iterate over many arrays at once, yielding the same number of entries from all selected branches in each step.
+    - :py:meth:`arrays_async <uproot.tree.TTreeMethods.arrays_async>` coroutine version of :py:meth:`arrays <uproot.tree.TTreeMethods.arrays>` for use in an asyncio event loop.
+    - :py:meth:`iterate_async <uproot.tree.TTreeMethods.iterate_async>` asynchronous iterator version of :py:meth:`iterate <uproot.tree.TTreeMethods.iterate>`.
 """, width=TEXT_WIDTH)
 
 _method(uproot.tree.TTreeMethods.get).__doc__ = wrap(
@@ -984,12 +999,51 @@ u"""Read many branches into arrays (or other objects if provided alternate *inte
 
     {blocking}
 
+    {selection}
+
     Returns
     -------
     outputtype of arrays or other objects, depending on *interpretation*
         branch data.
 """.format(**tree_fragments), width=TEXT_WIDTH)
 
+_method(uproot.tree.TTreeMethods.take).__doc__ = wrap(
+u"""Read the entries at given (scattered) indices from many branches.
+
+    Unlike :py:meth:`arrays <uproot.tree.TTreeMethods.arrays>` with an ``entrystart`` and ``entrystop`` around the indices, only the baskets that contain requested entries are read and decompressed (each once, no matter how many of its entries are requested), so looking up a few entries in a large file is fast.
+
+    Parameters
+    ----------
+    indices : iterable of int
+        entry numbers to return, in the order they should be returned; may be unsorted, repeated, or negative (counting from the end).
+
+    {branches}
+
+    {outputtype}
+
+    {namedecode}
+
+    {flatten}
+
+    {awkwardlib}
+
+    {cache}
+
+    {basketcache}
+
+    {keycache}
+
+    executor : `concurrent.futures.Executor <https://docs.python.org/3/library/concurrent.futures.html>`_
+        if not ``None`` *(default)*, read and decompress the baskets in parallel by scheduling one task per basket on the executor. Assumes caches are thread-safe. A ``ProcessPoolExecutor`` is ignored (the baskets are read in this process).
+
+    {blocking}
+
+    Returns
+    -------
+    outputtype of arrays or other objects, depending on *interpretation*
+        branch data, one entry per index.
+""".format(**tree_fragments), width=TEXT_WIDTH)
+
 _method(uproot.tree.TTreeMethods.lazyarray).__doc__ = wrap(
 u"""Create a lazy array that would read the branch as needed.
 
@@ -1103,12 +1157,97 @@ u"""Iterate over many arrays at once, yielding the same number of entries from a
 
     {blocking}
 
+    {lookahead}
+
+    {selection}
+
     Returns
     -------
     iterator over (int, int, outputtype) (if *reportentries*) or just outputtype (otherwise)
         aligned array segments from the TTree.
 """.format(**tree_fragments), width=TEXT_WIDTH)
 
+tree_fragments["executor_async"] = u"""executor : ``None`` or ``concurrent.futures.Executor``
+        executor passed to ``loop.run_in_executor`` for everything that would block the event loop: planning the reads, reading from sources that cannot be awaited, and decompressing/interpreting the baskets. If ``None``, the event loop's default executor is used."""
+
+_method(uproot.tree.TTreeMethods.arrays_async).__doc__ = wrap(
+u"""Coroutine version of :py:meth:`arrays <uproot.tree.TTreeMethods.arrays>`: ``await tree.arrays_async(...)`` in an asyncio event loop.
+
+    The baskets of all selected branches are fetched first. Sources with a ``preloadranges_async`` coroutine, such as :py:class:`AsyncHTTPSource <uproot.source.asynchttp.AsyncHTTPSource>`, fetch them as concurrent requests on the event loop itself, without a thread per request; other sources read them in the *executor*. The baskets are then decompressed and interpreted in the *executor*.
+
+    Parameters
+    ----------
+    {branches}
+
+    {outputtype}
+
+    {namedecode}
+
+    {entrystart}
+
+    {entrystop}
+
+    {flatten}
+
+    {flatname}
+
+    {awkwardlib}
+
+    {cache}
+
+    {basketcache}
+
+    {keycache}
+
+    {executor_async}
+
+    Returns
+    -------
+    coroutine returning outputtype of arrays or other objects, depending on *interpretation*
+        branch data.
+""".format(**tree_fragments), width=TEXT_WIDTH)
+
+_method(uproot.tree.TTreeMethods.iterate_async).__doc__ = wrap(
+u"""Asynchronous iterator version of :py:meth:`iterate <uproot.tree.TTreeMethods.iterate>`: ``async for arrays in tree.iterate_async(...)`` in an asyncio event loop.
+
+    Each step is read as in :py:meth:`arrays_async <uproot.tree.TTreeMethods.arrays_async>`.
+
+    Parameters
+    ----------
+    {branches}
+
+    {entrysteps_tree}
+
+    {outputtype}
+
+    {namedecode}
+
+    {reportentries}
+
+    {entrystart}
+
+    {entrystop}
+
+    {flatten}
+
+    {flatname}
+
+    {awkwardlib}
+
+    {cache}
+
+    {basketcache}
+
+    {keycache}
+
+    {executor_async}
+
+    Returns
+    -------
+    asynchronous iterator over (int, int, outputtype) (if *reportentries*) or just outputtype (otherwise)
+        aligned array segments from the TTree.
+""".format(**tree_fragments), width=TEXT_WIDTH)
+
 ################################################################ uproot.tree.TBranchMethods
 
 uproot.tree.TBranchMethods.__doc__ = wrap(
@@ -1151,6 +1290,7 @@ u"""Adds array reading methods to TBranch objects that have been streamed from a
     - :py:meth:`basket_uncompressedbytes <uproot.tree.TBranchMethods.basket_uncompressedbytes>` the number of bytes contained in the basket (data and offsets; not including any key headers) *after* decompression, if applicable.
     - :py:meth:`basket_compressedbytes <uproot.tree.TBranchMethods.basket_compressedbytes>` the number of bytes contained in the basket (data and offsets; not including any key headers) *before* decompression, if applicable.
     - :py:meth:`basket_numitems <uproot.tree.TBranchMethods.basket_numitems>` the number of items in the basket, under a given interpretation.
+    - :py:meth:`zonemap <uproot.tree.TBranchMethods.zonemap>` the minimum and maximum value in each basket, which lets selections skip baskets.
     - :py:meth:`mempartitions <uproot.tree.TBranchMethods.mempartitions>` iterate over *(int, int)* pairs representing entry starts and stops that attempt to maintain a constant memory footprint.
 
     **Methods for reading array data:**
@@ -1651,6 +1791,25 @@ u"""Iterate over baskets.
         basket data.
 """.format(**tree_fragments), width=TEXT_WIDTH)
 
+_method(uproot.tree.TBranchMethods.zonemap).__doc__ = wrap(
+u"""Return the minimum and maximum value in each basket (a "zone map"), computed once and kept.
+
+    Only for branches whose default interpretation is numeric (or jagged numeric). The first call reads every basket; the result is kept in the TBranch and, if the file was opened with a ``sidecar`` option, saved in that :py:class:`SidecarIndex <uproot.sidecar.SidecarIndex>` for other processes. Once a branch has a zone map (in memory or in the sidecar index), a ``selection`` in :py:meth:`arrays <uproot.tree.TTreeMethods.arrays>` or :py:meth:`iterate <uproot.tree.TTreeMethods.iterate>` that requires a comparison between that branch and a number (such as ``"run >= 300000"`` or ``"(10 < x) & (x < 20)"``) skips the baskets (of all branches) in which no entry can satisfy it. Data sorted by run number or timestamp benefit the most.
+
+    Parameters
+    ----------
+    {basketcache}
+
+    {keycache}
+
+    {executor}
+
+    Returns
+    -------
+    Numpy structured array
+        one record per basket with fields ``fEntryStart``, ``fEntryStop``, ``fSeekKey`` (0 for recovered baskets), ``numitems``, ``numnan`` (NaN values, which are excluded from ``min`` and ``max``), ``numzero``, ``min``, and ``max`` (0 if the basket has no values other than NaN).
+""".format(**tree_fragments), width=TEXT_WIDTH)
+
 ################################################################ uproot.tree.TTreeMethods.pandas
 
 _method(uproot._connect._pandas.TTreeMethods_pandas.df).__doc__ = wrap(
@@ -2408,6 +2567,18 @@ u"""Interface for data sources.
     **dismiss(self)**
         thread-local copies are no longer needed; they may be eliminated if redundant.
 
+    **preload(self, starts)**
+        hint that data starting at the given byte positions will soon be needed; may do nothing.
+
+    **preloadranges(self, ranges)**
+        hint that the given *(start, stop)* byte ranges will soon be needed; the source may sort and merge them into fewer, larger reads. May do nothing (optional: if absent, ``preload`` is called with the starts).
+
+    **scanranges(self, ranges)**
+        hint that the given *(start, stop)* byte ranges will be read once, in order (e.g. by ``iterate``). May do nothing (optional).
+
+    **releaseranges(self, ranges)**
+        hint that the given *(start, stop)* byte ranges have been consumed and will not be needed again soon. May do nothing (optional).
+
     **data(self, start, stop, dtype=None)**
         return a view of data from the starting byte (inclusive) to the stopping byte (exclusive), with a given Numpy type (numpy.uint8 if ``None``).
 """, width=TEXT_WIDTH)
@@ -2425,7 +2596,9 @@ source_fragments = {
 uproot.source.file.FileSource.__doc__ = wrap(
 u"""Emulate a memory-mapped interface with traditional file handles, opening many if necessary.
 
-    :py:class:`FileSource <uproot.source.file.FileSource>` objects avoid double-reading and many small reads by caching data in chunks. All thread-local copies of a :py:class:`FileSource <uproot.source.file.FileSource>` share a :py:class:`ThreadSafeArrayCache <uproot.cache.ThreadSafeArrayCache>` to avoid double-reads across threads.
+    :py:class:`FileSource <uproot.source.file.FileSource>` objects avoid double-reading and many small reads by caching data in chunks. All thread-local copies of a :py:class:`FileSource <uproot.source.file.FileSource>` share a :py:class:`ShardedArrayCache <uproot.cache.ShardedArrayCache>` to avoid double-reads across threads.
+
+    In vectored mode *(default, where the OS provides it)*, data are read with positioned ``os.preadv``/``os.pread`` calls directly into the chunk buffers. These calls have no shared file position, so all threads share one file descriptor instead of opening the file again.
 
     Parameters
     ----------
@@ -2438,6 +2611,15 @@ u"""Emulate a memory-mapped interface with traditional file handles, opening man
     limitbytes : int or string matching number + /[kMGTPEZY]?B/i
         maximum number of bytes to keep in the cache.
 
+    gapbytes : int or string matching number + /[kMGTPEZY]?B/i
+        when a set of byte ranges is preloaded (e.g. all baskets needed by an array or iteration step), ranges separated by no more than this many bytes are merged into a single read.
+
+    vectored : bool
+        if ``True`` *(default)* and ``os.pread`` is available, use positioned reads on a single, shared file descriptor; if ``False``, use ``seek`` and ``read`` on one file handle per thread.
+
+    adaptive : bool
+        if ``True``, the size of each read adapts to the access pattern, while *chunkbytes* stays the unit of caching: a request spanning many chunks is read at once, and every cache miss that continues where the previous miss's read ended doubles the number of chunks read (up to 1/8 of *limitbytes*), returning to one chunk after a jump. With a small *chunkbytes*, metadata lookups stay cheap and sequential scans still get large reads. Default is ``False``.
+
     Notes
     -----
 
@@ -2454,6 +2636,8 @@ _method(uproot.source.file.FileSource.data).__doc__ = source_fragments["see1"]
 uproot.source.memmap.MemmapSource.__doc__ = wrap(
 u"""Thin wrapper around a memory-mapped file, which already behaves like a :py:class:`Source <uproot.source.source.Source>`.
 
+    Where the OS supports ``madvise`` (Python 3.8+), hints about upcoming reads are passed on to the kernel, so that pages are fetched in bulk instead of one page fault at a time (which matters most on network filesystems): ranges to be preloaded are advised ``MADV_WILLNEED``, ranges to be scanned ``MADV_SEQUENTIAL``, and released ranges ``MADV_DONTNEED``.
+
     Parameters
     ----------
     path : str
@@ -2488,6 +2672,15 @@ u"""Emulate a memory-mapped interface with XRootD.
     limitbytes : int or string matching number + /[kMGTPEZY]?B/i
         maximum number of bytes to keep in the cache.
 
+    gapbytes : int or string matching number + /[kMGTPEZY]?B/i
+        when a set of byte ranges is preloaded (e.g. all baskets needed by an array or iteration step), ranges separated by no more than this many bytes are merged into a single read.
+
+    diskcache : ``None``, str, or :py:class:`DiskCache <uproot.source.diskcache.DiskCache>`
+        if not ``None``, chunks are also kept on local disk, in this directory (with the default size limit) or this :py:class:`DiskCache <uproot.source.diskcache.DiskCache>`, so that later processes reading the same file need not fetch them again.
+
+    adaptive : bool
+        if ``True``, the size of each read adapts to the access pattern, while *chunkbytes* stays the unit of caching: a request spanning many chunks is read at once, and every cache miss that continues where the previous miss's read ended doubles the number of chunks read (up to 1/8 of *limitbytes*), returning to one chunk after a jump. With a small *chunkbytes*, metadata lookups stay cheap and sequential scans still get large reads. Default is ``False``.
+
     Notes
     -----
 
@@ -2509,6 +2702,7 @@ u"""Describe the compression of a compressed block.
     - **algo** (*int*) algorithm code.
     - **level** (*int*) 0 is no compression, 1 is least, 9 is most.
     - **algoname** (*str*) algorithm expressed as a string: ``"zlib"``, ``"lzma"``, ``"old"``, ``"lz4"`` or ``"zstd"``.
+    - **zstddict** (``None`` or ``zstandard.ZstdCompressionDict``) dictionary for ZSTD-compressed blocks that were compressed with one.
     - **copy(algo=None, level=None)** copy this :py:class:`Compression <uproot.source.compressed.Compression>` object, possibly changing a field.
     - **decompress(source, cursor, compressedbytes, uncompressedbytes)** decompress data from **source** at **cursor**, knowing the compressed and uncompressed size.
 
@@ -2516,6 +2710,9 @@ u"""Describe the compression of a compressed block.
     ----------
     fCompress : int
         ROOT fCompress field.
+
+    zstddict : ``None``, bytes, or ``zstandard.ZstdCompressionDict``
+        dictionary for ZSTD-compressed blocks; bytes are loaded into a ``zstandard.ZstdCompressionDict`` once and shared by all copies. Pass ``zstddict=...`` as an option to :py:func:`uproot.open <uproot.rootio.open>` to read a file whose ZSTD blocks need one.
 """, width=TEXT_WIDTH)
 
 ################################################################ uproot.source.compressed.CompressedSource
@@ -2525,6 +2722,8 @@ u"""A :py:class:`Source <uproot.source.source.Source>` for compressed data.
 
     Decompresses on demand--- without caching the result--- so cache options in higher-level array functions are very important.
 
+    An object stored in several compressed blocks is decompressed in parallel into the slices of one output array. ZSTD blocks are decompressed in place; zlib and LZMA blocks are still copied into the output once, in windows of at most 1 MB, and LZ4 blocks once as a whole, because those libraries cannot decompress into a given buffer.
+
     Ordinary users would never create a :py:class:`CompressedSource <uproot.source.compressed.CompressedSource>`. They are produced when a TKey encounters a compressed value.
 
     Parameters
@@ -2545,6 +2744,39 @@ u"""A :py:class:`Source <uproot.source.source.Source>` for compressed data.
         number of bytes before compression.
 """, width=TEXT_WIDTH)
 
+################################################################ uproot.source.diskcache.DiskCache
+
+uproot.source.diskcache.DiskCache.__doc__ = wrap(
+u"""A directory of remote-file chunks that persists between processes.
+
+    Pass a :py:class:`DiskCache <uproot.source.diskcache.DiskCache>` (or just a directory name) as the *diskcache* option of :py:class:`XRootDSource <uproot.source.xrootd.XRootDSource>` or ``HTTPSource``. Chunks are keyed by the file's ``fUUID`` and ``fEND`` (read from its header, which is always fetched from the source), the chunk size, and the chunk index, so the same file opened through different URLs shares entries and a rewritten file does not.
+
+    Chunks are written to temporary files and renamed into place, so any number of processes may read and write the same directory at once. When the total size exceeds *limitbytes*, the least recently used chunks (by file modification time, which is updated on every hit) are removed until the total is 90% of *limitbytes*.
+
+    Parameters
+    ----------
+    directory : str
+        directory in which to keep the chunks; created if it does not exist.
+
+    limitbytes : ``None``, int, or string matching number + /[kMGTPEZY]?B/i
+        maximum number of bytes to keep on disk; ``None`` for no limit.
+""", width=TEXT_WIDTH)
+
+################################################################ uproot.sidecar.SidecarIndex
+
+uproot.sidecar.SidecarIndex.__doc__ = wrap(
+u"""A directory of basket metadata that persists between processes.
+
+    Before reading a branch, uproot needs every basket's TKey header (sizes before and after compression and where the data begin), which costs one small read per basket. Pass a :py:class:`SidecarIndex <uproot.sidecar.SidecarIndex>` (or just a directory name) as the *sidecar* option of :py:func:`uproot.open <uproot.rootio.open>` or :py:func:`uproot.iterate <uproot.tree.iterate>`. The headers of each branch are then saved the first time they are read, and any later process opening the same file takes them from the index without reading them again. This includes the keys that would otherwise be put in a ``keycache``. It also keeps each branch's :py:meth:`zonemap <uproot.tree.TBranchMethods.zonemap>`, once computed.
+
+    Entries are keyed by the file's ``fUUID``, tree name, and branch name, and are ignored if the basket positions recorded in the TBranch no longer match them. Entries are written to temporary files and renamed into place, so any number of processes may read and write the same directory at once. Failures to read or write the index are not errors; the headers are then read from the file as usual.
+
+    Parameters
+    ----------
+    directory : str
+        directory in which to keep the index; created if it does not exist.
+""", width=TEXT_WIDTH)
+
 ################################################################ uproot.cache.ArrayCache
 
 uproot.cache.ArrayCache.__doc__ = wrap(
@@ -2552,13 +2784,17 @@ u"""A cache (wrapping cachetools) whose eviction threshold is determined by tota
 
     Uses the nbytes property of all values to determine total size. By default, cachetools only counts the number of objects, ignoring their sizes.
 
+    Counts hits, misses, insertions, and evictions as it is used; see :py:meth:`stats <uproot.cache.ArrayCache.stats>`.
+
+    With ``method="GDS"``, eviction weighs how expensive each entry was to produce. The time between a lookup that misses a key and the setting of that key (reading, decompressing, and interpreting the array, as uproot does when given a ``cache``, ``basketcache``, or ``keycache``) is recorded as its cost. The entry with the lowest cost per byte, aged by how long ago it was last used, is evicted first (the GreedyDual-Size algorithm). Arrays that are slow to rebuild, such as object branches in LZMA-compressed baskets, stay in memory longer than cheap numeric arrays of the same size. Entries set without a preceding miss have no measured cost and are the first to be evicted.
+
     Parameters
     ----------
     limitbytes : int or string matching number + /[kMGTPEZY]?B/i
         maximum number of bytes to keep in the cache.
 
-    method : "LRU" *(default)* or "LFU"
-        least recently used or least frequently used
+    method : "LRU" *(default)*, "LFU", or "GDS"
+        least recently used, least frequently used, or GreedyDual-Size (lowest measured rebuild cost per byte first)
 """, width=TEXT_WIDTH)
 
 ################################################################ uproot.cache.ThreadSafeArrayCache
@@ -2571,6 +2807,92 @@ u"""An :py:class:`ArrayCache <uproot.cache.ArrayCache>` with locks for thread sa
     limitbytes : int or string matching number + /[kMGTPEZY]?B/i
         maximum number of bytes to keep in the cache.
 
-    method : "LRU" *(default)* or "LFU"
-        least recently used or least frequently used
+    method : "LRU" *(default)*, "LFU", or "GDS"
+        least recently used, least frequently used, or GreedyDual-Size (see :py:class:`ArrayCache <uproot.cache.ArrayCache>`)
 """, width=TEXT_WIDTH)
+
+################################################################ uproot.cache.SpillArrayCache
+
+uproot.cache.SpillArrayCache.__doc__ = wrap(
+u"""A :py:class:`ThreadSafeArrayCache <uproot.cache.ThreadSafeArrayCache>` that writes evicted arrays to disk instead of dropping them.
+
+    Arrays evicted from memory (and arrays too large to fit in memory at all) are saved as ``.npy`` files in ``directory``; a ``JaggedArray`` is saved as separate files for its starts, stops, and content. A key that is not in memory but is on disk is read back as a memory-mapped array, so that re-reading a branch after eviction costs page faults rather than decompressing and interpreting its baskets again. Arrays read back from disk are not moved into memory again.
+
+    Only numpy arrays without Python objects and (nested) ``JaggedArrays`` of them are spilled; other values are dropped on eviction, as in :py:class:`ArrayCache <uproot.cache.ArrayCache>`. The files on disk are managed by a :py:class:`DiskCache <uproot.source.diskcache.DiskCache>`, as with the ``diskcache`` option of remote sources: least recently used files are removed when the directory exceeds ``disklimitbytes``, and other processes may share the directory. Since an array spilled once is not written again, a key must always refer to the same array, as the keys that uproot generates do.
+
+    In :py:meth:`stats <uproot.cache.ArrayCache.stats>`, ``"misses"`` counts lookups that are not in memory; the result also has ``"spills"``, ``"diskhits"``, ``"diskbytes"``, and ``"disklimitbytes"``.
+
+    Parameters
+    ----------
+    limitbytes : int or string matching number + /[kMGTPEZY]?B/i
+        maximum number of bytes to keep in memory.
+
+    directory : str
+        directory for the spilled arrays (created if it does not exist).
+
+    disklimitbytes : int or string matching number + /[kMGTPEZY]?B/i
+        maximum number of bytes to keep on disk (default "10 GB").
+
+    method : "LRU" *(default)*, "LFU", or "GDS"
+        least recently used, least frequently used, or GreedyDual-Size (see :py:class:`ArrayCache <uproot.cache.ArrayCache>`)
+""", width=TEXT_WIDTH)
+
+################################################################ uproot.cache.CompressedArrayCache
+
+uproot.cache.CompressedArrayCache.__doc__ = wrap(
+u"""A :py:class:`ThreadSafeArrayCache <uproot.cache.ThreadSafeArrayCache>` that keeps arrays compressed in memory.
+
+    Intended as a ``basketcache``: raw baskets are compressed with a fast codec when they are set and decompressed when they are retrieved, so that the same ``limitbytes`` holds several times more baskets, at the cost of some CPU time on every hit. The byte limit applies to the compressed sizes. Compression and decompression are performed outside of the lock, so threads in an ``executor`` work in parallel. Any numpy array without Python objects is compressed; other values are kept as they are.
+
+    Parameters
+    ----------
+    limitbytes : int or string matching number + /[kMGTPEZY]?B/i
+        maximum number of (compressed) bytes to keep in the cache.
+
+    codec : ``None``, "lz4", or "zlib"
+        if ``None`` *(default)*, use "lz4" if the lz4 package is installed and "zlib" (at its fastest level) otherwise.
+
+    method : "LRU" *(default)*, "LFU", or "GDS"
+        least recently used, least frequently used, or GreedyDual-Size (see :py:class:`ArrayCache <uproot.cache.ArrayCache>`)
+""", width=TEXT_WIDTH)
+
+################################################################ uproot.cache.ShardedArrayCache
+
+uproot.cache.ShardedArrayCache.__doc__ = wrap(
+u"""A thread-safe cache like :py:class:`ThreadSafeArrayCache <uproot.cache.ThreadSafeArrayCache>` that splits its keys among independently locked segments, so that many threads can use it at once.
+
+    Keys are assigned to segments by hash. The byte limit applies to the total size of all segments: when it is exceeded, entries are evicted from the other segments first, in each segment's own least recently (or frequently) used order. This approximates one global LRU (or LFU) ordering. Usable anywhere a ``cache``, ``basketcache``, or ``keycache`` is accepted; it is also the chunk cache of :py:class:`FileSource <uproot.source.file.FileSource>`, :py:class:`XRootDSource <uproot.source.xrootd.XRootDSource>`, and ``HTTPSource``.
+
+    Parameters
+    ----------
+    limitbytes : int or string matching number + /[kMGTPEZY]?B/i
+        maximum number of bytes to keep in the cache (in all segments together).
+
+    method : "LRU" *(default)*, "LFU", or "GDS"
+        least recently used, least frequently used, or GreedyDual-Size (see :py:class:`ArrayCache <uproot.cache.ArrayCache>`)
+
+    numshards : int
+        number of independently locked segments (default 16).
+""", width=TEXT_WIDTH)
+
+stats_fragment = u"""Return a snapshot of the cache's usage counters.
+
+    Parameters
+    ----------
+    byclass : bool
+        if ``True`` *(not default)*, also break the counters down by kind of key: ``"array"`` for interpreted arrays (``cache``), ``"raw"`` for raw baskets (``basketcache``), ``"key"`` for TKeys (``keycache``), ``"chunk"`` for the chunks of a :py:class:`Source <uproot.source.source.Source>`, and ``"other"`` for anything else.
+
+    Returns
+    -------
+    dict
+        ``"hits"`` and ``"misses"`` (lookups with square brackets or ``get`` that found or did not find the key), ``"inserts"`` and ``"bytesinserted"`` (assignments), ``"evictions"`` and ``"bytesevicted"`` (entries removed to stay under the limit, not by ``del`` or ``clear``), ``"numitems"``, ``"currbytes"``, and ``"limitbytes"`` (current state), and ``"byclass"`` if requested (a dict from kind of key to the six counters).
+
+    Notes
+    -----
+
+    The counters are cumulative over the lifetime of the cache. To measure one workload, take the difference between snapshots before and after it. A high ratio of ``"evictions"`` to ``"inserts"`` with many ``"misses"`` suggests that ``limitbytes`` is too small; a ``"currbytes"`` that never approaches ``"limitbytes"`` suggests that it is too large.
+"""
+
+_method(uproot.cache.ArrayCache.stats).__doc__ = wrap(stats_fragment, width=TEXT_WIDTH)
+
+_method(uproot.cache.ShardedArrayCache.stats).__doc__ = wrap(stats_fragment, width=TEXT_WIDTH)
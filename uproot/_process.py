@@ -0,0 +1,159 @@
+#!/usr/bin/env python
+
+# BSD 3-Clause License; see https://github.com/scikit-hep/uproot/blob/master/LICENSE
+
+from __future__ import absolute_import
+
+import copy
+import pickle
+import sys
+
+import numpy
+
+def isprocesspool(executor):
+    try:
+        import concurrent.futures
+    except ImportError:
+        return False
+    return isinstance(executor, concurrent.futures.ProcessPoolExecutor)
+
+def _sharedmemory():
+    try:
+        from multiprocessing import shared_memory
+    except ImportError:
+        raise ImportError("reading with a ProcessPoolExecutor needs multiprocessing.shared_memory (Python 3.8 or later)")
+    return shared_memory
+
+################################################################ destinations in shared memory
+
+# A destination is a numpy array or an object whose attributes are destinations (such as asjagged's counts and content).
+# It is described to the worker processes by the names of the shared memory blocks that hold its arrays.
+
+def _share(destination, blocks):
+    if isinstance(destination, numpy.ndarray):
+        if destination.dtype.hasobject:
+            raise TypeError("cannot fill an array of Python objects in another process")
+        block = _sharedmemory().SharedMemory(create=True, size=max(1, destination.nbytes))
+        blocks.append(block)
+        return numpy.ndarray(destination.shape, destination.dtype, buffer=block.buf), ("array", block.name, destination.dtype, destination.shape)
+
+    elif hasattr(destination, "__dict__"):
+        out = copy.copy(destination)
+        description = {}
+        for n, x in destination.__dict__.items():
+            value, description[n] = _share(x, blocks)
+            setattr(out, n, value)
+        return out, ("object", type(destination), description)
+
+    else:
+        return destination, ("value", destination)
+
+def _attach(description, blocks):
+    if description[0] == "array":
+        tag, name, dtype, shape = description
+        block = _sharedmemory().SharedMemory(name=name)
+        blocks.append(block)
+        return numpy.ndarray(shape, dtype, buffer=block.buf)
+
+    elif description[0] == "object":
+        tag, cls, attributes = description
+        out = cls.__new__(cls)
+        for n, x in attributes.items():
+            setattr(out, n, _attach(x, blocks))
+        return out
+
+    else:
+        return description[1]
+
+def _copyback(shared, destination):
+    # copy out of shared memory, so that the blocks can be released before the arrays are used
+    if isinstance(destination, numpy.ndarray):
+        destination[...] = shared
+    elif hasattr(destination, "__dict__"):
+        for n, x in destination.__dict__.items():
+            _copyback(getattr(shared, n), x)
+
+################################################################ worker side
+
+_trees = {}
+
+def _tree(path, options, treename):
+    # options are the pickled keyword arguments the parent opened the file with
+    tree = _trees.get((path, options, treename), None)
+    if tree is None:
+        import uproot
+        tree = _trees[path, options, treename] = uproot.open(path, **pickle.loads(options))[treename]
+    return tree
+
+def _fillbasket(path, options, treename, branchname, interpretation, i, first, last, entrystart, entrystop, description, itemoffset, entryoffset):
+    blocks = []
+    try:
+        import uproot.tree
+        branch = _tree(path, options, treename)[branchname]
+        awkward = uproot.tree._normalize_awkwardlib(None)
+        interpretation = branch._normalize_interpretation(interpretation, awkward)
+        destination = _attach(description, blocks)
+        branch._fillbasket(interpretation, i, first, last, entrystart, entrystop, awkward, None, None, destination, itemoffset, entryoffset)
+        del destination
+        return None, itemoffset, entryoffset
+    except Exception:
+        cls, err, trc = sys.exc_info()
+        return (cls, err, None), itemoffset, entryoffset
+    finally:
+        for block in blocks:
+            block.close()
+
+################################################################ parent side
+
+def fill(executor, branch, interpretation, awkward, destination, basketstart, basketstop, entrystart, entrystop, basket_itemoffset, basket_entryoffset):
+    import uproot.interp.auto
+
+    # interpretations that cannot be pickled (objects, strings) are rebuilt by the workers if they are the default
+    default = uproot.interp.auto.interpret(branch, awkward)
+    if default is not None and default.identifier == interpretation.identifier:
+        sent = None
+    else:
+        try:
+            pickle.dumps(interpretation)
+        except Exception:
+            raise TypeError("interpretation {0} of branch {1} cannot be sent to worker processes; use threads or the default interpretation".format(interpretation, repr(branch.name)))
+        sent = interpretation
+
+    try:
+        options = pickle.dumps(branch._context.openoptions)
+    except Exception:
+        raise TypeError("the options file {0} was opened with cannot be sent to worker processes; use threads or pass them as dicts rather than functions".format(repr(branch._context.sourcepath)))
+
+    blocks = []
+    shared, description = _share(destination, blocks)
+    shared = [shared]                           # so that no array views the blocks once they are released
+
+    futures = []
+    try:
+        for j in range(basketstop - basketstart):
+            futures.append(executor.submit(_fillbasket, branch._context.sourcepath, options, branch._context.treename, branch.name, sent, j + basketstart, j == 0, j + 1 == basketstop - basketstart, entrystart, entrystop, description, basket_itemoffset[j : j + 2], basket_entryoffset[j : j + 2]))
+    except Exception:
+        for block in blocks:
+            block.close()
+            block.unlink()
+        raise
+
+    def excinfos():
+        # wait for every worker before releasing the shared memory, then hand back the corrected offsets and errors
+        results = []
+        for future in futures:
+            try:
+                results.append(future.result())
+            except Exception:
+                results.append((sys.exc_info(), None, None))
+        _copyback(shared.pop(), destination)
+        for block in blocks:
+            block.close()
+            block.unlink()
+
+        for j, (excinfo, itemoffset, entryoffset) in enumerate(results):
+            if itemoffset is not None:
+                basket_itemoffset[j : j + 2], basket_entryoffset[j : j + 2] = itemoffset, entryoffset
+            yield excinfo
+
+    return excinfos()
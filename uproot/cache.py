@@ -4,14 +4,158 @@
 
 from __future__ import absolute_import
 
+import hashlib
+import heapq
+import io
 import math
+import numbers
 import threading
+import time
+import weakref
+import zlib
+from collections import OrderedDict
 try:
     from collections.abc import MutableMapping
 except ImportError:
     from collections import MutableMapping
 
+import awkward
 import cachetools
+import numpy
+
+def _keyclass(where):
+    # key formats from TBranchMethods._cachekey, _basketcachekey, _keycachekey, and ChunkedSource chunk indexes
+    if isinstance(where, str):
+        if where.endswith(";raw"):
+            return "raw"
+        elif where.endswith(";key"):
+            return "key"
+        else:
+            return "array"
+    elif isinstance(where, numbers.Integral):
+        return "chunk"
+    else:
+        return "other"
+
+class _Counters(object):
+    fields = ("hits", "misses", "inserts", "evictions", "bytesinserted", "bytesevicted")
+
+    def __init__(self):
+        self.byclass = {}
+
+    def add(self, where, field, amount=1):
+        keyclass = _keyclass(where)
+        counts = self.byclass.get(keyclass, None)
+        if counts is None:
+            counts = self.byclass[keyclass] = dict((x, 0) for x in self.fields)
+        counts[field] += amount
+
+    @staticmethod
+    def merge(counters, byclass):
+        out = dict((x, 0) for x in _Counters.fields)
+        classes = {}
+        for c in counters:
+            for keyclass, counts in list(c.byclass.items()):
+                merged = classes.setdefault(keyclass, dict((x, 0) for x in _Counters.fields))
+                for x in _Counters.fields:
+                    out[x] += counts[x]
+                    merged[x] += counts[x]
+        if byclass:
+            out["byclass"] = classes
+        return out
+
+def _instrumented(cls):
+    class Instrumented(cls):
+        victims = None
+
+        def popitem(self):
+            key, value = cls.popitem(self)
+            self.counters.add(key, "evictions")
+            self.counters.add(key, "bytesevicted", self.getsizeof(value))
+            if self.victims is not None:
+                self.victims.append((key, value))
+            return key, value
+    Instrumented.__name__ = cls.__name__
+    return Instrumented
+
+class _GDSCache(cachetools.Cache):
+    # GreedyDual-Size: an entry's priority is the inflation value at its last use plus its rebuild cost per byte;
+    # the lowest priority is evicted and becomes the new inflation value, so untouched entries age out
+    maxmissed = 10000
+
+    def __init__(self, maxsize, getsizeof=None):
+        cachetools.Cache.__init__(self, maxsize, getsizeof=getsizeof)
+        self._inflation = 0.0
+        self._costs = {}
+        self._priority = {}
+        self._heap = []
+        self._sequence = 0
+        self._missed = OrderedDict()
+
+    def _touch(self, key, value):
+        priority = (self._inflation + self._costs[key] / max(1, self.getsizeof(value)), self._sequence)
+        self._sequence += 1
+        self._priority[key] = priority
+        heapq.heappush(self._heap, priority + (key,))
+        if len(self._heap) > 2*len(self._priority) + 64:
+            self._heap = [p + (k,) for k, p in self._priority.items()]
+            heapq.heapify(self._heap)
+
+    def __getitem__(self, key):
+        try:
+            value = cachetools.Cache.__getitem__(self, key)
+        except KeyError:
+            # the time from a miss to the setting of the same key is the cost of producing it
+            self._missed[key] = time.time()
+            if len(self._missed) > self.maxmissed:
+                self._missed.popitem(last=False)
+            raise
+        self._touch(key, value)
+        return value
+
+    def __setitem__(self, key, value):
+        missed = self._missed.pop(key, None)
+        if missed is not None:
+            cost = time.time() - missed
+        else:
+            cost = self._costs.get(key, 0.0)
+        cachetools.Cache.__setitem__(self, key, value)
+        self._costs[key] = cost
+        self._touch(key, value)
+
+    def __delitem__(self, key):
+        cachetools.Cache.__delitem__(self, key)
+        del self._costs[key]
+        del self._priority[key]
+
+    def cost(self, key):
+        return self._costs[key]
+
+    def popitem(self):
+        while self._heap:
+            priority, sequence, key = heapq.heappop(self._heap)
+            if self._priority.get(key) == (priority, sequence):
+                self._inflation = priority
+                value = cachetools.Cache.__getitem__(self, key)
+                self.__delitem__(key)
+                return key, value
+        raise KeyError("{0} is empty".format(type(self).__name__))
+
+_LRUCache = _instrumented(cachetools.LRUCache)
+_LFUCache = _instrumented(cachetools.LFUCache)
+_GDSCache = _instrumented(_GDSCache)
+
+def _newcache(method, limitbytes, getsizeof, counters):
+    if method == "LRU":
+        out = _LRUCache(limitbytes, getsizeof=getsizeof)
+    elif method == "LFU":
+        out = _LFUCache(limitbytes, getsizeof=getsizeof)
+    elif method == "GDS":
+        out = _GDSCache(limitbytes, getsizeof=getsizeof)
+    else:
+        raise ValueError("unrecognized method: {0}".format(method))
+    out.counters = counters
+    return out
 
 class ArrayCache(MutableMapping):
     @staticmethod
@@ -23,21 +167,25 @@ class ArrayCache(MutableMapping):
         m = _memsize(limitbytes)
         if m is not None:
             limitbytes = int(math.ceil(m))
-        if method == "LRU":
-            self._cache = cachetools.LRUCache(limitbytes, getsizeof=self.getsizeof)
-        elif method == "LFU":
-            self._cache = cachetools.LFUCache(limitbytes, getsizeof=self.getsizeof)
-        else:
-            raise ValueError("unrecognized method: {0}".format(method))
+        self._counters = _Counters()
+        self._cache = _newcache(method, limitbytes, self.getsizeof, self._counters)
 
     def __contains__(self, where):
         return where in self._cache
 
     def __getitem__(self, where):
-        return self._cache[where]
+        try:
+            out = self._cache[where]
+        except KeyError:
+            self._counters.add(where, "misses")
+            raise
+        self._counters.add(where, "hits")
+        return out
 
     def __setitem__(self, where, what):
         self._cache[where] = what
+        self._counters.add(where, "inserts")
+        self._counters.add(where, "bytesinserted", self.getsizeof(what))
 
     def __delitem__(self, where):
         del self._cache[where]
@@ -49,6 +197,13 @@ class ArrayCache(MutableMapping):
     def __len__(self):
         return len(self._cache)
 
+    def stats(self, byclass=False):
+        out = _Counters.merge([self._counters], byclass)
+        out["numitems"] = len(self._cache)
+        out["currbytes"] = self._cache.currsize
+        out["limitbytes"] = self._cache.maxsize
+        return out
+
 class ThreadSafeArrayCache(ArrayCache):
     def __init__(self, limitbytes, method="LRU"):
         super(ThreadSafeArrayCache, self).__init__(limitbytes, method=method)
@@ -60,21 +215,289 @@ class ThreadSafeArrayCache(ArrayCache):
 
     def __getitem__(self, where):
         with self._lock:
-            return self._cache[where]
+            return ArrayCache.__getitem__(self, where)
 
     def __setitem__(self, where, what):
         with self._lock:
-            self._cache[where] = what
+            ArrayCache.__setitem__(self, where, what)
 
     def __delitem__(self, where):
         with self._lock:
             del self._cache[where]
 
     def __iter__(self):
+        # iterate over a snapshot, so that the lock is not held while the caller works
         with self._lock:
-            for x in self._cache:
-                yield x
+            keys = list(self._cache)
+        for x in keys:
+            yield x
 
     def __len__(self):
         with self._lock:
             return len(self._cache)
+
+    def stats(self, byclass=False):
+        with self._lock:
+            return ArrayCache.stats(self, byclass=byclass)
+
+class SpillArrayCache(ThreadSafeArrayCache):
+    def __init__(self, limitbytes, directory, disklimitbytes="10 GB", method="LRU"):
+        from uproot.source.diskcache import DiskCache
+        super(SpillArrayCache, self).__init__(limitbytes, method=method)
+        self._disk = DiskCache(directory, limitbytes=disklimitbytes)
+        self._cache.victims = []
+        self._spills = 0
+        self._diskhits = 0
+
+    @property
+    def directory(self):
+        return self._disk.directory
+
+    @staticmethod
+    def _name(where):
+        return hashlib.sha1(repr(where).encode("utf-8")).hexdigest()
+
+    @staticmethod
+    def _parts(name, what):
+        # plain arrays are one .npy file; jagged arrays are starts, stops, and (recursively) content
+        if type(what) is numpy.ndarray or isinstance(what, numpy.memmap):
+            if what.dtype.hasobject:
+                return None
+            return [(name + ".npy", what)]
+        elif type(what) is awkward.JaggedArray and isinstance(what.starts, numpy.ndarray) and isinstance(what.stops, numpy.ndarray):
+            content = SpillArrayCache._parts(name + ".content", what.content)
+            if content is None:
+                return None
+            return [(name + ".starts.npy", what.starts), (name + ".stops.npy", what.stops)] + content
+        else:
+            return None
+
+    def _load(self, name):
+        try:
+            return numpy.load(self._disk.path(name + ".npy"), mmap_mode="r")
+        except KeyError:
+            pass
+        starts = numpy.load(self._disk.path(name + ".starts.npy"), mmap_mode="r")
+        stops = numpy.load(self._disk.path(name + ".stops.npy"), mmap_mode="r")
+        return awkward.JaggedArray(starts, stops, self._load(name + ".content"))
+
+    def _spill(self, victims):
+        for where, what in victims:
+            name = self._name(where)
+            parts = self._parts(name, what)
+            if parts is None:
+                continue
+            for filename, array in parts:
+                if filename in self._disk:
+                    continue                    # spilled before and read back without being modified
+                buf = io.BytesIO()
+                numpy.save(buf, numpy.ascontiguousarray(array), allow_pickle=False)
+                self._disk[filename] = numpy.frombuffer(buf.getvalue(), dtype=numpy.uint8)
+            with self._lock:
+                self._spills += 1
+
+    def __contains__(self, where):
+        with self._lock:
+            if where in self._cache:
+                return True
+        name = self._name(where)
+        return name + ".npy" in self._disk or name + ".starts.npy" in self._disk
+
+    def __getitem__(self, where):
+        with self._lock:
+            try:
+                return ArrayCache.__getitem__(self, where)
+            except KeyError:
+                pass
+        try:
+            out = self._load(self._name(where))
+        except (KeyError, IOError, OSError, ValueError):
+            raise KeyError(where)
+        with self._lock:
+            self._diskhits += 1
+        return out
+
+    def __setitem__(self, where, what):
+        with self._lock:
+            if self.getsizeof(what) > self._cache.maxsize:
+                victims = [(where, what)]       # too large for memory: straight to disk
+            else:
+                ArrayCache.__setitem__(self, where, what)
+                victims = self._cache.victims
+                self._cache.victims = []
+        # write outside of the lock so that other threads are not held up by the disk
+        self._spill(victims)
+
+    def clear(self):
+        with self._lock:
+            # delete rather than pop, so that clearing is neither spilled nor counted as evictions
+            for where in list(self._cache):
+                del self._cache[where]
+        self._disk.clear()
+
+    def stats(self, byclass=False):
+        with self._lock:
+            out = ArrayCache.stats(self, byclass=byclass)
+            out["spills"] = self._spills
+            out["diskhits"] = self._diskhits
+        out["diskbytes"] = self._disk._numbytes
+        out["disklimitbytes"] = self._disk.limitbytes
+        return out
+
+class _Compressed(object):
+    __slots__ = ["data", "dtype", "shape", "rawbytes", "source"]
+
+    def __init__(self, data, dtype, shape, rawbytes):
+        self.data = data
+        self.dtype = dtype
+        self.shape = shape
+        self.rawbytes = rawbytes
+        self.source = None      # weak reference to the last array decompressed from this entry
+
+    @property
+    def nbytes(self):
+        return len(self.data)
+
+def _lz4():
+    try:
+        import lz4.block
+    except ImportError:
+        raise ImportError("install lz4 package with:\n    pip install lz4\nor\n    conda install lz4")
+    return (lambda data: lz4.block.compress(data, store_size=False),
+            lambda data, size: lz4.block.decompress(data, uncompressed_size=size))
+
+def _zlib():
+    return (lambda data: zlib.compress(data, 1),
+            lambda data, size: zlib.decompress(data))
+
+class CompressedArrayCache(ThreadSafeArrayCache):
+    def __init__(self, limitbytes, codec=None, method="LRU"):
+        super(CompressedArrayCache, self).__init__(limitbytes, method=method)
+        if codec is None:
+            try:
+                self._compress, self._decompress = _lz4()
+                codec = "lz4"
+            except ImportError:
+                self._compress, self._decompress = _zlib()
+                codec = "zlib"
+        elif codec == "lz4":
+            self._compress, self._decompress = _lz4()
+        elif codec == "zlib":
+            self._compress, self._decompress = _zlib()
+        else:
+            raise ValueError("unrecognized codec: {0} (expected \"lz4\" or \"zlib\")".format(repr(codec)))
+        self.codec = codec
+
+    def __getitem__(self, where):
+        out = super(CompressedArrayCache, self).__getitem__(where)
+        if isinstance(out, _Compressed):
+            # decompressed outside of the lock, so that threads decompress in parallel
+            compressed = out
+            raw = bytearray(self._decompress(compressed.data, compressed.rawbytes))
+            out = numpy.frombuffer(raw, dtype=compressed.dtype).reshape(compressed.shape)
+            compressed.source = weakref.ref(out)
+        return out
+
+    def __setitem__(self, where, what):
+        if isinstance(what, numpy.ndarray) and not what.dtype.hasobject:
+            with self._lock:
+                previous = self._cache.get(where, None)
+            if isinstance(previous, _Compressed) and previous.source is not None and previous.source() is what and previous.dtype == what.dtype and previous.shape == what.shape:
+                # uproot sets baskets again after every hit; refresh the entry without compressing it again
+                what = previous
+            else:
+                what = numpy.ascontiguousarray(what)
+                what = _Compressed(self._compress(what.tobytes()), what.dtype, what.shape, what.nbytes)
+        super(CompressedArrayCache, self).__setitem__(where, what)
+
+class ShardedArrayCache(MutableMapping):
+    @staticmethod
+    def getsizeof(obj):
+        return getattr(obj, "nbytes", 1)
+
+    def __init__(self, limitbytes, method="LRU", numshards=16):
+        from uproot.rootio import _memsize
+        m = _memsize(limitbytes)
+        if m is not None:
+            limitbytes = int(math.ceil(m))
+        if numshards < 1:
+            raise ValueError("numshards must be at least 1")
+        self._method = method
+        self._limitbytes = limitbytes
+        # each shard may grow to the whole budget; the budget is enforced across all of them
+        self._counters = [_Counters() for i in range(numshards)]
+        self._shards = [_newcache(method, limitbytes, self.getsizeof, counters) for counters in self._counters]
+        self._locks = [threading.Lock() for i in range(numshards)]
+
+    def _index(self, where):
+        return hash(where) % len(self._shards)
+
+    @property
+    def currsize(self):
+        return sum(shard.currsize for shard in self._shards)
+
+    def __contains__(self, where):
+        i = self._index(where)
+        with self._locks[i]:
+            return where in self._shards[i]
+
+    def __getitem__(self, where):
+        i = self._index(where)
+        with self._locks[i]:
+            try:
+                out = self._shards[i][where]
+            except KeyError:
+                self._counters[i].add(where, "misses")
+                raise
+            self._counters[i].add(where, "hits")
+            return out
+
+    def __setitem__(self, where, what):
+        i = self._index(where)
+        with self._locks[i]:
+            self._shards[i][where] = what
+            self._counters[i].add(where, "inserts")
+            self._counters[i].add(where, "bytesinserted", self.getsizeof(what))
+
+        # evict from the other shards first (so as not to lose what was just added), holding only one lock at a time
+        for j in range(1, len(self._shards) + 1):
+            if self.currsize <= self._limitbytes:
+                break
+            k = (i + j) % len(self._shards)
+            with self._locks[k]:
+                while len(self._shards[k]) > 0 and self.currsize > self._limitbytes:
+                    self._shards[k].popitem()
+
+    def __delitem__(self, where):
+        i = self._index(where)
+        with self._locks[i]:
+            del self._shards[i][where]
+
+    def __iter__(self):
+        for shard, lock in zip(self._shards, self._locks):
+            with lock:
+                keys = list(shard)
+            for x in keys:
+                yield x
+
+    def __len__(self):
+        return sum(len(shard) for shard in self._shards)
+
+    def clear(self):
+        # replace the segments rather than emptying them, so that clearing is not counted as evictions
+        for i in range(len(self._shards)):
+            with self._locks[i]:
+                self._shards[i] = _newcache(self._method, self._limitbytes, self.getsizeof, self._counters[i])
+
+    def stats(self, byclass=False):
+        counters = []
+        for i in range(len(self._shards)):
+            with self._locks[i]:
+                c = _Counters()
+                c.byclass = dict((keyclass, dict(counts)) for keyclass, counts in self._counters[i].byclass.items())
+                counters.append(c)
+        out = _Counters.merge(counters, byclass)
+        out["numitems"] = len(self)
+        out["currbytes"] = self.currsize
+        out["limitbytes"] = self._limitbytes
+        return out
@@ -19,6 +19,7 @@ import numpy
 
 import uproot.const
 import uproot.source.compressed
+import uproot.sidecar
 from uproot.source.memmap import MemmapSource
 from uproot.source.xrootd import XRootDSource
 from uproot.source.http import HTTPSource
@@ -43,6 +44,7 @@ def open(path, localsource=MemmapSource.defaults, xrootdsource=XRootDSource.defa
     if _bytesid(parsed.scheme) == b"file" or len(parsed.scheme) == 0 or (os.name == "nt" and open._windows_absolute.match(path) is not None):
         if not (os.name == "nt" and open._windows_absolute.match(path) is not None):
             path = parsed.netloc + parsed.path
+        openoptions = dict(options, localsource=localsource)
         if isinstance(localsource, dict):
             kwargs = dict(MemmapSource.defaults)
             kwargs.update(localsource)
@@ -52,7 +54,7 @@ def open(path, localsource=MemmapSource.defaults, xrootdsource=XRootDSource.defa
             openfcn = lambda path: MemmapSource(path, **kwargs)
         else:
             openfcn = localsource
-        return ROOTDirectory.read(openfcn(path), **options)
+        return _keepoptions(ROOTDirectory.read(openfcn(path), **options), openoptions)
 
     elif _bytesid(parsed.scheme) == b"root":
         return xrootd(path, xrootdsource=xrootdsource, **options)
@@ -66,6 +68,7 @@ def open(path, localsource=MemmapSource.defaults, xrootdsource=XRootDSource.defa
 open._windows_absolute = re.compile(r"^[A-Za-z]:\\")
 
 def xrootd(path, xrootdsource=XRootDSource.defaults, **options):
+    openoptions = dict(options, xrootdsource=xrootdsource)
     if isinstance(xrootdsource, dict):
         kwargs = dict(XRootDSource.defaults)
         kwargs.update(xrootdsource)
@@ -75,9 +78,10 @@ def xrootd(path, xrootdsource=XRootDSource.defaults, **options):
         openfcn = lambda path: XRootDSource(path, **kwargs)
     else:
         openfcn = xrootdsource
-    return ROOTDirectory.read(openfcn(path), **options)
+    return _keepoptions(ROOTDirectory.read(openfcn(path), **options), openoptions)
 
 def http(path, httpsource=HTTPSource.defaults, **options):
+    openoptions = dict(options, httpsource=httpsource)
     if isinstance(httpsource, dict):
         kwargs = dict(HTTPSource.defaults)
         kwargs.update(httpsource)
@@ -87,7 +91,12 @@ def http(path, httpsource=HTTPSource.defaults, **options):
         openfcn = lambda path: HTTPSource(path, **kwargs)
     else:
         openfcn = httpsource
-    return ROOTDirectory.read(openfcn(path), **options)
+    return _keepoptions(ROOTDirectory.read(openfcn(path), **options), openoptions)
+
+def _keepoptions(directory, openoptions):
+    # worker processes (uproot._process) open the file again with the same options
+    directory._context.openoptions = openoptions
+    return directory
 
 def nofilter(x): return True
 
@@ -104,6 +113,8 @@ class ROOTDirectory(object):
         def __init__(self, sourcepath, streamerinfos, streamerinfosmap, classes, compression, tfile):
             self.sourcepath, self.streamerinfos, self.streamerinfosmap, self.classes, self.compression, self.tfile = sourcepath, streamerinfos, streamerinfosmap, classes, compression, tfile
             self.uuid = tfile["_fUUID"]
+            self.sidecar = None
+            self.openoptions = {}
 
         def copy(self):
             out = ROOTDirectory._FileContext.__new__(ROOTDirectory._FileContext)
@@ -115,6 +126,8 @@ class ROOTDirectory(object):
         if len(args) == 0:
             try:
                 read_streamers = options.pop("read_streamers", True)
+                zstddict = options.pop("zstddict", None)
+                sidecar = options.pop("sidecar", None)
                 if len(options) > 0:
                     raise TypeError("unrecognized options: {0}".format(", ".join(options)))
 
@@ -149,8 +162,10 @@ class ROOTDirectory(object):
                                    "TObjArray":                 TObjArray,
                                    "TObjString":                TObjString}
 
+                compression = uproot.source.compressed.Compression(fCompress, zstddict)
+
                 if read_streamers and fSeekInfo != 0:
-                    streamercontext = ROOTDirectory._FileContext(source.path, None, None, streamerclasses, uproot.source.compressed.Compression(fCompress), tfile)
+                    streamercontext = ROOTDirectory._FileContext(source.path, None, None, streamerclasses, compression, tfile)
                     streamerkey = TKey.read(source, Cursor(fSeekInfo), streamercontext, None)
                     streamerinfos, streamerinfosmap, streamerrules = _readstreamers(streamerkey._source, streamerkey._cursor, streamercontext, None)
                 else:
@@ -159,8 +174,12 @@ class ROOTDirectory(object):
                 classes = dict(globals())
                 classes.update(builtin_classes)
                 classes = _defineclasses(streamerinfos, classes)
-                context = ROOTDirectory._FileContext(source.path, streamerinfos, streamerinfosmap, classes, uproot.source.compressed.Compression(fCompress), tfile)
+                context = ROOTDirectory._FileContext(source.path, streamerinfos, streamerinfosmap, classes, compression, tfile)
                 context.source = source
+                if sidecar is not None:
+                    if not isinstance(sidecar, uproot.sidecar.SidecarIndex):
+                        sidecar = uproot.sidecar.SidecarIndex(sidecar)
+                    context.sidecar = sidecar
 
                 keycursor = Cursor(fBEGIN)
                 mykey = TKey.read(source, keycursor, context, None)
@@ -0,0 +1,51 @@
+#!/usr/bin/env python
+
+# BSD 3-Clause License; see https://github.com/scikit-hep/uproot/blob/master/LICENSE
+
+from __future__ import absolute_import
+
+import binascii
+import hashlib
+import os
+import tempfile
+
+import numpy
+
+class SidecarIndex(object):
+    def __init__(self, directory):
+        self.directory = os.path.expanduser(directory)
+        try:
+            os.makedirs(self.directory)
+        except OSError:
+            if not os.path.isdir(self.directory):
+                raise
+
+    def _path(self, uuid, treename, branchname, kind):
+        # one directory per file (by fUUID), one small .npy per branch and kind of index (basket key headers if kind is None)
+        return os.path.join(self.directory, binascii.hexlify(uuid).decode("ascii"), hashlib.sha1(treename + b";" + branchname).hexdigest() + ("" if kind is None else "." + kind) + ".npy")
+
+    def get(self, uuid, treename, branchname, kind=None):
+        try:
+            return numpy.load(self._path(uuid, treename, branchname, kind), allow_pickle=False)
+        except (IOError, OSError, ValueError):
+            return None
+
+    def put(self, uuid, treename, branchname, index, kind=None):
+        path = self._path(uuid, treename, branchname, kind)
+        try:
+            try:
+                os.makedirs(os.path.dirname(path))
+            except OSError:
+                if not os.path.isdir(os.path.dirname(path)):
+                    raise
+            # write to a private file and rename it into place so that other processes never load a partial index
+            fd, tmppath = tempfile.mkstemp(dir=os.path.dirname(path), prefix=".")
+            try:
+                with os.fdopen(fd, "wb") as file:
+                    numpy.save(file, index, allow_pickle=False)
+                getattr(os, "replace", os.rename)(tmppath, path)
+            except Exception:
+                os.remove(tmppath)
+                raise
+        except (IOError, OSError):
+            pass                                # the index is best-effort; never fail a read because of it
@@ -0,0 +1,75 @@
+#!/usr/bin/env python
+
+# BSD 3-Clause License; see https://github.com/scikit-hep/uproot/blob/master/LICENSE
+
+from __future__ import absolute_import
+
+import asyncio
+
+import uproot.source.http
+
+class AsyncHTTPSource(uproot.source.http.HTTPSource):
+    def __init__(self, path, auth=None, *args, **kwds):
+        self._maxconcurrent = kwds.pop("maxconcurrent", AsyncHTTPSource.defaults["maxconcurrent"])
+        self._asyncsession = kwds.pop("asyncsession", AsyncHTTPSource.defaults["asyncsession"])
+        super(AsyncHTTPSource, self).__init__(path, auth, *args, **kwds)
+
+    # no thread pool: bulk reads are awaited in preloadranges_async, anything else is read synchronously on demand
+    defaults = dict(uproot.source.http.HTTPSource.defaults, parallel=False, maxconcurrent=64, asyncsession=None)
+
+    @staticmethod
+    def _aiohttp():
+        try:
+            import aiohttp
+        except ImportError:
+            raise ImportError("Install aiohttp package (for asynchronous HTTP) with:\n    pip install aiohttp\nor\n    conda install -c conda-forge aiohttp")
+        return aiohttp
+
+    class _Response(object):
+        def __init__(self, status_code, headers, content):
+            self.status_code = status_code
+            self.headers = headers
+            self.content = content
+
+    async def _get_async(self, session, ranges):
+        aiohttp = self._aiohttp()
+        auth = aiohttp.BasicAuth(*self.auth) if isinstance(self.auth, tuple) else self.auth
+        while True:
+            async with session.get(
+                self.path,
+                headers={"Range": "bytes=" + ", ".join("{0}-{1}".format(start, stop - 1) for start, stop in ranges)},
+                auth=auth,
+            ) as response:
+                if response.status == 504:   # timeout, try it again
+                    continue
+                response.raise_for_status()
+                return self._Response(response.status, response.headers, await response.read())
+
+    async def _readruns_async(self, session, runs):
+        ranges = [(chunkstart * self._chunkbytes, chunkstop * self._chunkbytes) for chunkstart, chunkstop in runs]
+        out = self._fromparts(ranges, self._parts(await self._get_async(session, ranges)))
+        for i, (start, stop) in enumerate(ranges):
+            if out[i] is None:
+                # the server answered with fewer ranges than requested; ask for this one alone
+                out[i] = self._fromparts([(start, stop)], self._parts(await self._get_async(session, [(start, stop)])))[0]
+        return out
+
+    async def _preloadruns_async(self, session, semaphore, runs):
+        async with semaphore:
+            datas = await self._readruns_async(session, runs)
+        self._store(self._splitchunks(runs, datas))
+
+    async def preloadranges_async(self, ranges):
+        runs = self._chunkruns(ranges)
+        if len(runs) == 0:
+            return
+
+        semaphore = asyncio.Semaphore(self._maxconcurrent)
+        batches = [runs[i : i + self._maxranges] for i in range(0, len(runs), self._maxranges)]
+
+        if self._asyncsession is None:
+            aiohttp = self._aiohttp()
+            async with aiohttp.ClientSession(connector=aiohttp.TCPConnector(limit=self._maxconcurrent)) as session:
+                await asyncio.gather(*[self._preloadruns_async(session, semaphore, batch) for batch in batches])
+        else:
+            await asyncio.gather(*[self._preloadruns_async(self._asyncsession, semaphore, batch) for batch in batches])
@@ -4,11 +4,13 @@
 
 from __future__ import absolute_import
 
+import binascii
 import math
 
 import numpy
 
 import uproot.cache
+import uproot.source.diskcache
 import uproot.source.source
 
 
@@ -16,7 +18,7 @@ class ChunkedSource(uproot.source.source.Source):
     # makes __doc__ attribute mutable before Python 3.3
     __metaclass__ = type.__new__(type, "type", (uproot.source.source.Source.__metaclass__,), {})
 
-    def __init__(self, path, chunkbytes, limitbytes, parallel):
+    def __init__(self, path, chunkbytes, limitbytes, parallel, gapbytes=0, diskcache=None, adaptive=False):
         from uproot.rootio import _memsize
         m = _memsize(chunkbytes)
         if m is not None:
@@ -24,15 +26,22 @@ class ChunkedSource(uproot.source.source.Source):
         m = _memsize(limitbytes)
         if m is not None:
             limitbytes = int(math.ceil(m))
+        m = _memsize(gapbytes)
+        if m is not None:
+            gapbytes = int(math.ceil(m))
         self.path = path
         self._chunkbytes = chunkbytes
         self._limitbytes = limitbytes
+        self._gapbytes = gapbytes
+        self._parallel = parallel
         if limitbytes is None:
             self.cache = {}
         else:
-            self.cache = uproot.cache.ThreadSafeArrayCache(limitbytes)
+            self.cache = uproot.cache.ShardedArrayCache(limitbytes)
         self._source = None
         self._setup_futures(parallel)
+        self._setup_diskcache(diskcache)
+        self._setup_adaptive(adaptive)
 
     def parent(self):
         return self
@@ -46,6 +55,9 @@ class ChunkedSource(uproot.source.source.Source):
     def _read(self, chunkindex):
         raise NotImplementedError
 
+    def _readchunks(self, chunkstart, chunkstop):
+        return numpy.concatenate([self._read(chunkindex) for chunkindex in range(chunkstart, chunkstop)])
+
     def close(self):
         super(ChunkedSource, self).close()
         self.cache.clear()
@@ -68,6 +80,83 @@ class ChunkedSource(uproot.source.source.Source):
             self._executor = None
             self._futures = None
 
+    def _setup_diskcache(self, diskcache):
+        if diskcache is None or isinstance(diskcache, uproot.source.diskcache.DiskCache):
+            self._diskcache = diskcache
+        else:
+            self._diskcache = uproot.source.diskcache.DiskCache(diskcache)
+        self._diskkey = None
+
+    def _diskname(self, chunkindex):
+        # chunk 0 holds the TFile header, which identifies the file, so it is always read from the source
+        if self._diskcache is None or chunkindex == 0:
+            return None
+
+        if self._diskkey is None:
+            try:
+                header = self.cache[0]
+            except KeyError:
+                return None
+            from uproot.rootio import ROOTDirectory
+            if len(header) < ROOTDirectory._format1.size:
+                return None
+            magic, fVersion = ROOTDirectory._format1.unpack(header[:ROOTDirectory._format1.size].tobytes())
+            format2 = ROOTDirectory._format2_small if fVersion < 1000000 else ROOTDirectory._format2_big
+            if magic != b"root" or len(header) < ROOTDirectory._format1.size + format2.size:
+                return None
+            fields = format2.unpack(header[ROOTDirectory._format1.size : ROOTDirectory._format1.size + format2.size].tobytes())
+            fEND, fUUID = fields[1], fields[-1]
+            # a file updated in place keeps its fUUID, but not its fEND
+            self._diskkey = "{0}-{1}".format(binascii.hexlify(fUUID[2:]).decode("ascii"), fEND)
+
+        return "{0}-{1}-{2}".format(self._diskkey, self._chunkbytes, chunkindex)
+
+    def _fromdisk(self, chunkindex):
+        name = self._diskname(chunkindex)
+        if name is None:
+            return None
+        try:
+            chunk = self._diskcache[name]
+        except KeyError:
+            return None
+        self.cache[chunkindex] = chunk
+        return chunk
+
+    def _todisk(self, chunkindex, chunk):
+        name = self._diskname(chunkindex)
+        if name is not None and name not in self._diskcache:
+            self._diskcache[name] = chunk
+
+    def _store(self, chunks):
+        for chunkindex, chunk in chunks.items():
+            self.cache[chunkindex] = chunk
+            self._todisk(chunkindex, chunk)
+
+    def _setup_adaptive(self, adaptive):
+        self._adaptive = adaptive
+        self._readahead = 1
+        self._nextmiss = None
+
+    def _readadaptive(self, chunkindex):
+        # a miss where the last one's read stopped is a sequential scan: double the read size; a jump starts over
+        if chunkindex == self._nextmiss:
+            self._readahead = min(2 * self._readahead, max(1, self._limitnum() // 8))
+        else:
+            self._readahead = 1
+
+        chunkstop = chunkindex + 1
+        while chunkstop < chunkindex + self._readahead and chunkstop not in self.cache and (self._futures is None or chunkstop not in self._futures):
+            chunkstop += 1
+        self._nextmiss = chunkstop
+
+        if chunkstop == chunkindex + 1:
+            return self._read(chunkindex)
+
+        chunks = self._splitchunks([(chunkindex, chunkstop)], [self._readchunks(chunkindex, chunkstop)])
+        chunk = chunks.pop(chunkindex, numpy.empty(0, dtype=numpy.uint8))
+        self._store(chunks)
+        return chunk
+
     def _preload(self, chunkindex):
         try:
             chunk = self.cache[chunkindex]
@@ -76,9 +165,15 @@ class ChunkedSource(uproot.source.source.Source):
         else:
             return chunk
 
+    def _limitnum(self):
+        if self._limitbytes is None:
+            return float("inf")
+        else:
+            return self._limitbytes // self._chunkbytes
+
     def preload(self, starts):
         self._open()
-        limitnum = self._limitbytes // self._chunkbytes
+        limitnum = self._limitnum()
         if self._executor is not None:
             for start in starts:
                 if len(self._futures) > limitnum:
@@ -87,6 +182,118 @@ class ChunkedSource(uproot.source.source.Source):
                 if chunkindex not in self._futures:
                     self._futures[chunkindex] = self._executor.submit(self._preload, chunkindex)
 
+    class _ChunkFuture(object):
+        def __init__(self, future, chunkindex):
+            self._future = future
+            self._chunkindex = chunkindex
+
+        def cancel(self):
+            return self._future.cancel()
+
+        def result(self):
+            chunks = self._future.result()
+            if chunks is None:
+                return None
+            else:
+                return chunks.get(self._chunkindex, numpy.empty(0, dtype=numpy.uint8))
+
+    _maxranges = 1
+
+    def _readruns(self, runs):
+        return [self._readchunks(chunkstart, chunkstop) for chunkstart, chunkstop in runs]
+
+    def _splitchunks(self, runs, datas):
+        out = {}
+        for (chunkstart, chunkstop), data in zip(runs, datas):
+            for i in range(0, len(data), self._chunkbytes):
+                out[chunkstart + i // self._chunkbytes] = data[i : i + self._chunkbytes]
+        return out
+
+    def _preloadruns(self, runs):
+        out = self._splitchunks(runs, self._readruns(runs))
+        self._store(out)
+        return out
+
+    def _chunkruns(self, ranges):
+        gapchunks = self._gapbytes // self._chunkbytes
+        maxchunks = max(1, self._limitnum() // 8)
+
+        runs = []
+        for start, stop in uproot.source.source.coalesce(ranges, self._gapbytes):
+            for chunkindex in range(start // self._chunkbytes, (stop - 1) // self._chunkbytes + 1):
+                if len(runs) > 0 and chunkindex < runs[-1][1]:
+                    continue
+                if (self._futures is not None and chunkindex in self._futures) or chunkindex in self.cache or self._fromdisk(chunkindex) is not None:
+                    continue
+                if len(runs) > 0 and runs[-1][1] + gapchunks >= chunkindex and runs[-1][1] - runs[-1][0] < maxchunks:
+                    runs[-1][1] = chunkindex + 1
+                else:
+                    runs.append([chunkindex, chunkindex + 1])
+
+        limitnum = self._limitnum()
+        numchunks = 0 if self._futures is None else len(self._futures)
+        out = []
+        for chunkstart, chunkstop in runs:
+            if numchunks + (chunkstop - chunkstart) > limitnum:
+                chunkstop = chunkstart + int(limitnum - numchunks)
+                if chunkstop <= chunkstart:
+                    break
+            numchunks += chunkstop - chunkstart
+            out.append((chunkstart, chunkstop))
+        return out
+
+    def preloadranges(self, ranges):
+        self._open()
+        runs = self._chunkruns(ranges)
+        for i in range(0, len(runs), self._maxranges):
+            batch = runs[i : i + self._maxranges]
+            if self._executor is not None:
+                future = self._executor.submit(self._preloadruns, batch)
+                for chunkstart, chunkstop in batch:
+                    for chunkindex in range(chunkstart, chunkstop):
+                        self._futures[chunkindex] = self._ChunkFuture(future, chunkindex)
+            else:
+                self._preloadruns(batch)
+
+    def _chunk(self, chunkindex):
+        chunk = None
+        fetched = False
+        if self._futures is not None:
+            future = self._futures.pop(chunkindex, None)
+            if future is not None:
+                chunk = future.result()
+                fetched = True
+
+        if chunk is None:
+            fetched = False
+            try:
+                chunk = self.cache[chunkindex]
+            except KeyError:
+                chunk = self._fromdisk(chunkindex)
+                if chunk is None:
+                    self._open()
+                    if self._adaptive:
+                        chunk = self._readadaptive(chunkindex)
+                    else:
+                        chunk = self._read(chunkindex)
+                    fetched = True
+
+        if len(chunk) > self._chunkbytes:
+            if not numpy.array_equal(chunk[:4], list(b"root")):
+                raise NotImplementedError("Expected {0} or fewer bytes but received {1} and data does not appear to be an entire ROOT file.".format(self._chunkbytes, len(chunk)))
+            self.cache = {}
+            for i in range(0, len(chunk), self._chunkbytes):
+                self.cache[i // self._chunkbytes] = chunk[i:i+self._chunkbytes]
+            chunk = self.cache[chunkindex]
+            # Dismiss any pending futures as everything has already been loaded
+            self.dismiss()
+        else:
+            self.cache[chunkindex] = chunk
+            if fetched:
+                self._todisk(chunkindex, chunk)
+
+        return chunk
+
     def data(self, start, stop, dtype=None):
         if dtype is None:
             thedtype = numpy.dtype(numpy.uint8)
@@ -103,39 +310,33 @@ class ChunkedSource(uproot.source.source.Source):
         else:
             chunkstop = stop // self._chunkbytes + 1
 
+        if chunkstop - chunkstart == 1:
+            # the whole range is in one chunk: return a view of it, without allocating or copying
+            chunk = self._chunk(chunkstart)
+            cstart = start - chunkstart * self._chunkbytes
+            cstop = stop - chunkstart * self._chunkbytes
+            if cstop > len(chunk):
+                raise IndexError("indexes {0}:{1} are beyond the end of data source {2}".format(chunkstart * self._chunkbytes + len(chunk), stop, repr(self.path)))
+            if dtype is None:
+                return chunk[cstart:cstop]
+            else:
+                return chunk[cstart : cstop - (cstop - cstart) % thedtype.itemsize].view(thedtype)
+
+        if self._adaptive:
+            # a large request is read with as few reads as possible, rather than one per chunk
+            self._open()
+            self._preloadruns(self._chunkruns([(start, stop)]))
+
         out = numpy.empty((stop - start) // thedtype.itemsize, dtype=thedtype)
 
         for chunkindex in range(chunkstart, chunkstop):
-            chunk = None
-            if self._futures is not None:
-                future = self._futures.pop(chunkindex, None)
-                if future is not None:
-                    chunk = future.result()
-
-            if chunk is None:
-                try:
-                    chunk = self.cache[chunkindex]
-                except KeyError:
-                    self._open()
-                    chunk = self._read(chunkindex)
+            chunk = self._chunk(chunkindex)
 
             cstart = 0
             cstop = self._chunkbytes
             gstart = chunkindex * self._chunkbytes
             gstop = (chunkindex + 1) * self._chunkbytes
 
-            if len(chunk) > self._chunkbytes:
-                if not numpy.array_equal(chunk[:4], list(b"root")):
-                    raise NotImplementedError("Expected {0} or fewer bytes but received {1} and data does not appear to be an entire ROOT file.".format(self._chunkbytes, len(chunk)))
-                self.cache = {}
-                for i in range(0, len(chunk), self._chunkbytes):
-                    self.cache[i // self._chunkbytes] = chunk[i:i+self._chunkbytes]
-                chunk = self.cache[chunkindex]
-                # Dismiss any pending futures as everything has already been loaded
-                self.dismiss()
-            else:
-                self.cache[chunkindex] = chunk
-
             if gstart < start:
                 cstart += start - gstart
                 gstart += start - gstart
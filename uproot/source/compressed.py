@@ -4,28 +4,71 @@
 
 from __future__ import absolute_import
 
+import multiprocessing
+import os
 import struct
-from copy import copy
+import threading
 
 import numpy
 
+import uproot._deflate
 import uproot.const
 import uproot.source.source
 
+# decompression contexts are not thread-safe, but they can be reused by one thread for any number of blocks
+_threadlocal = threading.local()
+
+def _zstddecompressor(dictionary=None):
+    decompressors = getattr(_threadlocal, "zstd", None)
+    if decompressors is None:
+        decompressors = _threadlocal.zstd = {}
+    out = decompressors.get(dictionary, None)
+    if out is None:
+        try:
+            import zstandard as zstd
+        except ImportError:
+            raise ImportError("install zstd package with:\n    pip install zstandard\nor\n    conda install zstandard")
+        if dictionary is None:
+            out = decompressors[dictionary] = zstd.ZstdDecompressor()
+        else:
+            out = decompressors[dictionary] = zstd.ZstdDecompressor(dict_data=dictionary)
+    return out
+
+_xxh64 = None
+
+def _getxxh64():
+    global _xxh64
+    if _xxh64 is None:
+        try:
+            from xxhash import xxh64
+        except ImportError:
+            raise ImportError("install xxhash package with:\n    pip install xxhash\nor\n    conda install python-xxhash")
+        _xxh64 = xxh64
+    return _xxh64
+
 class Compression(object):
     # makes __doc__ attribute mutable before Python 3.3
     __metaclass__ = type.__new__(type, "type", (type,), {})
 
-    def __init__(self, fCompress):
+    def __init__(self, fCompress, zstddict=None):
         self.algo = max(fCompress // 100, uproot.const.kZLIB)
         self.level = fCompress % 100
         if not uproot.const.kZLIB <= self.algo < uproot.const.kUndefinedCompressionAlgorithm:
             raise ValueError("unrecognized compression algorithm: {0} (from fCompress {1})".format(self.algo, fCompress))
         if not 0 <= self.level <= 9:
             raise ValueError("unrecognized compression level: {0} (from fCompress {1})".format(self.level, fCompress))
+        if isinstance(zstddict, (bytes, bytearray)):
+            # loaded once per file; every copy for every block shares it
+            try:
+                import zstandard as zstd
+            except ImportError:
+                raise ImportError("install zstd package with:\n    pip install zstandard\nor\n    conda install zstandard")
+            zstddict = zstd.ZstdCompressionDict(bytes(zstddict))
+        self.zstddict = zstddict
 
     def copy(self, algo=None, level=None):
         out = Compression.__new__(Compression)
+        out.zstddict = self.zstddict
         if algo is None:
             out.algo = self.algo
         else:
@@ -55,19 +98,52 @@ class Compression(object):
         return "<Compression {0} {1}>".format(repr(self.algoname), self.level)
 
     def decompress(self, source, cursor, compressedbytes, uncompressedbytes=None):
+        return self._decompress(cursor.bytes(source, compressedbytes), uncompressedbytes)
+
+    _window = 1024**2
+
+    @staticmethod
+    def _decompressinto(decompressobj, compressed, out, window):
+        # zlib and lzma have no way to decompress into a given buffer, so each window is still returned as bytes and
+        # copied into out once; bounded steps ensure that no more than one window is ever held outside of out
+        filled = 0
+        data = compressed
+        while filled < len(out) and not decompressobj.eof:
+            piece = decompressobj.decompress(data, min(window, len(out) - filled))
+            if len(piece) == 0:
+                break
+            out[filled : filled + len(piece)] = numpy.frombuffer(piece, dtype=numpy.uint8)
+            filled += len(piece)
+            data = getattr(decompressobj, "unconsumed_tail", b"")
+        if filled == len(out) and not decompressobj.eof:
+            filled += len(decompressobj.decompress(data, 1))   # more data than expected: report a size mismatch
+        return filled
+
+    def _decompress(self, compressed, uncompressedbytes=None, out=None):
+        # with out, returns the number of bytes written into it: in place for zstd, copied once per window or block otherwise
         if self.algo == uproot.const.kZLIB:
-            from zlib import decompress as zlib_decompress
-            return zlib_decompress(cursor.bytes(source, compressedbytes))
+            backend = uproot._deflate.backend()
+            if out is None:
+                return backend.decompress(compressed, uncompressedbytes)
+            elif backend.decompressobj is not None:
+                return self._decompressinto(backend.decompressobj(), compressed, out, self._window)
+            else:
+                asstr = backend.decompress(compressed, uncompressedbytes)
+                out[:len(asstr)] = numpy.frombuffer(asstr, dtype=numpy.uint8)
+                return len(asstr)
 
         elif self.algo == uproot.const.kLZMA:
             try:
-                from lzma import decompress as lzma_decompress
+                from lzma import decompress as lzma_decompress, LZMADecompressor
             except ImportError:
                 try:
-                    from backports.lzma import decompress as lzma_decompress
+                    from backports.lzma import decompress as lzma_decompress, LZMADecompressor
                 except ImportError:
                     raise ImportError("install lzma package with:\n    pip install backports.lzma\nor\n    conda install backports.lzma\n(or just use Python >= 3.3).")
-            return lzma_decompress(cursor.bytes(source, compressedbytes))
+            if out is None:
+                return lzma_decompress(compressed)
+            else:
+                return self._decompressinto(LZMADecompressor(), compressed, out, self._window)
 
         elif self.algo == uproot.const.kOldCompressionAlgo:
             raise NotImplementedError("ROOT's \"old\" algorithm (fCompress 300) is not supported")
@@ -80,15 +156,28 @@ class Compression(object):
 
             if uncompressedbytes is None:
                 raise ValueError("lz4 needs to know the uncompressed number of bytes")
-            return lz4_decompress(cursor.bytes(source, compressedbytes), uncompressed_size=uncompressedbytes)
+            asstr = lz4_decompress(compressed, uncompressed_size=uncompressedbytes)
+            if out is None:
+                return asstr
+            else:
+                # lz4.block has no way to decompress into a given buffer, so the whole block is copied once
+                out[:len(asstr)] = numpy.frombuffer(asstr, dtype=numpy.uint8)
+                return len(asstr)
 
         elif self.algo == uproot.const.kZSTD:
-            try:
-                import zstandard as zstd
-            except ImportError:
-                raise ImportError("install zstd package with:\n    pip install zstandard\nor\n    conda install zstandard")
-            dctx = zstd.ZstdDecompressor()
-            return dctx.decompress(cursor.bytes(source, compressedbytes))
+            dctx = _zstddecompressor(self.zstddict)
+            if out is None:
+                return dctx.decompress(compressed)
+            else:
+                filled = 0
+                view = memoryview(out)
+                with dctx.stream_reader(compressed) as reader:
+                    while filled < len(out):
+                        num = reader.readinto(view[filled:])
+                        if num == 0:
+                            break
+                        filled += num
+                return filled
 
         else:
             raise ValueError("unrecognized compression algorithm: {0}".format(self.algo))
@@ -118,61 +207,99 @@ class CompressedSource(uproot.source.source.Source):
     _header = struct.Struct("2sBBBBBBB")
     _format_field0 = struct.Struct(">Q")
 
+    _pool = None
+    _poollock = threading.Lock()
+
+    @staticmethod
+    def _getpool():
+        with CompressedSource._poollock:
+            if CompressedSource._pool is None:
+                try:
+                    import concurrent.futures
+                except ImportError:
+                    return None
+                CompressedSource._pool = concurrent.futures.ThreadPoolExecutor(multiprocessing.cpu_count())
+            return CompressedSource._pool
+
+    def _blocks(self):
+        cursor = self._cursor.copied()
+        start = cursor.index
+        filled = 0
+        out = []
+        while cursor.index - start < self._compressedbytes:
+            # https://github.com/root-project/root/blob/master/core/zip/src/RZip.cxx#L217
+            # https://github.com/root-project/root/blob/master/core/lzma/src/ZipLZMA.c#L81
+            # https://github.com/root-project/root/blob/master/core/lz4/src/ZipLZ4.cxx#L38
+            algo, method, c1, c2, c3, u1, u2, u3 = header = cursor.fields(self._compressed, self._header)
+            compressedbytes = c1 + (c2 << 8) + (c3 << 16)
+            uncompressedbytes = u1 + (u2 << 8) + (u3 << 16)
+
+            checksum = None
+            if algo == b"ZL":
+                compression = self.compression.copy(uproot.const.kZLIB)
+            elif algo == b"XZ":
+                compression = self.compression.copy(uproot.const.kLZMA)
+            elif algo == b"L4":
+                compression = self.compression.copy(uproot.const.kLZ4)
+                compressedbytes -= 8
+                checksum = cursor.field(self._compressed, self._format_field0)
+            elif algo == b"ZS":
+                compression = self.compression.copy(uproot.const.kZSTD)
+            elif algo == b"CS":
+                raise ValueError("unsupported compression algorithm: 'old' (according to ROOT comments, hasn't been used in 20+ years!)")
+            else:
+                raise ValueError("unrecognized compression algorithm: {0}".format(algo))
+
+            if filled + uncompressedbytes > self._uncompressedbytes:
+                raise ValueError("uncompressed {0} bytes in {1} blocks so far, but expected only {2} bytes".format(filled + uncompressedbytes, len(out) + 1, self._uncompressedbytes))
+
+            # the compressed bytes are read here, in one thread, because not all sources are thread-safe
+            out.append((header, compression, checksum, cursor.bytes(self._compressed, compressedbytes), filled, uncompressedbytes))
+            filled += uncompressedbytes
+
+        return out
+
+    @staticmethod
+    def _decompressblock(block, out=None):
+        header, compression, checksum, compressed, filled, uncompressedbytes = block
+        if checksum is not None:
+            if _getxxh64()(compressed).intdigest() != checksum:
+                raise ValueError("LZ4 checksum didn't match")
+
+        if out is None:
+            asstr = compression._decompress(compressed, uncompressedbytes)
+            numbytes = len(asstr)
+        else:
+            asstr = out
+            numbytes = compression._decompress(compressed, uncompressedbytes, out=out)
+        if numbytes != uncompressedbytes:
+            raise ValueError("block with header {0} ({1}) decompressed to {2} bytes, but the block header says the decompressed size should be {3} bytes".format(repr(header), compression.algoname, numbytes, uncompressedbytes))
+        return asstr
+
     def _prepare(self):
         if self._uncompressed is None:
-            cursor = self._cursor.copied()
-
-            start = cursor.index
-            filled = 0
-            numblocks = 0
-            while cursor.index - start < self._compressedbytes:
-                # https://github.com/root-project/root/blob/master/core/zip/src/RZip.cxx#L217
-                # https://github.com/root-project/root/blob/master/core/lzma/src/ZipLZMA.c#L81
-                # https://github.com/root-project/root/blob/master/core/lz4/src/ZipLZ4.cxx#L38
-                algo, method, c1, c2, c3, u1, u2, u3 = header = cursor.fields(self._compressed, self._header)
-                compressedbytes = c1 + (c2 << 8) + (c3 << 16)
-                uncompressedbytes = u1 + (u2 << 8) + (u3 << 16)
-
-                if algo == b"ZL":
-                    compression = self.compression.copy(uproot.const.kZLIB)
-                elif algo == b"XZ":
-                    compression = self.compression.copy(uproot.const.kLZMA)
-                elif algo == b"L4":
-                    try:
-                        import xxhash
-                    except ImportError:
-                        raise ImportError("install xxhash package with:\n    pip install xxhash\nor\n    conda install python-xxhash")
-                    compression = self.compression.copy(uproot.const.kLZ4)
-                    compressedbytes -= 8
-                    checksum = cursor.field(self._compressed, self._format_field0)
-                    copy_cursor = copy(cursor)
-                    after_compressed = copy_cursor.bytes(self._compressed, compressedbytes)
-                    if xxhash.xxh64(after_compressed).intdigest() != checksum:
-                        raise ValueError("LZ4 checksum didn't match")
-                elif algo == b"ZS":
-                    compression = self.compression.copy(uproot.const.kZSTD)
-                elif algo == b"CS":
-                    raise ValueError("unsupported compression algorithm: 'old' (according to ROOT comments, hasn't been used in 20+ years!)")
-                else:
-                    raise ValueError("unrecognized compression algorithm: {0}".format(algo))
-
-                asstr = compression.decompress(self._compressed, cursor, compressedbytes, uncompressedbytes)
-                numblocks += 1
-
-                if len(asstr) != uncompressedbytes:
-                    raise ValueError("block with header {0} ({1}) decompressed to {2} bytes, but the object key says the decompressed size should be {3} bytes".format(repr(header), compression.algoname, len(asstr), self._uncompressedbytes))
-                if filled + uncompressedbytes > self._uncompressedbytes:
-                    raise ValueError("uncompressed {0} bytes in {1} blocks so far, but expected only {2} bytes".format(filled + uncompressedbytes, numblocks, self._uncompressedbytes))
-
-                if filled == 0:
-                    if uncompressedbytes == self._uncompressedbytes:  # usual case: only one block
-                        self._uncompressed = numpy.frombuffer(asstr, dtype=numpy.uint8)
-                        return
-                    else:
-                        self._uncompressed = numpy.empty(self._uncompressedbytes, dtype=numpy.uint8)
-
-                self._uncompressed[filled : filled + uncompressedbytes] = numpy.frombuffer(asstr, dtype=numpy.uint8)
-                filled += uncompressedbytes
+            blocks = self._blocks()
+
+            if len(blocks) == 1 and blocks[0][-1] == self._uncompressedbytes:   # usual case: only one block
+                self._uncompressed = numpy.frombuffer(self._decompressblock(blocks[0]), dtype=numpy.uint8)
+                return
+
+            uncompressed = numpy.empty(self._uncompressedbytes, dtype=numpy.uint8)
+
+            def fill(block):
+                filled, uncompressedbytes = block[-2:]
+                self._decompressblock(block, out=uncompressed[filled : filled + uncompressedbytes])
+
+            # blocks are independent and zlib, lzma, lz4, and zstd release the GIL while decompressing
+            pool = self._getpool() if len(blocks) > 1 else None
+            if pool is None:
+                for block in blocks:
+                    fill(block)
+            else:
+                for future in [pool.submit(fill, block) for block in blocks]:
+                    future.result()
+
+            self._uncompressed = uncompressed
 
     def size(self):
         self._prepare()
@@ -191,3 +318,11 @@ class CompressedSource(uproot.source.source.Source):
 
     def dismiss(self):
         self._uncompressed = None
+
+def _afterfork():
+    # a forked process (such as a ProcessPoolExecutor worker) inherits the pool but none of its threads
+    CompressedSource._pool = None
+    CompressedSource._poollock = threading.Lock()
+
+if hasattr(os, "register_at_fork"):
+    os.register_at_fork(after_in_child=_afterfork)
@@ -0,0 +1,117 @@
+#!/usr/bin/env python
+
+# BSD 3-Clause License; see https://github.com/scikit-hep/uproot/blob/master/LICENSE
+
+from __future__ import absolute_import
+
+import math
+import os
+import tempfile
+import threading
+
+import numpy
+
+class DiskCache(object):
+    defaults = {"limitbytes": 10*1024**3}
+
+    def __init__(self, directory, limitbytes=defaults["limitbytes"]):
+        from uproot.rootio import _memsize
+        m = _memsize(limitbytes)
+        if m is not None:
+            limitbytes = int(math.ceil(m))
+        self.directory = os.path.expanduser(directory)
+        self._limitbytes = limitbytes
+        self._lock = threading.Lock()
+        try:
+            os.makedirs(self.directory)
+        except OSError:
+            if not os.path.isdir(self.directory):
+                raise
+        self._numbytes = self._scan()[1]
+
+    @property
+    def limitbytes(self):
+        return self._limitbytes
+
+    def _path(self, key):
+        return os.path.join(self.directory, key)
+
+    def _scan(self):
+        entries = []
+        numbytes = 0
+        for name in os.listdir(self.directory):
+            if name.startswith("."):
+                continue                        # another writer's temporary file
+            try:
+                stat = os.stat(self._path(name))
+            except OSError:
+                continue                        # evicted by another process in the meantime
+            entries.append((stat.st_mtime, stat.st_size, name))
+            numbytes += stat.st_size
+        return entries, numbytes
+
+    def __contains__(self, key):
+        return os.path.exists(self._path(key))
+
+    def __getitem__(self, key):
+        path = self._path(key)
+        try:
+            with open(path, "rb") as file:
+                data = file.read()
+            os.utime(path, None)                # mtime is the "last used" time for LRU eviction
+        except (IOError, OSError):
+            raise KeyError(key)
+        return numpy.frombuffer(data, dtype=numpy.uint8)
+
+    def path(self, key):
+        path = self._path(key)
+        try:
+            os.utime(path, None)
+        except OSError:
+            raise KeyError(key)
+        return path
+
+    def __setitem__(self, key, what):
+        data = numpy.asarray(what, dtype=numpy.uint8).tobytes()
+        try:
+            # write to a private file and rename it into place so that readers in other processes never see a partial chunk
+            fd, tmppath = tempfile.mkstemp(dir=self.directory, prefix=".")
+            try:
+                with os.fdopen(fd, "wb") as file:
+                    file.write(data)
+                getattr(os, "replace", os.rename)(tmppath, self._path(key))
+            except Exception:
+                os.remove(tmppath)
+                raise
+        except (IOError, OSError):
+            return                              # the disk cache is best-effort; never fail a read because of it
+
+        with self._lock:
+            self._numbytes += len(data)
+            if self._limitbytes is not None and self._numbytes > self._limitbytes:
+                self._evict()
+
+    def _evict(self):
+        # other processes write to the same directory, so recount before deciding what to remove
+        entries, numbytes = self._scan()
+        entries.sort()
+        for mtime, size, name in entries:
+            if numbytes <= 0.9 * self._limitbytes:
+                break
+            try:
+                os.remove(self._path(name))
+            except OSError:
+                pass
+            numbytes -= size
+        self._numbytes = numbytes
+
+    def clear(self):
+        with self._lock:
+            for name in os.listdir(self.directory):
+                if name.startswith("."):
+                    continue
+                try:
+                    os.remove(self._path(name))
+                except OSError:
+                    pass
+            self._numbytes = 0
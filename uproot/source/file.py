@@ -5,8 +5,10 @@
 from __future__ import absolute_import
 
 import multiprocessing
+import os
 import os.path
 import sys
+import threading
 
 import numpy
 
@@ -16,11 +18,14 @@ class FileSource(uproot.source.chunked.ChunkedSource):
     # makes __doc__ attribute mutable before Python 3.3
     __metaclass__ = type.__new__(type, "type", (uproot.source.chunked.ChunkedSource.__metaclass__,), {})
 
-    defaults = {"chunkbytes": 8*1024, "limitbytes": 1024**2, "parallel": 8*multiprocessing.cpu_count() if sys.version_info[0] > 2 else 1}
+    defaults = {"chunkbytes": 8*1024, "limitbytes": 1024**2, "parallel": 8*multiprocessing.cpu_count() if sys.version_info[0] > 2 else 1, "gapbytes": 32*1024, "vectored": True, "adaptive": False}
 
     def __init__(self, path, *args, **kwds):
         self._size = None
         self._parallel = kwds['parallel']
+        self._vectored = kwds.pop("vectored", FileSource.defaults["vectored"]) and hasattr(os, "pread")
+        self._fd = None
+        self._fdlock = threading.Lock()
         super(FileSource, self).__init__(os.path.expanduser(path), *args, **kwds)
 
     def size(self):
@@ -29,22 +34,78 @@ class FileSource(uproot.source.chunked.ChunkedSource):
         return self._size
 
     def threadlocal(self):
+        if self._vectored:
+            return self                # positioned reads (pread) on one descriptor *are* thread-safe
+
         out = FileSource.__new__(self.__class__)
         out.path = self.path
+        out._size = self._size
+        out._parallel = self._parallel
+        out._vectored = False
+        out._fd = None
+        out._fdlock = self._fdlock
         out._chunkbytes = self._chunkbytes
+        out._limitbytes = self._limitbytes
+        out._gapbytes = self._gapbytes
         out.cache = self.cache
+        out._diskcache = self._diskcache
+        out._diskkey = self._diskkey
+        out._setup_adaptive(self._adaptive)
         out._source = None             # local file connections are *not shared* among threads (they're *not* thread-safe)
         out._setup_futures(self._parallel)
         return out
 
     def _open(self):
-        if self._source is None or self._source.closed:
+        if self._vectored:
+            with self._fdlock:
+                if self._fd is None:
+                    self._fd = os.open(self.path, os.O_RDONLY | getattr(os, "O_BINARY", 0))
+        elif self._source is None or self._source.closed:
             self._source = open(self.path, "rb")
 
+    def _pread(self, start, numbytes):
+        out = numpy.empty(numbytes, dtype=numpy.uint8)
+        filled = 0
+        while filled < numbytes:
+            if hasattr(os, "preadv"):
+                # read straight into the Numpy buffer, without an intermediate bytes object
+                num = os.preadv(self._fd, [memoryview(out[filled:])], start + filled)
+            else:
+                data = os.pread(self._fd, numbytes - filled, start + filled)
+                num = len(data)
+                out[filled : filled + num] = numpy.frombuffer(data, dtype=numpy.uint8)
+            if num == 0:
+                break
+            filled += num
+        return out[:filled]
+
     def _read(self, chunkindex):
+        if self._vectored:
+            return self._pread(chunkindex * self._chunkbytes, self._chunkbytes)
         self._source.seek(chunkindex * self._chunkbytes)
         return numpy.frombuffer(self._source.read(self._chunkbytes), dtype=numpy.uint8)
 
+    def _readchunks(self, chunkstart, chunkstop):
+        if self._vectored:
+            return self._pread(chunkstart * self._chunkbytes, (chunkstop - chunkstart) * self._chunkbytes)
+        self._source.seek(chunkstart * self._chunkbytes)
+        return numpy.frombuffer(self._source.read((chunkstop - chunkstart) * self._chunkbytes), dtype=numpy.uint8)
+
     def dismiss(self):
-        if self._source is not None:
+        if self._vectored:
+            pass                       # one descriptor is shared by all threads; it is closed by close()
+        elif self._source is not None:
             self._source.close()       # local file connections are *not shared* among threads
+
+    def close(self):
+        super(FileSource, self).close()
+        with self._fdlock:
+            if self._fd is not None:
+                os.close(self._fd)
+                self._fd = None
+
+    def __del__(self):
+        super(FileSource, self).__del__()
+        if getattr(self, "_fd", None) is not None:
+            os.close(self._fd)
+            self._fd = None
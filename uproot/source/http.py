@@ -8,6 +8,7 @@ import os.path
 import re
 import multiprocessing
 import sys
+import threading
 
 import numpy
 
@@ -18,11 +19,38 @@ class HTTPSource(uproot.source.chunked.ChunkedSource):
     __metaclass__ = type.__new__(type, "type", (uproot.source.chunked.ChunkedSource.__metaclass__,), {})
 
     def __init__(self, path, auth=None, *args, **kwds):
+        self._maxranges = kwds.pop("maxranges", HTTPSource.defaults["maxranges"])
+        self._sessionoption = kwds.pop("session", HTTPSource.defaults["session"])
+        self._session = None
+        self._sessionlock = threading.Lock()
         super(HTTPSource, self).__init__(path, *args, **kwds)
         self._size = None
         self.auth = auth
 
-    defaults = {"chunkbytes": 1024**2, "limitbytes": 100*1024**2, "parallel": 8*multiprocessing.cpu_count() if sys.version_info[0] > 2 else 1}
+    defaults = {"chunkbytes": 1024**2, "limitbytes": 100*1024**2, "parallel": 8*multiprocessing.cpu_count() if sys.version_info[0] > 2 else 1, "gapbytes": 1024**2, "maxranges": 64, "session": None, "diskcache": None, "adaptive": False}
+
+    @staticmethod
+    def _newsession(poolsize):
+        import requests
+        import requests.adapters
+        session = requests.Session()
+        adapter = requests.adapters.HTTPAdapter(pool_maxsize=poolsize)
+        session.mount("http://", adapter)
+        session.mount("https://", adapter)
+        return session
+
+    _shared = None
+    _sharedpoolsize = 0
+    _sharedlock = threading.Lock()
+
+    @staticmethod
+    def _sharedsession(poolsize):
+        with HTTPSource._sharedlock:
+            if HTTPSource._shared is None or HTTPSource._sharedpoolsize < poolsize:
+                # sources still holding a smaller pool keep using it until they are closed
+                HTTPSource._shared = HTTPSource._newsession(poolsize)
+                HTTPSource._sharedpoolsize = poolsize
+            return HTTPSource._shared
 
     def _open(self):
         try:
@@ -30,17 +58,36 @@ class HTTPSource(uproot.source.chunked.ChunkedSource):
         except ImportError:
             raise ImportError("Install requests package (for HTTP) with:\n    pip install requests\nor\n    conda install -c anaconda requests")
 
+        if self._session is None:
+            with self._sessionlock:
+                if self._session is None:
+                    poolsize = max(1, self._parallel or 1)
+                    if self._sessionoption is None:
+                        self._session = self._newsession(poolsize)
+                    elif self._sessionoption == "shared":
+                        self._session = self._sharedsession(poolsize)
+                    else:
+                        self._session = self._sessionoption
+
+    def close(self):
+        super(HTTPSource, self).close()
+        with self._sessionlock:
+            if self._session is not None and self._sessionoption is None:
+                self._session.close()
+            self._session = None
+
     def size(self):
         return self._size
 
-    _contentrange = re.compile("^bytes ([0-9]+)-([0-9]+)/([0-9]+)$")
+    _contentrange = re.compile("^bytes ([0-9]+)-([0-9]+)/([0-9]+|\\*)$")
+    _boundary = re.compile("^multipart/byteranges;.*boundary=\"?([^\";]+)\"?", re.I)
 
-    def _read(self, chunkindex):
-        import requests
+    def _get(self, ranges):
+        self._open()
         while True:
-            response = requests.get(
+            response = self._session.get(
                 self.path,
-                headers={"Range": "bytes={0}-{1}".format(chunkindex * self._chunkbytes, (chunkindex + 1) * self._chunkbytes - 1)},
+                headers={"Range": "bytes=" + ", ".join("{0}-{1}".format(start, stop - 1) for start, stop in ranges)},
                 auth=self.auth,
             )
             if response.status_code == 504:   # timeout, try it again
@@ -48,12 +95,91 @@ class HTTPSource(uproot.source.chunked.ChunkedSource):
             else:
                 response.raise_for_status()   # if it's an error, raise exception
                 break                         # otherwise, break out of the loop
-        data = response.content
+        return response
 
+    def _setsize(self, contentrange):
         if self._size is None:
-            m = self._contentrange.match(response.headers.get("Content-Range", ""))
-            if m is not None:
+            m = self._contentrange.match(contentrange)
+            if m is not None and m.group(3) != "*":
                 start_inclusive, stop_inclusive, size = int(m.group(1)), int(m.group(2)), int(m.group(3))
                 if size > (stop_inclusive - start_inclusive) + 1:
                     self._size = size
-        return numpy.frombuffer(data, dtype=numpy.uint8)
+
+    def _read(self, chunkindex):
+        return self._readbytes(chunkindex * self._chunkbytes, (chunkindex + 1) * self._chunkbytes)
+
+    def _readchunks(self, chunkstart, chunkstop):
+        start, stop = chunkstart * self._chunkbytes, chunkstop * self._chunkbytes
+        data = self._readbytes(start, stop)
+        if len(data) > stop - start:          # server ignored the Range header and sent the whole file
+            data = data[start:stop]
+        return data
+
+    def _readbytes(self, start, stop):
+        response = self._get([(start, stop)])
+        self._setsize(response.headers.get("Content-Range", ""))
+        return numpy.frombuffer(response.content, dtype=numpy.uint8)
+
+    def _parts(self, response):
+        # https://tools.ietf.org/html/rfc7233#appendix-A: a multipart/byteranges body, a single range, or the whole file
+        content = response.content
+        m = self._boundary.match(response.headers.get("Content-Type", ""))
+        if response.status_code != 206:
+            return [(0, content)]
+
+        elif m is None:
+            contentrange = response.headers.get("Content-Range", "")
+            self._setsize(contentrange)
+            m = self._contentrange.match(contentrange)
+            if m is None:
+                return [(0, content)]
+            else:
+                return [(int(m.group(1)), content)]
+
+        else:
+            delimiter = b"--" + m.group(1).encode("ascii")
+            out = []
+            index = content.find(delimiter)
+            while index >= 0 and content[index + len(delimiter) : index + len(delimiter) + 2] != b"--":
+                headerstart = index + len(delimiter)
+                headerstop = content.find(b"\r\n\r\n", headerstart)
+                if headerstop < 0:
+                    break
+                partstart = None
+                for line in content[headerstart:headerstop].decode("latin-1").split("\r\n"):
+                    name, _, value = line.partition(":")
+                    if name.strip().lower() == "content-range":
+                        self._setsize(value.strip())
+                        mm = self._contentrange.match(value.strip())
+                        if mm is not None:
+                            partstart, partstop = int(mm.group(1)), int(mm.group(2)) + 1
+                if partstart is None:
+                    raise ValueError("multipart/byteranges response part has no valid Content-Range\n   in file: {0}".format(self.path))
+                datastart = headerstop + 4
+                datastop = datastart + (partstop - partstart)
+                out.append((partstart, content[datastart:datastop]))
+                index = content.find(delimiter, datastop)
+            return out
+
+    def _readruns(self, runs):
+        if len(runs) == 1:
+            return [self._readchunks(chunkstart, chunkstop) for chunkstart, chunkstop in runs]
+
+        ranges = [(chunkstart * self._chunkbytes, chunkstop * self._chunkbytes) for chunkstart, chunkstop in runs]
+        out = self._fromparts(ranges, self._parts(self._get(ranges)))
+        for i, (start, stop) in enumerate(ranges):
+            if out[i] is None:
+                # the server answered with fewer ranges than requested; ask for this one alone
+                out[i] = self._readbytes(start, stop)
+        return out
+
+    def _fromparts(self, ranges, parts):
+        out = []
+        for start, stop in ranges:
+            for partstart, content in parts:
+                if partstart <= start < partstart + len(content):
+                    out.append(numpy.frombuffer(content, dtype=numpy.uint8)[start - partstart : stop - partstart])
+                    break
+            else:
+                out.append(None)
+        return out
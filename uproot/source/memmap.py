@@ -4,6 +4,7 @@
 
 from __future__ import absolute_import
 
+import mmap
 import os.path
 
 import numpy
@@ -39,6 +40,33 @@ class MemmapSource(uproot.source.source.Source):
     def dismiss(self):
         pass
 
+    def _madvise(self, advice, ranges):
+        if self.closed or advice is None or not hasattr(self._source._mmap, "madvise"):
+            return
+        size = len(self._source)
+        for start, stop in uproot.source.source.coalesce(ranges, mmap.PAGESIZE):
+            # madvise takes whole pages
+            start = start - start % mmap.PAGESIZE
+            stop = min(stop, size)
+            if stop > start:
+                self._source._mmap.madvise(advice, start, stop - start)
+
+    def preloadranges(self, ranges):
+        self._madvise(getattr(mmap, "MADV_WILLNEED", None), ranges)
+
+    def scanranges(self, ranges):
+        if len(ranges) > 0:
+            self._madvise(getattr(mmap, "MADV_SEQUENTIAL", None), [(min(start for start, stop in ranges), max(stop for start, stop in ranges))])
+
+    def releaseranges(self, ranges):
+        self._madvise(getattr(mmap, "MADV_DONTNEED", None), ranges)
+
+    def gather(self, starts, width):
+        starts = numpy.asarray(starts, dtype=numpy.int64)
+        if len(starts) > 0 and starts.max() + width > len(self.source):
+            raise IndexError("indexes {0}:{1} are beyond the end of data source {2}".format(starts.max(), starts.max() + width, repr(self.path)))
+        return self.source[starts[:, numpy.newaxis] + numpy.arange(width)]
+
     def close(self):
         self.source._mmap.close()
         self.closed = True
@@ -6,6 +6,18 @@ from __future__ import absolute_import
 
 import numpy
 
+def coalesce(ranges, gapbytes=0, maxbytes=None):
+    out = []
+    for start, stop in sorted(ranges):
+        if stop <= start:
+            continue
+        if len(out) > 0 and start <= out[-1][1] + gapbytes and (maxbytes is None or max(stop, out[-1][1]) - out[-1][0] <= maxbytes):
+            if stop > out[-1][1]:
+                out[-1][1] = stop
+        else:
+            out.append([start, stop])
+    return [(start, stop) for start, stop in out]
+
 class Source(object):
     # makes __doc__ attribute mutable before Python 3.3
     __metaclass__ = type.__new__(type, "type", (type,), {})
@@ -32,6 +44,22 @@ class Source(object):
     def preload(self, starts):
         pass
 
+    def preloadranges(self, ranges):
+        pass
+
+    def scanranges(self, ranges):
+        pass
+
+    def releaseranges(self, ranges):
+        pass
+
+    def gather(self, starts, width):
+        self.preloadranges([(start, start + width) for start in starts])
+        out = numpy.empty((len(starts), width), dtype=numpy.uint8)
+        for i, start in enumerate(starts):
+            out[i] = self.data(start, start + width)
+        return out
+
     def data(self, start, stop, dtype=None):
         # assert start >= 0
         # assert stop >= 0
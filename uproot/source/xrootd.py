@@ -20,7 +20,7 @@ class XRootDSource(uproot.source.chunked.ChunkedSource):
         self.timeout = timeout
         super(XRootDSource, self).__init__(path, *args, **kwds)
 
-    defaults = {"timeout": None, "chunkbytes": 1024**2, "limitbytes": 100*1024**2, "parallel": False}
+    defaults = {"timeout": None, "chunkbytes": 1024**2, "limitbytes": 100*1024**2, "parallel": False, "gapbytes": 1024**2, "diskcache": None, "adaptive": False}
 
     def _open(self):
         try:
@@ -48,7 +48,12 @@ class XRootDSource(uproot.source.chunked.ChunkedSource):
         out = XRootDSource.__new__(self.__class__)
         out.path = self.path
         out._chunkbytes = self._chunkbytes
+        out._limitbytes = self._limitbytes
+        out._gapbytes = self._gapbytes
         out.cache = self.cache
+        out._diskcache = self._diskcache
+        out._diskkey = self._diskkey
+        out._setup_adaptive(self._adaptive)
         out._source = None             # XRootD connections are *not shared* among threads
         out._size = self._size
         out.timeout = self.timeout
@@ -64,6 +69,13 @@ class XRootDSource(uproot.source.chunked.ChunkedSource):
             raise OSError(status["message"])
         return numpy.frombuffer(data, dtype=numpy.uint8)
 
+    def _readchunks(self, chunkstart, chunkstop):
+        self._open()
+        status, data = self._source.read(int(chunkstart * self._chunkbytes), int((chunkstop - chunkstart) * self._chunkbytes), timeout=int(0 if self.timeout is None else self.timeout))
+        if status.get("error", None):
+            raise OSError(status["message"])
+        return numpy.frombuffer(data, dtype=numpy.uint8)
+
     def _setup_futures(self, parallel):
         self._parallel = parallel
         self._executor = None
@@ -101,6 +113,38 @@ class XRootDSource(uproot.source.chunked.ChunkedSource):
                     if status["ok"]:
                         self._futures[chunkindex] = callback
 
+    class _preloadrange(object):
+        def __init__(self, timeout, source, chunkstart, chunkstop):
+            self.timeout = timeout
+            self.source = source
+            self.run = (chunkstart, chunkstop)
+            self.out = None
+            self.hold = threading.Event()
+
+        def __call__(self, status, data, hostlist):
+            if not status.get("error", None):
+                self.out = self.source._splitchunks([self.run], [numpy.frombuffer(data, dtype=numpy.uint8)])
+                self.source._store(self.out)
+            self.hold.set()
+
+        def result(self):
+            if self.hold.wait(self.timeout):
+                return self.out
+
+    def preloadranges(self, ranges):
+        if self._parallel:
+            self._open()
+            timeout = int(0 if self.timeout is None else self.timeout)
+            for chunkstart, chunkstop in self._chunkruns(ranges):
+                callback = self._preloadrange(timeout, self, chunkstart, chunkstop)
+                status = self._source.read(int(chunkstart * self._chunkbytes), int((chunkstop - chunkstart) * self._chunkbytes), timeout=timeout, callback=callback)
+                if status["ok"]:
+                    for chunkindex in range(chunkstart, chunkstop):
+                        self._futures[chunkindex] = self._ChunkFuture(callback, chunkindex)
+
+        else:
+            super(XRootDSource, self).preloadranges(ranges)
+
     def __del__(self):
         if self._source is not None:
             self._source.close(timeout=(0 if self.timeout is None else self.timeout))
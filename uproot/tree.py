@@ -4,6 +4,7 @@
 
 from __future__ import absolute_import
 
+import ast
 import base64
 import codecs
 import glob
@@ -17,6 +18,7 @@ import re
 import struct
 import sys
 import threading
+from collections import deque
 from collections import namedtuple
 from collections import OrderedDict
 try:
@@ -31,6 +33,7 @@ import awkward
 import uproot_methods.profiles
 
 import uproot.rootio
+import uproot._process
 from uproot.rootio import _bytesid
 from uproot.rootio import _memsize
 from uproot.rootio import nofilter
@@ -58,6 +61,63 @@ def _delayedraise(excinfo):
         else:
             raise err.with_traceback(trc)
 
+def _concatenate(arrays):
+    if len(arrays) == 1:
+        return arrays[0]
+    elif all(type(x) is numpy.ndarray for x in arrays):
+        return numpy.concatenate(arrays)
+    else:
+        return type(arrays[0]).concatenate(arrays)
+
+_astconstant = getattr(ast, "Constant", None) or ast.Num
+
+def _astnumber(node):
+    if isinstance(node, ast.UnaryOp) and isinstance(node.op, (ast.UAdd, ast.USub)):
+        value = _astnumber(node.operand)
+        if value is None or isinstance(node.op, ast.UAdd):
+            return value
+        return -value
+    if isinstance(node, _astconstant):
+        value = node.value if hasattr(node, "value") else node.n
+        if isinstance(value, numbers.Real) and not isinstance(value, bool):
+            return value
+    return None
+
+_astops = {ast.Lt: ("<", ">"), ast.LtE: ("<=", ">="), ast.Gt: (">", "<"), ast.GtE: (">=", "<="), ast.Eq: ("==", "=="), ast.NotEq: ("!=", "!=")}
+
+def _rangepredicates(selection):
+    # (name, op, number) comparisons that every passing entry must satisfy: the terms of "and" or "&" that compare a name with a number
+    try:
+        node = ast.parse(selection, mode="eval").body
+    except SyntaxError:
+        return []
+
+    out = []
+    def compare(left, op, right):
+        ops = _astops.get(type(op), None)
+        if ops is None:
+            return
+        if isinstance(left, ast.Name) and _astnumber(right) is not None:
+            out.append((left.id, ops[0], _astnumber(right)))
+        elif isinstance(right, ast.Name) and _astnumber(left) is not None:
+            out.append((right.id, ops[1], _astnumber(left)))
+
+    def recurse(node):
+        if isinstance(node, ast.BoolOp) and isinstance(node.op, ast.And):
+            for x in node.values:
+                recurse(x)
+        elif isinstance(node, ast.BinOp) and isinstance(node.op, ast.BitAnd):
+            recurse(node.left)
+            recurse(node.right)
+        elif isinstance(node, ast.Compare):
+            left = node.left
+            for op, right in zip(node.ops, node.comparators):
+                compare(left, op, right)
+                left = right
+
+    recurse(node)
+    return out
+
 def _filename_explode(x):
     if isinstance(x, getattr(os, "PathLike", ())):
         x = os.fspath(x)
@@ -112,12 +172,19 @@ def _normalize_entrystartstop(numentries, entrystart, entrystop):
 
     return int(entrystart), int(entrystop)
 
+def _preloadranges(source, ranges):
+    if len(ranges) > 0:
+        if hasattr(source, "preloadranges"):
+            source.preloadranges(ranges)
+        else:
+            source.preload([start for start, stop in ranges])
+
 ################################################################ high-level interface
 
-def iterate(path, treepath, branches=None, entrysteps=float("inf"), outputtype=dict, namedecode=None, reportpath=False, reportfile=False, reportentries=False, flatten=False, flatname=None, awkwardlib=None, cache=None, basketcache=None, keycache=None, executor=None, blocking=True, localsource=MemmapSource.defaults, xrootdsource=XRootDSource.defaults, httpsource=HTTPSource.defaults, **options):
+def iterate(path, treepath, branches=None, entrysteps=float("inf"), outputtype=dict, namedecode=None, reportpath=False, reportfile=False, reportentries=False, flatten=False, flatname=None, awkwardlib=None, cache=None, basketcache=None, keycache=None, executor=None, blocking=True, lookahead=0, selection=None, localsource=MemmapSource.defaults, xrootdsource=XRootDSource.defaults, httpsource=HTTPSource.defaults, **options):
     awkward = _normalize_awkwardlib(awkwardlib)
     for tree, branchesinterp, globalentrystart, thispath, thisfile in _iterate(path, treepath, branches, awkward, localsource, xrootdsource, httpsource, **options):
-        for start, stop, arrays in tree.iterate(branches=branchesinterp, entrysteps=entrysteps, outputtype=outputtype, namedecode=namedecode, reportentries=True, entrystart=0, entrystop=tree.numentries, flatten=flatten, flatname=flatname, awkwardlib=awkward, cache=cache, basketcache=basketcache, keycache=keycache, executor=executor, blocking=blocking):
+        for start, stop, arrays in tree.iterate(branches=branchesinterp, entrysteps=entrysteps, outputtype=outputtype, namedecode=namedecode, reportentries=True, entrystart=0, entrystop=tree.numentries, flatten=flatten, flatname=flatname, awkwardlib=awkward, cache=cache, basketcache=basketcache, keycache=keycache, executor=executor, blocking=blocking, lookahead=lookahead, selection=selection):
 
             if getattr(outputtype, "__name__", None) == "DataFrame" and getattr(outputtype, "__module__", None) == "pandas.core.frame":
                 if type(arrays.index).__name__ == "MultiIndex":
@@ -423,6 +490,136 @@ class TTreeMethods(object):
         else:
             return True
 
+    def _readplan(self, branches, entrystart, entrystop, cache=None):
+        plan = OrderedDict()
+        for branch, interpretation in branches:
+            source = branch._source.parent()
+            if source is None:
+                continue
+            if cache is not None and branch._cachekey(interpretation, entrystart, entrystop) in cache:
+                continue
+            basketstart, basketstop = branch._basketstartstop(entrystart, entrystop)
+            if basketstart is not None and basketstop is not None:
+                plan.setdefault(id(source), (source, []))[1].extend(branch._basketranges(basketstart, basketstop))
+        return list(plan.values())
+
+    def _preload(self, branches, entrystart, entrystop, cache=None):
+        for source, ranges in self._readplan(branches, entrystart, entrystop, cache):
+            _preloadranges(source, ranges)
+
+    def _scan(self, branches, entrystart, entrystop):
+        for source, ranges in self._readplan(branches, entrystart, entrystop):
+            if hasattr(source, "scanranges"):
+                source.scanranges(ranges)
+
+    def _release(self, branches, entrystart, entrystop):
+        plan = OrderedDict()
+        for branch, interpretation in branches:
+            source = branch._source.parent()
+            if source is None or not hasattr(source, "releaseranges"):
+                continue
+            basketstart, basketstop = branch._basketstartstop(entrystart, entrystop)
+            if basketstart is not None and basketstop is not None:
+                # a basket that continues into the next step is still needed
+                if branch.basket_entrystop(basketstop - 1) > entrystop:
+                    basketstop -= 1
+                plan.setdefault(id(source), (source, []))[1].extend(branch._basketranges(basketstart, basketstop))
+        for source, ranges in plan.values():
+            source.releaseranges(ranges)
+
+    def _select(self, branches, selection, entrystart, entrystop, flatten, awkward, cache, basketcache, keycache, executor):
+        # returns one zero-argument function per branch, each returning that branch's entries that pass the selection
+        if not isinstance(selection, string_types):
+            raise TypeError("selection must be a string (Python expression in terms of branch names), not {0}".format(repr(selection)))
+        code = compile(selection, "<selection>", "eval")
+
+        # first read the branches named in the expression (other names, such as numpy, are left to eval)
+        needed = OrderedDict()
+        for name in code.co_names:
+            try:
+                branch = self.get(name)
+            except KeyError:
+                continue
+            interpretation = interpret(branch, awkward)
+            if interpretation is None:
+                raise ValueError("cannot interpret branch {0} as a Python type\n   in file: {1}".format(repr(branch.name), self._context.sourcepath))
+            needed[name] = (branch, interpretation)
+
+        # but only in entry ranges that the branches' zone maps (per-basket min/max), if known, do not exclude
+        maybe = numpy.ones(entrystop - entrystart, dtype=numpy.bool_)
+        for name, op, value in _rangepredicates(selection):
+            if name not in needed or not isinstance(needed[name][1], asdtype) or needed[name][1].todims != ():
+                continue
+            branch = needed[name][0]
+            maypass = branch._zonemap_maypass(op, value)
+            if maypass is not None:
+                for i in numpy.nonzero(~maypass)[0]:
+                    start = max(branch.basket_entrystart(i), entrystart)
+                    stop = min(branch.basket_entrystop(i), entrystop)
+                    if start < stop:
+                        maybe[start - entrystart : stop - entrystart] = False
+        edges = numpy.nonzero(numpy.diff(numpy.concatenate([[False], maybe, [False]]).astype(numpy.int8)))[0]
+        intervals = [(entrystart + a, entrystart + b) for a, b in zip(edges[0::2].tolist(), edges[1::2].tolist())]
+
+        namespaces = []
+        for start, stop in intervals:
+            self._preload(list(needed.values()), start, stop, cache)
+            futures = [(name, branch.array(interpretation=interpretation, entrystart=start, entrystop=stop, awkwardlib=awkward, cache=cache, basketcache=basketcache, keycache=keycache, executor=executor, blocking=False)) for name, (branch, interpretation) in needed.items()]
+            namespaces.append(dict((name, future()) for name, future in futures))
+
+        mask = numpy.zeros(entrystop - entrystart, dtype=numpy.bool_)
+        for (start, stop), namespace in zip(intervals, namespaces):
+            submask = numpy.asarray(eval(code, {"numpy": numpy, "np": numpy}, dict(namespace)))
+            if submask.dtype != numpy.bool_ or submask.shape != (stop - start,):
+                raise ValueError("selection {0} must evaluate to one boolean per entry ({1}), not {2}".format(repr(selection), stop - start, repr(submask)))
+            mask[start - entrystart : stop - entrystart] = submask
+        passing = numpy.concatenate([[0], numpy.cumsum(mask)])
+
+        # then, for the other branches, the runs of consecutive baskets that contain at least one passing entry
+        runs = []
+        plan = OrderedDict()
+        for branch, interpretation in branches:
+            runs.append([])
+            if branch.numbaskets == 0:
+                continue
+            basketstart, basketstop = branch._basketstartstop(entrystart, entrystop)
+            if basketstart is None or basketstop is None:
+                continue
+            for i in range(basketstart, basketstop):
+                start = max(branch.basket_entrystart(i), entrystart)
+                stop = min(branch.basket_entrystop(i), entrystop)
+                if passing[stop - entrystart] > passing[start - entrystart]:
+                    if len(runs[-1]) > 0 and runs[-1][-1][1] == start:
+                        runs[-1][-1][1] = stop
+                    else:
+                        runs[-1].append([start, stop])
+                    source = branch._source.parent()
+                    if source is not None and i < branch._numgoodbaskets:
+                        plan.setdefault(id(source), (source, []))[1].extend(branch._basketranges(i, i + 1))
+        for source, ranges in plan.values():
+            _preloadranges(source, ranges)
+
+        out = []
+        for (branch, interpretation), branchruns in zip(branches, runs):
+            name = [n for n, (b, x) in needed.items() if b is branch and x.identifier == interpretation.identifier]
+            if len(name) > 0:
+                pieces = [(start, stop, lambda array=namespace[name[0]]: array) for (start, stop), namespace in zip(intervals, namespaces)]
+            else:
+                pieces = [(start, stop, branch.array(interpretation=interpretation, entrystart=start, entrystop=stop, awkwardlib=awkward, cache=cache, basketcache=basketcache, keycache=keycache, executor=executor, blocking=False)) for start, stop in branchruns]
+
+            def wait(interpretation=interpretation, pieces=pieces):
+                if len(pieces) == 0:
+                    result = interpretation.empty()
+                else:
+                    result = _concatenate([future()[mask[start - entrystart : stop - entrystart]] for start, stop, future in pieces])
+                if flatten and isinstance(interpretation, asjagged):
+                    return result.flatten()
+                else:
+                    return result
+            out.append(wait)
+
+        return out
+
     def mempartitions(self, numbytes, branches=None, entrystart=None, entrystop=None, keycache=None, linear=True):
         m = _memsize(numbytes)
         if m is not None:
@@ -442,10 +639,10 @@ class TTreeMethods(object):
         for branch, interpretation in branches:
             if branch._recoveredbaskets is None:
                 branch._tryrecover()
-            for i, key in enumerate(branch._threadsafe_iterate_keys(keycache, False)):
+            for i, objlen in enumerate(branch._threadsafe_keyfield("fObjlen", keycache)):
                 start, stop = branch._entryoffsets[i], branch._entryoffsets[i + 1]
                 if entrystart < stop and start < entrystop:
-                    this_numbytes = key._fObjlen * (min(stop, entrystop) - max(start, entrystart)) / float(stop - start)
+                    this_numbytes = objlen * (min(stop, entrystop) - max(start, entrystart)) / float(stop - start)
                     assert this_numbytes >= 0.0
                     relevant_numbytes += this_numbytes
 
@@ -532,7 +729,7 @@ class TTreeMethods(object):
             raise ValueError("list of branch names or glob/regex matches more than one branch; use TTree.arrays (plural)")
         return tbranch.array(interpretation=interpretation, entrystart=entrystart, entrystop=entrystop, flatten=flatten, awkwardlib=awkwardlib, cache=cache, basketcache=basketcache, keycache=keycache, executor=executor, blocking=blocking)
 
-    def arrays(self, branches=None, outputtype=dict, namedecode=None, entrystart=None, entrystop=None, flatten=False, flatname=None, awkwardlib=None, cache=None, basketcache=None, keycache=None, executor=None, blocking=True, recursive=True):
+    def arrays(self, branches=None, outputtype=dict, namedecode=None, entrystart=None, entrystop=None, flatten=False, flatname=None, awkwardlib=None, cache=None, basketcache=None, keycache=None, executor=None, blocking=True, recursive=True, selection=None):
         awkward = _normalize_awkwardlib(awkwardlib)
         branches = list(self._normalize_branches(branches, awkward))
         for branch, interpretation in branches:
@@ -546,7 +743,18 @@ class TTreeMethods(object):
         ispandas = getattr(outputtype, "__name__", None) == "DataFrame" and getattr(outputtype, "__module__", None) == "pandas.core.frame"
         entrystart, entrystop = _normalize_entrystartstop(self.numentries, entrystart, entrystop)
 
-        # start the job of filling the arrays
+        if selection is not None:
+            if ispandas:
+                raise NotImplementedError("selection with outputtype=pandas.DataFrame")
+            # only the baskets with entries that pass the selection are read
+            arrays = self._select(branches, selection, entrystart, entrystop, flatten, awkward, cache, basketcache, keycache, executor)
+        else:
+            # read the baskets of all branches in as few (large) requests as possible
+            self._preload(branches, entrystart, entrystop, cache)
+
+            # start the job of filling the arrays
+            arrays = [branch.array(interpretation=interpretation, entrystart=entrystart, entrystop=entrystop, flatten=(flatten and not ispandas), awkwardlib=awkward, cache=cache, basketcache=basketcache, keycache=keycache, executor=executor, blocking=False) for branch, interpretation in branches]
+
         futures = None
         if recursive and recursive is not True:
             def wrap_name(branch, namedecode):
@@ -558,9 +766,9 @@ class TTreeMethods(object):
                 else:
                     return branch.name if namedecode is None else branch.name.decode(namedecode)
 
-            futures = [(wrap_name(branch, namedecode), interpretation, branch.array(interpretation=interpretation, entrystart=entrystart, entrystop=entrystop, flatten=(flatten and not ispandas), awkwardlib=awkward, cache=cache, basketcache=basketcache, keycache=keycache, executor=executor, blocking=False)) for branch, interpretation in branches]
+            futures = [(wrap_name(branch, namedecode), interpretation, future) for (branch, interpretation), future in zip(branches, arrays)]
         else:
-            futures = [(branch.name if namedecode is None else branch.name.decode(namedecode), interpretation, branch.array(interpretation=interpretation, entrystart=entrystart, entrystop=entrystop, flatten=(flatten and not ispandas), awkwardlib=awkward, cache=cache, basketcache=basketcache, keycache=keycache, executor=executor, blocking=False)) for branch, interpretation in branches]
+            futures = [(branch.name if namedecode is None else branch.name.decode(namedecode), interpretation, future) for (branch, interpretation), future in zip(branches, arrays)]
 
         # make functions that wait for the filling job to be done and return the right outputtype
         if outputtype == namedtuple:
@@ -591,6 +799,107 @@ class TTreeMethods(object):
         else:
             return wait
 
+    def take(self, indices, branches=None, outputtype=dict, namedecode=None, flatten=False, awkwardlib=None, cache=None, basketcache=None, keycache=None, executor=None, blocking=True):
+        awkward = _normalize_awkwardlib(awkwardlib)
+        branches = list(self._normalize_branches(branches, awkward))
+        for branch, interpretation in branches:
+            if branch._recoveredbaskets is None:
+                branch._tryrecover()
+        if flatten is None:
+            branches = [(branch, interpretation) for branch, interpretation in branches if not isinstance(interpretation, asjagged)]
+            flatten = False
+
+        if getattr(outputtype, "__name__", None) == "DataFrame" and getattr(outputtype, "__module__", None) == "pandas.core.frame":
+            raise NotImplementedError("take with outputtype=pandas.DataFrame")
+
+        indices = numpy.asarray(indices)
+        if len(indices.shape) != 1:
+            raise ValueError("indices must be one-dimensional, not shape {0}".format(indices.shape))
+        if len(indices) == 0:
+            indices = indices.astype(numpy.int64)
+        if indices.dtype.kind not in "iu":
+            raise TypeError("indices must be integers, not {0}".format(indices.dtype))
+        indices = numpy.where(indices < 0, indices + self.numentries, indices).astype(numpy.int64)
+        if len(indices) > 0 and (indices.min() < 0 or indices.max() >= self.numentries):
+            raise IndexError("entry indices out of range for TTree with {0} entries".format(self.numentries))
+
+        arrays = self._take(branches, indices, flatten, awkward, cache, basketcache, keycache, executor)
+        futures = [(branch.name if namedecode is None else branch.name.decode(namedecode), future) for (branch, interpretation), future in zip(branches, arrays)]
+
+        if outputtype == namedtuple:
+            outputtype = namedtuple("Arrays", [codecs.ascii_decode(branch.name, "replace")[0] if namedecode is None else branch.name.decode(namedecode) for branch, interpretation in branches])
+            def wait():
+                return outputtype(*[future() for name, future in futures])
+
+        elif isinstance(outputtype, type) and issubclass(outputtype, dict):
+            def wait():
+                return outputtype((name, future()) for name, future in futures)
+
+        elif isinstance(outputtype, type) and issubclass(outputtype, (list, tuple)):
+            def wait():
+                return outputtype(future() for name, future in futures)
+
+        else:
+            def wait():
+                return outputtype(*[future() for name, future in futures])
+
+        if blocking:
+            return wait()
+        else:
+            return wait
+
+    def _take(self, branches, indices, flatten, awkward, cache, basketcache, keycache, executor):
+        # returns one zero-argument function per branch, each returning that branch's entries at the given indices
+        order = numpy.argsort(indices, kind="mergesort")
+        sortedindices = indices[order]
+        if numpy.array_equal(order, numpy.arange(len(order))):
+            inverse = None
+        else:
+            inverse = numpy.empty_like(order)
+            inverse[order] = numpy.arange(len(order))
+
+        # each basket that contains a requested entry is read once, with the (sorted) rows requested from it
+        jobs = []
+        plan = OrderedDict()
+        for branch, interpretation in branches:
+            jobs.append([])
+            offsets = numpy.asarray(branch._entryoffsets, dtype=numpy.int64)
+            which = numpy.searchsorted(offsets, sortedindices, side="right") - 1
+            baskets, starts = numpy.unique(which, return_index=True)
+            stops = numpy.append(starts[1:], len(which))
+            for i, start, stop in zip(baskets.tolist(), starts.tolist(), stops.tolist()):
+                jobs[-1].append((i, sortedindices[start:stop] - offsets[i]))
+                source = branch._source.parent()
+                if source is not None and i < branch._numgoodbaskets:
+                    plan.setdefault(id(source), (source, []))[1].extend(branch._basketranges(i, i + 1))
+        for source, ranges in plan.values():
+            _preloadranges(source, ranges)
+
+        def rows(branch, interpretation, i, local):
+            return branch.basket(i, interpretation=interpretation, awkwardlib=awkward, cache=cache, basketcache=basketcache, keycache=keycache)[local]
+
+        out = []
+        for (branch, interpretation), branchjobs in zip(branches, jobs):
+            if executor is None or uproot._process.isprocesspool(executor):
+                pieces = [lambda result=rows(branch, interpretation, i, local): result for i, local in branchjobs]
+            else:
+                pieces = [executor.submit(rows, branch, interpretation, i, local).result for i, local in branchjobs]
+
+            def wait(interpretation=interpretation, pieces=pieces):
+                if len(pieces) == 0:
+                    result = interpretation.empty()
+                else:
+                    result = _concatenate([piece() for piece in pieces])
+                    if inverse is not None:
+                        result = result[inverse]
+                if flatten and isinstance(interpretation, asjagged):
+                    return result.flatten()
+                else:
+                    return result
+            out.append(wait)
+
+        return out
+
     def lazyarray(self, branch, interpretation=None, entrysteps=None, entrystart=None, entrystop=None, flatten=False, awkwardlib=None, cache=None, basketcache=None, keycache=None, executor=None, persistvirtual=False, chunked=True):
         awkward = _normalize_awkwardlib(awkwardlib)
         branches = list(self._normalize_branches(branch, awkward))
@@ -676,7 +985,7 @@ class TTreeMethods(object):
                 raise TypeError("entrysteps must be None for cluster iteration, a positive integer for equal steps in number of entries (inf for maximal), a memory size string (number followed by B/kB/MB/GB/etc.), or an iterable of 2-tuples for explicit entry starts (inclusive) and stops (exclusive)")
             return entrysteps
 
-    def iterate(self, branches=None, entrysteps=None, outputtype=dict, namedecode=None, reportentries=False, entrystart=None, entrystop=None, flatten=False, flatname=None, awkwardlib=None, cache=None, basketcache=None, keycache=None, executor=None, blocking=True):
+    def iterate(self, branches=None, entrysteps=None, outputtype=dict, namedecode=None, reportentries=False, entrystart=None, entrystop=None, flatten=False, flatname=None, awkwardlib=None, cache=None, basketcache=None, keycache=None, executor=None, blocking=True, lookahead=0, selection=None):
         if keycache is None:
             keycache = {}
 
@@ -696,6 +1005,8 @@ class TTreeMethods(object):
 
         # for the case of outputtype == pandas.DataFrame, do some preparation to fill DataFrames efficiently
         ispandas = getattr(outputtype, "__name__", None) == "DataFrame" and getattr(outputtype, "__module__", None) == "pandas.core.frame"
+        if ispandas and selection is not None:
+            raise NotImplementedError("selection with outputtype=pandas.DataFrame")
 
         def evaluate(branch, interpretation, future, past, cachekey, pythonize):
             if future is None:
@@ -735,11 +1046,15 @@ class TTreeMethods(object):
             def wrap_for_python_scope(futures, start, stop):
                 return lambda: outputtype(*[evaluate(branch, interpretation, future, past, cachekey, False) for branch, interpretation, future, past, cachekey in futures])
 
-        for start, stop in entrysteps:
-            start = max(start, entrystart)
-            stop = min(stop, entrystop)
-            if start > stop:
-                continue
+        # the whole range will be read once, in order
+        self._scan(branches, entrystart, entrystop)
+
+        def step(start, stop):
+            if selection is not None:
+                selected = self._select(branches, selection, start, stop, flatten, awkward, cache, basketcache if explicit_basketcache else None, keycache, executor)
+                return wrap_for_python_scope([(branch, interpretation, None, wait(), None) for (branch, interpretation), wait in zip(branches, selected)], start, stop)
+
+            self._preload(branches, start, stop, cache)
 
             futures = []
             for branch, interpretation in branches:
@@ -761,15 +1076,105 @@ class TTreeMethods(object):
                     future = branch._step_array(interpretation, basket_itemoffset, basket_entryoffset, start, stop, awkward, basketcache, keycache, executor, explicit_basketcache)
                     futures.append((branch, interpretation, future, None, cachekey))
 
-            out = wrap_for_python_scope(futures, start, stop)
+            return wrap_for_python_scope(futures, start, stop)
 
-            if blocking:
-                out = out()
+        def steps():
+            for start, stop in entrysteps:
+                start = max(start, entrystart)
+                stop = min(stop, entrystop)
+                if start <= stop:
+                    yield start, stop
 
-            if reportentries:
-                yield start, stop, out
-            else:
-                yield out
+        if not lookahead:
+            for start, stop in steps():
+                out = step(start, stop)
+
+                if blocking:
+                    out = out()
+
+                if reportentries:
+                    yield start, stop, out
+                else:
+                    yield out
+
+                if blocking:
+                    self._release(branches, start, stop)
+
+        else:
+            for start, stop, out in self._lookahead(steps(), step, branches, lookahead, keycache):
+                if blocking:
+                    out = out()
+
+                if reportentries:
+                    yield start, stop, out
+                else:
+                    yield out
+
+                if blocking:
+                    self._release(branches, start, stop)
+
+    def _lookahead(self, steps, step, branches, lookahead, keycache):
+        try:
+            import concurrent.futures
+        except ImportError:
+            raise ImportError("install the futures package for lookahead in Python 2:\n    pip install futures\nor\n    conda install futures")
+
+        # an int is a number of steps; a memory size is a budget for the uncompressed baskets of the steps in flight
+        m = _memsize(lookahead)
+        if m is not None:
+            depth, budget = None, m
+        else:
+            depth, budget = lookahead, None
+            if depth < 0:
+                raise ValueError("lookahead must be non-negative")
+
+        def numbytes(start, stop):
+            out = 0
+            for branch, interpretation in branches:
+                if branch.numbaskets > 0:
+                    basketstart, basketstop = branch._basketstartstop(start, stop)
+                    if basketstart is not None and basketstop is not None:
+                        out += sum(branch._threadsafe_keyfield("fObjlen", keycache, basketstart, basketstop))
+            return out
+
+        # steps are built and evaluated one at a time in a single background thread, in order, so baskets shared by
+        # consecutive steps are handed from one to the next through the basketcache just as without lookahead
+        pool = concurrent.futures.ThreadPoolExecutor(1)
+        pending = deque()
+        inflight = [0]
+        steps = iter(steps)
+
+        def submit():
+            for start, stop in steps:
+                size = 0 if budget is None else numbytes(start, stop)
+                inflight[0] += size
+                pending.append((start, stop, size, pool.submit(lambda start=start, stop=stop: step(start, stop)())))
+                return True
+            return False
+
+        try:
+            more = True
+            while True:
+                # the step being consumed counts against the budget, so keep at most depth more in flight
+                while more and (len(pending) == 0 or (len(pending) <= depth if budget is None else inflight[0] < budget)):
+                    more = submit()
+                if len(pending) == 0:
+                    break
+                start, stop, size, future = pending.popleft()
+                yield start, stop, future.result
+                inflight[0] -= size
+        finally:
+            for start, stop, size, future in pending:
+                future.cancel()
+            pool.shutdown(wait=False)
+
+    def arrays_async(self, branches=None, outputtype=dict, namedecode=None, entrystart=None, entrystop=None, flatten=False, flatname=None, awkwardlib=None, cache=None, basketcache=None, keycache=None, executor=None, recursive=True):
+        import uproot._async
+        return uproot._async.arrays(self, branches=branches, outputtype=outputtype, namedecode=namedecode, entrystart=entrystart, entrystop=entrystop, flatten=flatten, flatname=flatname, awkwardlib=awkwardlib, cache=cache, basketcache=basketcache, keycache=keycache, executor=executor, recursive=recursive)
+
+    def iterate_async(self, branches=None, entrysteps=None, outputtype=dict, namedecode=None, reportentries=False, entrystart=None, entrystop=None, flatten=False, flatname=None, awkwardlib=None, cache=None, basketcache=None, keycache=None, executor=None):
+        import uproot._async
+        return uproot._async.iterate(self, branches=branches, entrysteps=entrysteps, outputtype=outputtype, namedecode=namedecode, reportentries=reportentries, entrystart=entrystart, entrystop=entrystop, flatten=flatten, flatname=flatname, awkwardlib=awkwardlib, cache=cache, basketcache=basketcache, keycache=keycache, executor=executor)
 
     def _format(self, indent=""):
         # TODO: add TTree data to the bottom of this
@@ -940,6 +1345,8 @@ class TBranchMethods(object):
             self._recoverylock = threading.Lock()
 
         self._countbranch = None
+        self._keyheaders = None
+        self._zonemap = None
         self._tree_iofeatures = 0
         if hasattr(parent, "_fIOFeatures"):
             self._tree_iofeatures = parent._fIOFeatures._fIOBits
@@ -1099,18 +1506,198 @@ class TBranchMethods(object):
             finally:
                 keysource.dismiss()
 
+    _keyheader_small = numpy.dtype([("fNbytes", ">i4"), ("fVersion", ">i2"), ("fObjlen", ">i4"), ("fDatime", ">u4"), ("fKeylen", ">i2"), ("fCycle", ">i2"), ("fSeekKey", ">i4"), ("fSeekPdir", ">i4")])
+    _keyheader_big = numpy.dtype([("fNbytes", ">i4"), ("fVersion", ">i2"), ("fObjlen", ">i4"), ("fDatime", ">u4"), ("fKeylen", ">i2"), ("fCycle", ">i2"), ("fSeekKey", ">i8"), ("fSeekPdir", ">i8")])
+    _keyheader_complete = numpy.dtype([("fVersion", ">u2"), ("fBufferSize", ">i4"), ("fNevBufSize", ">i4"), ("fNevBuf", ">i4"), ("fLast", ">i4")])
+    _keyheader_dtype = numpy.dtype([("fNbytes", "i8"), ("fVersion", "i8"), ("fObjlen", "i8"), ("fDatime", "i8"), ("fKeylen", "i8"), ("fCycle", "i8"), ("fSeekKey", "i8"), ("fSeekPdir", "i8"), ("fBufferSize", "i8"), ("fNevBufSize", "i8"), ("fNevBuf", "i8"), ("fLast", "i8"), ("border", "i8")])
+
+    def _threadsafe_keyheaders(self):
+        # all basket TKey headers of this branch in one structured array; baskets never change, so this is kept
+        if self._keyheaders is not None:
+            return self._keyheaders
+        if self._recoveredbaskets is None:
+            self._tryrecover()
+
+        numgood = self._numgoodbaskets
+        good = None
+        sidecar = getattr(self._context, "sidecar", None)
+        if sidecar is not None and numgood > 0:
+            good = sidecar.get(self._context.uuid, self._context.treename, self.name)
+            if good is not None and (good.dtype != self._keyheader_dtype or len(good) != numgood or not numpy.array_equal(good["fSeekKey"], self._fBasketSeek[:numgood])):
+                good = None                     # index was written for another version of this file
+        if good is None:
+            good = self._readkeyheaders(numgood)
+            if sidecar is not None and numgood > 0:
+                sidecar.put(self._context.uuid, self._context.treename, self.name, good)
+
+        out = numpy.empty(numgood + len(self._recoveredbaskets), dtype=self._keyheader_dtype)
+        out[:numgood] = good
+        for i, key in enumerate(self._recoveredbaskets):
+            out[numgood + i] = (key._fNbytes, key._fVersion, key._fObjlen, key._fDatime, key._fKeylen, key._fCycle, 0, 0, key._fBufferSize, key._fNevBufSize, key._fNevBuf, key._fLast, key.border)
+
+        self._keyheaders = out
+        return out
+
+    def _threadsafe_keyfield(self, name, keycache, basketstart=None, basketstop=None):
+        # one TKey header field for baskets basketstart:basketstop; parsing every header in bulk only pays off when all
+        # of them are needed, so a partial range is read key by key (through the keycache) unless they're already parsed
+        if self._recoveredbaskets is None:
+            self._tryrecover()
+        if basketstart is None:
+            basketstart = 0
+        if basketstop is None:
+            basketstop = self.numbaskets
+        complete = (name == "border")
+        attr = name if complete else "_" + name
+
+        if self._keyheaders is None and (basketstart > 0 or basketstop < self.numbaskets):
+            return [getattr(key, attr) for key in self._threadsafe_iterate_keys(keycache, complete, basketstart, basketstop)]
+
+        if keycache is not None:
+            keys = [keycache.get(self._keycachekey(i), None) for i in range(basketstart, basketstop)]
+            if all(key is not None and (not complete or hasattr(key, "border")) for key in keys):
+                return [getattr(key, attr) for key in keys]
+            self._threadsafe_keyheaders()
+            for key in self._threadsafe_iterate_keys(keycache, complete, basketstart, basketstop):
+                pass                            # fills the keycache from the parsed headers, without reading them again
+
+        return self._threadsafe_keyheaders()[name][basketstart:basketstop].tolist()
+
+    @staticmethod
+    def _zonemap_dtype(interpretation):
+        if isinstance(interpretation, asjagged):
+            interpretation = interpretation.content
+        if not isinstance(interpretation, asdtype) or interpretation.todtype.base.kind not in "biuf":
+            return None
+        dtype = interpretation.todtype.base
+        return numpy.dtype([("fEntryStart", "i8"), ("fEntryStop", "i8"), ("fSeekKey", "i8"), ("numitems", "i8"), ("numnan", "i8"), ("numzero", "i8"), ("min", dtype), ("max", dtype)])
+
+    def _knownzonemap(self):
+        # the zone map if it has already been computed or can be loaded from a sidecar index, without reading any baskets
+        if self._zonemap is not None:
+            return self._zonemap
+        sidecar = getattr(self._context, "sidecar", None)
+        if sidecar is None:
+            return None
+        dtype = self._zonemap_dtype(interpret(self, _normalize_awkwardlib(None)))
+        if dtype is None:
+            return None
+        zonemap = sidecar.get(self._context.uuid, self._context.treename, self.name, "zonemap")
+        if zonemap is None or zonemap.dtype != dtype or len(zonemap) != self.numbaskets or not numpy.array_equal(zonemap["fEntryStart"], self._entryoffsets[:-1]) or not numpy.array_equal(zonemap["fEntryStop"], self._entryoffsets[1:]) or not numpy.array_equal(zonemap["fSeekKey"], self._zonemap_seeks()):
+            return None                         # index was written for another version of this file
+        self._zonemap = zonemap
+        return zonemap
+
+    def _zonemap_seeks(self):
+        out = numpy.zeros(self.numbaskets, dtype=numpy.int64)
+        out[:self._numgoodbaskets] = self._fBasketSeek[:self._numgoodbaskets]
+        return out
+
+    def zonemap(self, basketcache=None, keycache=None, executor=None):
+        zonemap = self._knownzonemap()
+        if zonemap is not None:
+            return zonemap
+
+        awkward = _normalize_awkwardlib(None)
+        interpretation = interpret(self, awkward)
+        dtype = self._zonemap_dtype(interpretation)
+        if dtype is None:
+            raise ValueError("zone maps can only be made for branches of numbers (or jagged arrays of numbers), not {0} as {1}\n   in file: {2}".format(repr(self.name), interpretation, self._context.sourcepath))
+
+        zonemap = numpy.zeros(self.numbaskets, dtype=dtype)
+        zonemap["fEntryStart"] = self._entryoffsets[:-1]
+        zonemap["fEntryStop"] = self._entryoffsets[1:]
+        zonemap["fSeekKey"] = self._zonemap_seeks()
+
+        def fill(i):
+            data = awkward.numpy.asarray(self.basket(i, interpretation=interpretation, flatten=True, awkwardlib=awkward, basketcache=basketcache, keycache=keycache)).reshape(-1)
+            zonemap["numitems"][i] = len(data)
+            if data.dtype.kind == "f":
+                isnan = awkward.numpy.isnan(data)
+                zonemap["numnan"][i] = awkward.numpy.count_nonzero(isnan)
+                data = data[~isnan]
+            zonemap["numzero"][i] = len(data) - awkward.numpy.count_nonzero(data)
+            if len(data) > 0:
+                zonemap["min"][i] = data.min()
+                zonemap["max"][i] = data.max()
+
+        if executor is None:
+            for i in range(len(zonemap)):
+                fill(i)
+        else:
+            list(executor.map(fill, range(len(zonemap))))
+
+        sidecar = getattr(self._context, "sidecar", None)
+        if sidecar is not None:
+            sidecar.put(self._context.uuid, self._context.treename, self.name, zonemap, "zonemap")
+        self._zonemap = zonemap
+        return zonemap
+
+    def _zonemap_maypass(self, op, value):
+        # for each basket, False if no entry in it can satisfy "branch op value" (NaN never compares true, except with !=)
+        zonemap = self._knownzonemap()
+        if zonemap is None:
+            return None
+        numvalid = zonemap["numitems"] - zonemap["numnan"]
+        if op == "<":
+            out = zonemap["min"] < value
+        elif op == "<=":
+            out = zonemap["min"] <= value
+        elif op == ">":
+            out = zonemap["max"] > value
+        elif op == ">=":
+            out = zonemap["max"] >= value
+        elif op == "==":
+            out = (zonemap["min"] <= value) & (value <= zonemap["max"])
+        elif op == "!=":
+            return (zonemap["numnan"] > 0) | ((numvalid > 0) & ((zonemap["min"] != value) | (zonemap["max"] != value)))
+        else:
+            raise AssertionError(op)
+        return (numvalid > 0) & out
+
+    def _readkeyheaders(self, numgood):
+        out = numpy.empty(numgood, dtype=self._keyheader_dtype)
+        if numgood == 0:
+            return out
+
+        seeks = numpy.asarray(self._fBasketSeek[:numgood], dtype=numpy.int64)
+        keysource = self._source.threadlocal()
+        try:
+            source = keysource.parent()
+            head = source.gather(seeks, self._keyheader_big.itemsize)
+            small = numpy.ascontiguousarray(head[:, :self._keyheader_small.itemsize]).view(self._keyheader_small)[:, 0]
+            big = head.view(self._keyheader_big)[:, 0]
+            isbig = small["fVersion"] > 1000
+            for name in ("fNbytes", "fObjlen", "fDatime", "fKeylen", "fCycle", "fSeekKey", "fSeekPdir"):
+                out[name] = numpy.where(isbig, big[name], small[name])
+
+            tail = source.gather(seeks + out["fKeylen"] - self._keyheader_complete.itemsize - 1, self._keyheader_complete.itemsize)
+            complete = tail.view(self._keyheader_complete)[:, 0]
+            for name in ("fVersion", "fBufferSize", "fNevBufSize", "fNevBuf", "fLast"):
+                out[name] = complete[name]
+
+            size = source.size()
+            if size is not None:
+                bad = numpy.nonzero(size - out["fSeekKey"] < out["fNbytes"])[0]
+                if len(bad) > 0:
+                    s = source
+                    while s.parent() is not None and s.parent() is not s:
+                        s = s.parent()
+                    raise ValueError("TKey declares that object has {0} bytes but only {1} remain in the file\n   in file: {2}".format(out["fNbytes"][bad[0]], size - out["fSeekKey"][bad[0]], s.path))
+        finally:
+            keysource.dismiss()
+
+        out["border"] = out["fLast"] - out["fKeylen"]
+        return out
+
     def uncompressedbytes(self, keycache=None):
-        return sum(key._fObjlen for key in self._threadsafe_iterate_keys(keycache, False))
+        return sum(self._threadsafe_keyfield("fObjlen", keycache))
 
     def compressedbytes(self, keycache=None):
-        return sum(key._fNbytes - key._fKeylen for key in self._threadsafe_iterate_keys(keycache, False))
+        return sum(self._threadsafe_keyfield("fNbytes", keycache)) - sum(self._threadsafe_keyfield("fKeylen", keycache))
 
     def compressionratio(self, keycache=None):
-        numer, denom = 0, 0
-        for key in self._threadsafe_iterate_keys(keycache, False):
-            numer += key._fObjlen
-            denom += key._fNbytes - key._fKeylen
-        return float(numer) / float(denom)
+        return float(self.uncompressedbytes(keycache)) / float(self.compressedbytes(keycache))
 
     def _normalize_dtype(self, interpretation, awkward):
         if inspect.isclass(interpretation) and issubclass(interpretation, awkward.numpy.generic):
@@ -1157,12 +1744,12 @@ class TBranchMethods(object):
             raise ValueError("cannot interpret branch {0} as a Python type\n   in file: {1}".format(repr(self.name), self._context.sourcepath))
         if self._recoveredbaskets is None:
             self._tryrecover()
-        return sum(interpretation.numitems(key.border, self.basket_numentries(i)) for i, key in enumerate(self._threadsafe_iterate_keys(keycache, True)))
+        return sum(interpretation.numitems(border, self.basket_numentries(i)) for i, border in enumerate(self._threadsafe_keyfield("border", keycache)))
 
     @property
     def compression(self):
         try:
-            return uproot.source.compressed.Compression(self._fCompress)
+            return uproot.source.compressed.Compression(self._fCompress, getattr(self._context.compression, "zstddict", None))
         except ValueError:
             return self._context.compression
 
@@ -1384,12 +1971,15 @@ class TBranchMethods(object):
 
     def _basket_itemoffset(self, interpretation, basketstart, basketstop, keycache):
         basket_itemoffset = [0]
-        for j, key in enumerate(self._threadsafe_iterate_keys(keycache, True, basketstart, basketstop)):
+        for j, border in enumerate(self._threadsafe_keyfield("border", keycache, basketstart, basketstop)):
             i = basketstart + j
-            numitems = interpretation.numitems(key.border, self.basket_numentries(i))
+            numitems = interpretation.numitems(border, self.basket_numentries(i))
             basket_itemoffset.append(basket_itemoffset[-1] + numitems)
         return basket_itemoffset
 
+    def _basketranges(self, basketstart, basketstop):
+        return [(int(self._fBasketSeek[i]), int(self._fBasketSeek[i] + self._fBasketBytes[i])) for i in range(basketstart, min(basketstop, self._numgoodbaskets))]
+
     def _basket_entryoffset(self, basketstart, basketstop):
         basket_entryoffset = [0]
         for i in range(basketstart, basketstop):
@@ -1407,7 +1997,7 @@ class TBranchMethods(object):
         basketstart, basketstop = self._basketstartstop(entrystart, entrystop)
 
         if basketstart is not None and basketstop is not None and self._source.parent() is not None:
-            self._source.parent().preload([self._fBasketSeek[i] for i in range(basketstart, basketstop)])
+            _preloadranges(self._source.parent(), self._basketranges(basketstart, basketstop))
 
         if cache is not None:
             cachekey = self._cachekey(interpretation, entrystart, entrystop)
@@ -1438,39 +2028,16 @@ class TBranchMethods(object):
 
         def fill(j):
             try:
-                i = j + basketstart
-                local_entrystart, local_entrystop = self._localentries(i, entrystart, entrystop)
-                source = self._basket(i, interpretation, local_entrystart, local_entrystop, awkward, basketcache, keycache)
-
-                expecteditems = basket_itemoffset[j + 1] - basket_itemoffset[j]
-                source_numitems = interpretation.source_numitems(source)
-
-                expectedentries = basket_entryoffset[j + 1] - basket_entryoffset[j]
-                source_numentries = local_entrystop - local_entrystart
-
-                if j + 1 == basketstop - basketstart:
-                    if expecteditems > source_numitems:
-                        basket_itemoffset[j + 1] -= expecteditems - source_numitems
-                    if expectedentries > source_numentries:
-                        basket_entryoffset[j + 1] -= expectedentries - source_numentries
-
-                elif j == 0:
-                    if expecteditems > source_numitems:
-                        basket_itemoffset[j] += expecteditems - source_numitems
-                    if expectedentries > source_numentries:
-                        basket_entryoffset[j] += expectedentries - source_numentries
-
-                interpretation.fill(source,
-                                    destination,
-                                    basket_itemoffset[j],
-                                    basket_itemoffset[j + 1],
-                                    basket_entryoffset[j],
-                                    basket_entryoffset[j + 1])
-
+                # each basket may only move its outer boundary (see _fillbasket), so writing both back is safe
+                itemoffset, entryoffset = basket_itemoffset[j : j + 2], basket_entryoffset[j : j + 2]
+                self._fillbasket(interpretation, j + basketstart, j == 0, j + 1 == basketstop - basketstart, entrystart, entrystop, awkward, basketcache, keycache, destination, itemoffset, entryoffset)
+                basket_itemoffset[j : j + 2], basket_entryoffset[j : j + 2] = itemoffset, entryoffset
             except Exception:
                 return sys.exc_info()
 
-        if executor is None:
+        if uproot._process.isprocesspool(executor):
+            excinfos = uproot._process.fill(executor, self, interpretation, awkward, destination, basketstart, basketstop, entrystart, entrystop, basket_itemoffset, basket_entryoffset)
+        elif executor is None:
             for j in range(basketstop - basketstart):
                 _delayedraise(fill(j))
             excinfos = ()
@@ -1500,6 +2067,36 @@ class TBranchMethods(object):
         else:
             return wait
 
+    def _fillbasket(self, interpretation, i, first, last, entrystart, entrystop, awkward, basketcache, keycache, destination, itemoffset, entryoffset):
+        # itemoffset and entryoffset are this basket's [start, stop] in destination, corrected in place if the basket has fewer than expected
+        local_entrystart, local_entrystop = self._localentries(i, entrystart, entrystop)
+        source = self._basket(i, interpretation, local_entrystart, local_entrystop, awkward, basketcache, keycache)
+
+        expecteditems = itemoffset[1] - itemoffset[0]
+        source_numitems = interpretation.source_numitems(source)
+
+        expectedentries = entryoffset[1] - entryoffset[0]
+        source_numentries = local_entrystop - local_entrystart
+
+        if last:
+            if expecteditems > source_numitems:
+                itemoffset[1] -= expecteditems - source_numitems
+            if expectedentries > source_numentries:
+                entryoffset[1] -= expectedentries - source_numentries
+
+        elif first:
+            if expecteditems > source_numitems:
+                itemoffset[0] += expecteditems - source_numitems
+            if expectedentries > source_numentries:
+                entryoffset[0] += expectedentries - source_numentries
+
+        interpretation.fill(source,
+                            destination,
+                            itemoffset[0],
+                            itemoffset[1],
+                            entryoffset[0],
+                            entryoffset[1])
+
     def _step_array(self, interpretation, basket_itemoffset, basket_entryoffset, entrystart, entrystop, awkward, basketcache, keycache, executor, explicit_basketcache):
         if interpretation is None:
             raise ValueError("cannot interpret branch {0} as a Python type\n   in file: {1}".format(repr(self.name), self._context.sourcepath))
@@ -1515,39 +2112,16 @@ class TBranchMethods(object):
 
         def fill(j):
             try:
-                i = j + basketstart
-                local_entrystart, local_entrystop = self._localentries(i, entrystart, entrystop)
-                source = self._basket(i, interpretation, local_entrystart, local_entrystop, awkward, basketcache, keycache)
-
-                expecteditems = basket_itemoffset[j + 1] - basket_itemoffset[j]
-                source_numitems = interpretation.source_numitems(source)
-
-                expectedentries = basket_entryoffset[j + 1] - basket_entryoffset[j]
-                source_numentries = local_entrystop - local_entrystart
-
-                if j + 1 == basketstop - basketstart:
-                    if expecteditems > source_numitems:
-                        basket_itemoffset[j + 1] -= expecteditems - source_numitems
-                    if expectedentries > source_numentries:
-                        basket_entryoffset[j + 1] -= expectedentries - source_numentries
-
-                elif j == 0:
-                    if expecteditems > source_numitems:
-                        basket_itemoffset[j] += expecteditems - source_numitems
-                    if expectedentries > source_numentries:
-                        basket_entryoffset[j] += expectedentries - source_numentries
-
-                interpretation.fill(source,
-                                    destination,
-                                    basket_itemoffset[j],
-                                    basket_itemoffset[j + 1],
-                                    basket_entryoffset[j],
-                                    basket_entryoffset[j + 1])
-
+                # each basket may only move its outer boundary (see _fillbasket), so writing both back is safe
+                itemoffset, entryoffset = basket_itemoffset[j : j + 2], basket_entryoffset[j : j + 2]
+                self._fillbasket(interpretation, j + basketstart, j == 0, j + 1 == basketstop - basketstart, entrystart, entrystop, awkward, basketcache, keycache, destination, itemoffset, entryoffset)
+                basket_itemoffset[j : j + 2], basket_entryoffset[j : j + 2] = itemoffset, entryoffset
             except Exception:
                 return sys.exc_info()
 
-        if executor is None:
+        if uproot._process.isprocesspool(executor):
+            excinfos = uproot._process.fill(executor, self, interpretation, awkward, destination, basketstart, basketstop, entrystart, entrystop, basket_itemoffset, basket_entryoffset)
+        elif executor is None:
             for j in range(basketstop - basketstart):
                 _delayedraise(fill(j))
             excinfos = ()
@@ -1590,10 +2164,10 @@ class TBranchMethods(object):
         relevant_numbytes = 0.0
         if self._recoveredbaskets is None:
             self._tryrecover()
-        for i, key in enumerate(self._threadsafe_iterate_keys(keycache, False)):
+        for i, objlen in enumerate(self._threadsafe_keyfield("fObjlen", keycache)):
             start, stop = self._entryoffsets[i], self._entryoffsets[i + 1]
             if entrystart < stop and start < entrystop:
-                this_numbytes = key._fObjlen * (min(stop, entrystop) - max(start, entrystart)) / float(stop - start)
+                this_numbytes = objlen * (min(stop, entrystop) - max(start, entrystart)) / float(stop - start)
                 assert this_numbytes >= 0.0
                 relevant_numbytes += this_numbytes
 
@@ -1683,6 +2257,13 @@ class TBranchMethods(object):
             return out
 
     class _BasketKey(object):
+        @classmethod
+        def _fromheader(cls, source, header, compression):
+            self = cls.__new__(cls)
+            self._fNbytes, self._fVersion, self._fObjlen, self._fDatime, self._fKeylen, self._fCycle, self._fSeekKey, self._fSeekPdir, self._fBufferSize, self._fNevBufSize, self._fNevBuf, self._fLast, self.border = header.tolist()
+            self._setsource(source, compression)
+            return self
+
         def __init__(self, source, cursor, compression, complete):
             start = cursor.index
             self._fNbytes, self._fVersion, self._fObjlen, self._fDatime, self._fKeylen, self._fCycle, self._fSeekKey, self._fSeekPdir = cursor.fields(source, TBranchMethods._BasketKey._format_small)
@@ -1704,12 +2285,15 @@ class TBranchMethods(object):
                             s = s.parent()
                         raise ValueError("TKey declares that object has {0} bytes but only {1} remain in the file\n   in file: {2}".format(self._fNbytes, source.size() - self._fSeekKey, s.path))
 
-                if self._fObjlen != self._fNbytes - self._fKeylen:
-                    self.source = uproot.source.compressed.CompressedSource(compression, source, Cursor(self._fSeekKey + self._fKeylen), self._fNbytes - self._fKeylen, self._fObjlen)
-                    self.cursor = Cursor(0)
-                else:
-                    self.source = source
-                    self.cursor = Cursor(self._fSeekKey + self._fKeylen)
+                self._setsource(source, compression)
+
+        def _setsource(self, source, compression):
+            if self._fObjlen != self._fNbytes - self._fKeylen:
+                self.source = uproot.source.compressed.CompressedSource(compression, source, Cursor(self._fSeekKey + self._fKeylen), self._fNbytes - self._fKeylen, self._fObjlen)
+                self.cursor = Cursor(0)
+            else:
+                self.source = source
+                self.cursor = Cursor(self._fSeekKey + self._fKeylen)
 
         _format_small = struct.Struct(">ihiIhhii")
         _format_big = struct.Struct(">ihiIhhqq")
@@ -1807,6 +2391,9 @@ class TBranchMethods(object):
 
     def _basketkey(self, source, i, complete):
         if 0 <= i < self._numgoodbaskets:
+            if self._keyheaders is not None:
+                # already parsed in bulk (or loaded from a sidecar index): no need to read the header again
+                return self._BasketKey._fromheader(source.parent(), self._keyheaders[i], self.compression)
             return self._BasketKey(source.parent(), Cursor(self._fBasketSeek[i]), self.compression, complete)
 
         elif self._numgoodbaskets <= i < self.numbaskets:
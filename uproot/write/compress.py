@@ -11,6 +11,7 @@ import copy
 import numpy
 
 import uproot
+import uproot._deflate
 import uproot.const
 
 class Compression(object):
@@ -86,8 +87,7 @@ def write(context, cursor, givenbytes, compression, key, keycursor, isjagged=Fal
 
     if algorithm == uproot.const.kZLIB:
         algo = b"ZL"
-        import zlib
-        after_compressed = zlib.compress(givenbytes, level)
+        after_compressed = uproot._deflate.backend().compress(givenbytes, level)
         compressedbytes = len(after_compressed)
         if (compressedbytes + 9) < uncompressedbytes:
             c1 = (compressedbytes >> 0) & 0xff